@@ -1,17 +1,25 @@
 import os
 from flask import Flask, render_template, jsonify
 from flask_cors import CORS
+from metrics import instrument_flask
+from tracing import trace_flask
+from profiler import profile_flask
 
 app = Flask(__name__)
 CORS(app)
+instrument_flask(app, "ora_app")
+trace_flask(app, "ora_app")
+profile_flask(app, url_prefix=None)  # Slow-request capture only; admin endpoints live on the memory API
 
 # Configuration
 HUME_API_KEY = os.environ.get('HUME_API_KEY')
+# Memory API realtime session (wss://.../ws/session); unset keeps the page Hume-only
+ORA_SESSION_WS_URL = os.environ.get('ORA_SESSION_WS_URL')
 
 @app.route('/')
 def index():
     """Serve the main voice interface"""
-    return render_template('index.html')
+    return render_template('index.html', ora_session_url=ORA_SESSION_WS_URL)
 
 @app.route('/onboarding')
 def onboarding():
@@ -31,7 +39,8 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'hume_api_key_configured': bool(HUME_API_KEY)
+        'hume_api_key_configured': bool(HUME_API_KEY),
+        'ora_session_configured': bool(ORA_SESSION_WS_URL)
     })
 
 if __name__ == '__main__':
@@ -0,0 +1,268 @@
+"""
+Comparative benchmark: the memory API on a thread-per-request WSGI server
+(Flask, --wsgi-threads workers, like gunicorn sync/gthread) vs the async-native
+ASGI app (Quart on Hypercorn, one event loop) under the same concurrent load
+Usage: python benchmarks/bench_asgi.py [--concurrency 8,32,128] [--requests 400]
+                                       [--cognee-latency lognormal:0.05,0.5]
+
+Cognee is replaced by benchmarks/fakes.FakeCognee so the I/O-bound routes wait
+on a realistic latency instead of the network. Both servers run in-process on
+local ports against the same synthetic SQLite data, one after the other; an
+aiohttp client keeps --concurrency requests in flight per route and reports
+throughput and p50/p95/p99. Results go to --out as JSON.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+
+WORK_DIR = tempfile.mkdtemp(prefix="ora_bench_asgi_")
+os.environ["ORA_MEMORY_DB_PATH"] = os.path.join(WORK_DIR, "ora_memory.db")
+os.environ["ORA_THERAPEUTIC_DB_PATH"] = os.path.join(WORK_DIR, "ora_therapeutic.db")
+os.environ["ORA_LOCAL_MEMORY_PATH"] = os.path.join(WORK_DIR, "local_memory")
+os.environ["ORA_OUTBOX_PATH"] = os.path.join(WORK_DIR, "outbox")
+os.environ["ORA_MEMORY_BACKEND"] = "local"
+os.environ.setdefault("ORA_TRACE_EXPORT", "none")
+
+sys.path.insert(0, ROOT)
+sys.path.insert(1, os.path.join(ROOT, "memory-api"))
+
+import logging  # noqa: E402
+
+import aiohttp  # noqa: E402
+
+from harness import percentile  # noqa: E402
+from fakes import FakeCognee, LatencyModel  # noqa: E402
+from datagen import populate_memory_db  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+ROUTES = {
+    "cognee-context": ("/api/enhanced/cognee/context", lambda user: {"user_id": user, "limit": 10}),
+    "crisis-assess": ("/api/enhanced/crisis/assess", lambda user: {"user_id": user, "message": "I can't cope"}),
+    "get-context": ("/api/memory/get-context", lambda user: {"user_id": user}),
+    "save": ("/api/memory/save-conversation", lambda user: {
+        "user_id": user, "user_message": "Work has been stressful", "ora_response": "That sounds hard.",
+        "emotion": "anxious", "emotion_intensity": 0.6}),
+    "emotional-patterns": ("/api/enhanced/analytics/emotional-patterns",
+                           lambda user: {"user_id": user, "timeframe_days": 30}),
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# 📌 Servers
+def start_wsgi(app, threads: int):
+    """Flask behind a fixed pool of worker threads; HTTP/1.0 like gunicorn's sync workers"""
+    from werkzeug.serving import BaseWSGIServer
+
+    class PooledWSGIServer(BaseWSGIServer):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool = ThreadPoolExecutor(threads, thread_name_prefix="wsgi-worker")
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._handle, request, client_address)
+
+        def _handle(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    server = PooledWSGIServer("127.0.0.1", _free_port(), app)
+    server.socket.listen(1024)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        server.shutdown()
+        server.pool.shutdown(wait=True)
+        server.server_close()
+    return f"http://127.0.0.1:{server.server_port}", stop
+
+
+def start_asgi(app):
+    """Quart on Hypercorn in its own thread and event loop"""
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    port = _free_port()
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.backlog = 1024
+    config.accesslog = None
+    ready, state = threading.Event(), {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        state["loop"], state["stop"] = loop, asyncio.Event()
+        ready.set()
+        loop.run_until_complete(serve(app, config, shutdown_trigger=state["stop"].wait))
+        loop.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    ready.wait()
+    _wait_for_port(port)
+
+    def stop():
+        state["loop"].call_soon_threadsafe(state["stop"].set)
+        thread.join(timeout=10)
+    return f"http://127.0.0.1:{port}", stop
+
+
+def _wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+# 📌 Load generator
+async def _load(base_url: str, path: str, payload, users: int, concurrency: int, total: int, seed: int):
+    latencies, statuses = [], {}
+    issued = 0
+    rng = random.Random(seed)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60)) as session:
+        async def client():
+            nonlocal issued
+            while issued < total:
+                issued += 1
+                body = payload(f"bench_user_{rng.randrange(users)}")
+                started = time.perf_counter()
+                try:
+                    async with session.post(base_url + path, json=body) as response:
+                        await response.read()
+                        status = str(response.status)
+                except Exception as e:
+                    status = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "throughput_rps": round(len(ordered) / elapsed, 1),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "errors": sum(count for status, count in statuses.items() if not status.startswith("2")),
+        "statuses": statuses
+    }
+
+
+def run_server(label: str, base_url: str, routes, concurrencies, args):
+    results = []
+    for name in routes:
+        path, payload = ROUTES[name]
+        # Warm pools, sessions and caches before measuring
+        asyncio.run(_load(base_url, path, payload, args.users, 4, 20, args.seed))
+        for concurrency in concurrencies:
+            result = asyncio.run(_load(base_url, path, payload, args.users, concurrency, args.requests, args.seed))
+            result.update({"server": label, "route": name, "concurrency": concurrency})
+            results.append(result)
+            print(f"  {label:<5} {name:<20} c={concurrency:<4} {result['throughput_rps']:>8.1f} rps  "
+                  f"p50 {result['p50_ms']:>8.1f}ms  p95 {result['p95_ms']:>8.1f}ms  "
+                  f"p99 {result['p99_ms']:>8.1f}ms  errors {result['errors']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", default=",".join(ROUTES), help=f"comma-separated: {', '.join(ROUTES)}")
+    parser.add_argument("--concurrency", default="8,32,128", help="in-flight requests, comma-separated")
+    parser.add_argument("--requests", type=int, default=400, help="requests per route and concurrency")
+    parser.add_argument("--wsgi-threads", type=int, default=8, help="WSGI worker threads (gunicorn --threads)")
+    parser.add_argument("--cognee-latency", default="lognormal:0.05,0.5")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--history", type=int, default=30, help="synthetic conversations per user")
+    parser.add_argument("--quick", action="store_true", help="one low and one high concurrency, few requests")
+    parser.add_argument("--out", default=os.path.join(BENCH_DIR, "asgi_results.json"))
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    if args.quick:
+        args.concurrency, args.requests = "8,64", 150
+    routes = [r for r in args.routes.split(",") if r]
+    unknown = [r for r in routes if r not in ROUTES]
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(unknown)}")
+    concurrencies = [int(c) for c in args.concurrency.split(",")]
+
+    from src import cognee_service as cognee_module
+    from src.database import init_db
+    from src.main import app as flask_app
+    from src.asgi_app import app as quart_app
+
+    fake_cognee = FakeCognee(LatencyModel(args.cognee_latency, args.seed))
+    cognee_module.cognee = fake_cognee
+    cognee_module.cognee_service.local_store = None
+
+    results = []
+    try:
+        init_db()
+        populate_memory_db(args.users, args.history, args.seed, cognee_store=fake_cognee)
+        print(f"{args.users} users x {args.history} conversations, cognee latency {args.cognee_latency}, "
+              f"{args.wsgi_threads} WSGI threads")
+
+        base_url, stop = start_wsgi(flask_app, args.wsgi_threads)
+        try:
+            results += run_server("wsgi", base_url, routes, concurrencies, args)
+        finally:
+            stop()
+
+        base_url, stop = start_asgi(quart_app)
+        try:
+            results += run_server("asgi", base_url, routes, concurrencies, args)
+        finally:
+            stop()
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    print("\nASGI vs WSGI (throughput ratio, p95 ratio):")
+    by_key = {(r["server"], r["route"], r["concurrency"]): r for r in results}
+    for name in routes:
+        for concurrency in concurrencies:
+            wsgi, asgi = by_key[("wsgi", name, concurrency)], by_key[("asgi", name, concurrency)]
+            print(f"  {name:<20} c={concurrency:<4} x{asgi['throughput_rps'] / (wsgi['throughput_rps'] or 1):>6.2f} rps"
+                  f"   x{asgi['p95_ms'] / (wsgi['p95_ms'] or 1):>6.2f} p95")
+
+    config = {key: getattr(args, key) for key in ("routes", "concurrency", "requests", "wsgi_threads",
+                                                   "cognee_latency", "users", "history", "seed")}
+    with open(args.out, "w") as f:
+        json.dump({"config": config, "results": results}, f, indent=2)
+    print(f"Results: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
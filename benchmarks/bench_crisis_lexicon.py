@@ -0,0 +1,94 @@
+"""
+Benchmark: shared crisis lexicon vs the per-service substring loops it replaced
+Usage: python benchmarks/bench_crisis_lexicon.py --messages 200000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crisis_lexicon import CrisisLexicon, crisis_lexicon, LEXICON  # noqa: E402
+
+FILLER = ("today work went fine but the meeting ran long and I skipped lunch again then "
+          "walked the dog and called my sister about the crusade movie we watched").split()
+
+
+def synthetic_messages(n: int, seed: int = 3):
+    rng = random.Random(seed)
+    terms = [term for tier in LEXICON.values() for term in tier]
+    messages = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(6, 40))
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(terms))
+        if rng.random() < 0.05:
+            words.insert(0, "not")
+        messages.append(" ".join(words))
+    return messages
+
+
+def naive_scan(message: str, lexicon=LEXICON):
+    """The old approach: lowercase + `keyword in message` for every keyword of every tier"""
+    message_lower = message.lower()
+    return [term for tier in lexicon.values() for term in tier if term in message_lower]
+
+
+def expanded_lexicon(factor: int):
+    """Grow every tier with synthetic variants to show how each approach scales with lexicon size"""
+    return {
+        tier: terms + [f"{term} {suffix}" for term in terms for suffix in
+                       ("lately", "again", "today", "always", "at night", "at work", "so much",
+                        "every day", "right now")[:factor - 1]]
+        for tier, terms in LEXICON.items()
+    }
+
+
+def throughput(fn, messages):
+    start = time.perf_counter()
+    for message in messages:
+        fn(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200000)
+    args = parser.parse_args()
+
+    messages = synthetic_messages(args.messages)
+    total_chars = sum(len(m) for m in messages)
+
+    start = time.perf_counter()
+    naive = [naive_scan(m) for m in messages]
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [crisis_lexicon.scan(m) for m in messages]
+    compiled_time = time.perf_counter() - start
+
+    false_substring_hits = sum(
+        1 for old, new in zip(naive, compiled) if old and not new.matches
+    )
+
+    print(f"{len(messages)} messages, {total_chars / 1e6:.1f}M chars")
+    print(f"Substring loops : {len(messages) / naive_time:,.0f} msg/s")
+    print(f"Compiled lexicon: {len(messages) / compiled_time:,.0f} msg/s "
+          f"({naive_time / compiled_time:.2f}x)")
+    print(f"Messages the loops flagged only via substrings/negation: {false_substring_hits}")
+
+    # Scaling with lexicon size: loops are O(keywords x length), the trie regex is ~O(length)
+    sample = messages[:20000]
+    for factor in (1, 4, 10):
+        lexicon = expanded_lexicon(factor)
+        size = sum(len(terms) for terms in lexicon.values())
+        compiled_lexicon = CrisisLexicon(lexicon)
+        loops = throughput(lambda m: naive_scan(m, lexicon), sample)
+        trie = throughput(compiled_lexicon.scan, sample)
+        print(f"  {size:4d} terms: loops {loops:>10,.0f} msg/s | compiled {trie:>10,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
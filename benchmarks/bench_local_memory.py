@@ -0,0 +1,126 @@
+"""
+Benchmark: local memory backend vs exact search (and the remote OpenAI path)
+Usage: python benchmarks/bench_local_memory.py --docs 20000 --queries 200 [--remote]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_memory_backend import HashingEmbedder, LocalMemoryStore  # noqa: E402
+
+SUBJECTS = ["work", "my boss", "school", "my exams", "my partner", "my family", "my friends",
+            "money", "my health", "sleep", "my dog", "the move", "my sister", "the project"]
+FEELINGS = ["stressed", "anxious", "happy", "sad", "overwhelmed", "excited", "lonely",
+            "frustrated", "calm", "worried", "grateful", "tired"]
+TEMPLATES = [
+    "I'm feeling {feeling} about {subject} today",
+    "{subject} has been making me {feeling} lately",
+    "Honestly I feel {feeling} whenever I think about {subject}",
+    "I talked about {subject} again and I still feel {feeling}",
+    "Why am I always {feeling} because of {subject}?",
+]
+
+
+def synthetic_corpus(n: int, users: int, seed: int = 7):
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        text = rng.choice(TEMPLATES).format(feeling=rng.choice(FEELINGS), subject=rng.choice(SUBJECTS))
+        docs.append((f"{text} (note {i})", f"user_{i % users}"))
+    return docs
+
+
+def percentile(values, pct):
+    return float(np.percentile(np.asarray(values) * 1000, pct))
+
+
+def remote_embed(texts):
+    import openai
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    response = openai.Embedding.create(model="text-embedding-3-small", input=texts)
+    vectors = np.asarray([row["embedding"] for row in response["data"]], dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--remote", action="store_true", help="also time the OpenAI embedding path")
+    args = parser.parse_args()
+
+    docs = synthetic_corpus(args.docs, args.users)
+    rng = random.Random(11)
+    queries = [(docs[rng.randrange(len(docs))][0].split(" (note")[0], None) for _ in range(args.queries)]
+    queries += [(text, user_id) for text, user_id in rng.sample(docs, args.queries)]
+
+    workdir = tempfile.mkdtemp(prefix="ora_bench_")
+    try:
+        embedder = HashingEmbedder()
+        store = LocalMemoryStore(workdir, embedder)
+
+        start = time.perf_counter()
+        for i in range(0, len(docs), 1000):
+            store.add_many([(text, user_id, {"user_id": user_id}) for text, user_id in docs[i:i + 1000]])
+        store.flush()  # Includes any background IVF training still running
+        ingest = time.perf_counter() - start
+        print(f"Ingested {len(docs)} docs in {ingest:.2f}s ({len(docs) / ingest:.0f} docs/s)")
+
+        matrix = np.asarray(store.index.vectors[:store.index.count])
+        user_rows = {user_id: np.asarray(rows) for user_id, rows in store.user_rows.items()}
+
+        latencies, exact_latencies, recalls = [], [], []
+        for text, user_id in queries:
+            start = time.perf_counter()
+            hits = store.search(text, user_id=user_id, limit=args.k)
+            latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            vector = embedder.embed([text])[0]
+            rows = user_rows[user_id] if user_id else np.arange(len(matrix))
+            scores = matrix[rows] @ vector
+            exact = {store.records[int(rows[i])]["id"] for i in np.argsort(-scores)[:args.k]}
+            exact_latencies.append(time.perf_counter() - start)
+
+            recalls.append(len(exact & {hit.id for hit in hits}) / max(len(exact), 1))
+
+        print(f"Local IVF search   p50={percentile(latencies, 50):.3f}ms p95={percentile(latencies, 95):.3f}ms "
+              f"recall@{args.k}={np.mean(recalls):.3f}")
+        print(f"Exact brute force  p50={percentile(exact_latencies, 50):.3f}ms "
+              f"p95={percentile(exact_latencies, 95):.3f}ms")
+
+        if args.remote:
+            if not os.getenv("OPENAI_API_KEY"):
+                print("Skipping remote path: OPENAI_API_KEY not set")
+                return
+            sample = docs[:min(len(docs), 2000)]
+            remote_matrix = np.concatenate([remote_embed([t for t, _ in sample[i:i + 500]])
+                                            for i in range(0, len(sample), 500)])
+            local_matrix = matrix[:len(sample)]
+            remote_latencies, agreement = [], []
+            for text, _ in queries[:50]:
+                start = time.perf_counter()
+                remote_vector = remote_embed([text])[0]
+                remote_top = set(np.argsort(-(remote_matrix @ remote_vector))[:args.k])
+                remote_latencies.append(time.perf_counter() - start)
+                local_top = set(np.argsort(-(local_matrix @ embedder.embed([text])[0]))[:args.k])
+                agreement.append(len(remote_top & local_top) / args.k)
+            print(f"Remote embed+search p50={percentile(remote_latencies, 50):.1f}ms "
+                  f"p95={percentile(remote_latencies, 95):.1f}ms")
+            print(f"Local vs remote top-{args.k} agreement: {np.mean(agreement):.3f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: worker boot time with blocking vs background mem0 initialization
+Usage: python benchmarks/bench_mem0_startup.py --provider-latency 3.0 --requests 50
+
+The provider is simulated by an injected memory_factory that sleeps for
+--provider-latency seconds (Memory.from_config with remote vector store and
+LLM setup typically takes seconds), so the numbers don't depend on network.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ora_mem0_service import ORAMem0Service  # noqa: E402
+
+
+class SlowMemory:
+    """Stands in for mem0's Memory: slow to construct, fast to query"""
+
+    def __init__(self, latency: float):
+        time.sleep(latency)
+
+    def search(self, query, user_id, limit=5):
+        return [{"memory": f"remembered: {query}"}]
+
+    def add(self, messages, user_id, metadata=None):
+        return {"id": "m1"}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--provider-latency", type=float, default=3.0)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    factory = lambda: SlowMemory(args.provider_latency)  # noqa: E731
+
+    # Before: the constructor built the provider inline, so import/boot waited for it
+    start = time.perf_counter()
+    memory = factory()
+    blocking_boot = time.perf_counter() - start
+    start = time.perf_counter()
+    memory.search("hello", user_id="u")
+    blocking_first = time.perf_counter() - start
+
+    # After: construction returns immediately; requests get fallbacks until ready
+    start = time.perf_counter()
+    service = ORAMem0Service(memory_factory=factory)
+    service.start()
+    lazy_boot = time.perf_counter() - start
+
+    latencies, fallbacks = [], 0
+    for _ in range(args.requests):
+        t = time.perf_counter()
+        context = service.get_context("u", "hello")
+        latencies.append(time.perf_counter() - t)
+        fallbacks += context == ""
+    service.wait_until_ready()
+
+    print(f"Simulated provider setup: {args.provider_latency:.1f}s")
+    print(f"Blocking init : boot {blocking_boot * 1000:8.1f} ms | first request served after "
+          f"{(blocking_boot + blocking_first) * 1000:8.1f} ms")
+    print(f"Background init: boot {lazy_boot * 1000:8.3f} ms | pre-ready requests p50 "
+          f"{percentile(latencies, 0.5) * 1e6:.1f} µs, p99 {percentile(latencies, 0.99) * 1e6:.1f} µs "
+          f"({fallbacks}/{args.requests} fallbacks)")
+    print(f"Ready after {service.init_seconds}s in background; state={service.state}")
+    print(f"Post-ready context: {service.get_context('u', 'hello')!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: hybrid memory routing - the old per-call keyword scan vs the cached
+MemoryRouter, plus the /api/ora/routing/analyze endpoint at high request rates
+Usage: python benchmarks/bench_routing.py --requests 20000 --unique 500
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crisis_lexicon import LEXICON  # noqa: E402
+from memory_router import MemoryRouter  # noqa: E402
+
+WORDS = ("today work went fine but the meeting ran long and I skipped lunch then walked "
+         "the dog and called my sister about the weekend plans").split()
+OLD_KEYWORDS = [term for tier in LEXICON.values() for term in tier]
+
+
+def old_is_therapeutic(message: str) -> bool:
+    """What each route used to run, two or three times per request"""
+    message_lower = message.lower()
+    return any(keyword in message_lower for keyword in OLD_KEYWORDS)
+
+
+def workload(n: int, unique: int, seed: int = 5):
+    """Make.com retries and repeated check-ins mean many identical messages"""
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(unique):
+        words = rng.choices(WORDS, k=rng.randint(8, 30))
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words)), rng.choice(OLD_KEYWORDS))
+        pool.append(" ".join(words))
+    return [rng.choice(pool) for _ in range(n)]
+
+
+def rate(fn, messages, calls_per_message=1):
+    start = time.perf_counter()
+    for message in messages:
+        for _ in range(calls_per_message):
+            fn(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--unique", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    messages = workload(args.requests, args.unique)
+
+    print(f"{args.requests} requests over {args.unique} distinct messages")
+    print(f"Old scan x3 per request : {rate(old_is_therapeutic, messages, 3):>10,.0f} req/s")
+    print(f"Router, no cache        : {rate(MemoryRouter(cache_size=0).route, messages):>10,.0f} req/s")
+    print(f"Router, cached          : {rate(MemoryRouter().route, messages):>10,.0f} req/s")
+
+    # End to end through Flask (test client, no network) with concurrent callers
+    from flask import Flask
+    import ora_adapted_mem0_routes as routes
+    app = Flask(__name__)
+    app.register_blueprint(routes.mem0_bp)
+    client = app.test_client()
+
+    def call(message):
+        t = time.perf_counter()
+        response = client.post("/api/ora/routing/analyze", json={"message": message})
+        assert response.status_code == 200
+        return time.perf_counter() - t
+
+    for label, router in (("no cache", MemoryRouter(cache_size=0)), ("cached", MemoryRouter())):
+        routes.ora_mem0_service.route_message = lambda m, md=None, r=router: r.route(m, md)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            latencies = sorted(pool.map(call, messages))
+        elapsed = time.perf_counter() - start
+        print(f"/routing/analyze {label:8s}: {len(messages) / elapsed:>8,.0f} req/s | "
+              f"p50 {latencies[len(latencies) // 2] * 1000:.3f} ms | "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
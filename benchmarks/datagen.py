@@ -0,0 +1,140 @@
+"""
+Synthetic data for the ORA benchmarks: message corpora for crisis detection and
+routing, audio clips for feature extraction, and populated memory-api /
+therapeutic databases of N users x M conversations. Everything is seeded, so
+the same arguments always produce the same data.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from crisis_lexicon import LEXICON
+
+FILLER = ("today work went fine but the meeting ran long and I skipped lunch again then "
+          "walked the dog and called my sister about the movie we watched last night").split()
+EMOTIONS = ["happy", "sad", "anxious", "angry", "neutral", "calm", "stressed", "excited", "fearful"]
+RESPONSES = ["That sounds like a lot to carry.", "Thank you for telling me.",
+             "What helped the last time you felt this way?", "I'm glad that went well!"]
+NEGATORS = ["not", "never", "don't feel"]
+
+# Share of each label in a corpus; the rest is general conversation
+LABEL_MIX = {"high": 0.03, "medium": 0.07, "low": 0.15, "therapeutic": 0.10, "negated": 0.05}
+
+
+def message_corpus(n: int, seed: int = 11) -> List[Tuple[str, str]]:
+    """[(message, label)] where label is a lexicon tier, 'negated' or 'general'"""
+    rng = random.Random(seed)
+    labels, weights = list(LABEL_MIX), list(LABEL_MIX.values())
+    labels.append("general")
+    weights.append(1 - sum(weights))
+
+    corpus = []
+    for _ in range(n):
+        label = rng.choices(labels, weights)[0]
+        words = rng.choices(FILLER, k=rng.randint(6, 40))
+        position = rng.randrange(len(words) + 1)
+        if label == "negated":
+            tier = rng.choice(["medium", "low", "therapeutic"])
+            words[position:position] = [rng.choice(NEGATORS), rng.choice(LEXICON[tier])]
+        elif label != "general":
+            words.insert(position, rng.choice(LEXICON[label]))
+        corpus.append((" ".join(words), label))
+    return corpus
+
+
+def synthetic_clip(seconds: float, sample_rate: int = 44100, seed: int = 5) -> np.ndarray:
+    """Voice-like float32 audio: a wandering fundamental with harmonics, an envelope and noise"""
+    rng = np.random.default_rng(seed)
+    samples = int(seconds * sample_rate)
+    t = np.arange(samples) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t) + rng.normal(0, 2, samples).cumsum() / samples
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    audio = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 2.5 * t))
+    audio = audio * envelope + rng.normal(0, 0.05, samples)
+    return (audio / np.max(np.abs(audio))).astype(np.float32)
+
+
+def _conversations(users: int, conversations: int, seed: int, start_user: int = 0):
+    rng = random.Random(seed + start_user)
+    corpus = message_corpus(users * conversations, seed + start_user)
+    started = datetime(2024, 1, 1)
+    for u in range(start_user, start_user + users):
+        user_id = f"bench_user_{u}"
+        for c in range(conversations):
+            message, label = corpus[(u - start_user) * conversations + c]
+            crisis = [label] if label in ("high", "medium") else []
+            yield {
+                "user_id": user_id,
+                "timestamp": (started + timedelta(days=c * 365 / max(conversations, 1),
+                                                  minutes=rng.randrange(1440))).isoformat(),
+                "user_message": message,
+                "ora_response": rng.choice(RESPONSES),
+                "emotion": rng.choice(EMOTIONS),
+                "emotion_intensity": round(rng.random(), 2),
+                "crisis_indicators": crisis
+            }
+
+
+def populate_memory_db(users: int, conversations: int, seed: int = 17, start_user: int = 0,
+                       cognee_store=None) -> Dict[str, int]:
+    """
+    Insert users x conversations into the memory-api database (DB_PATH, so set
+    ORA_MEMORY_DB_PATH first), then rebuild the derived tables the routes read:
+    daily rollups, emotion aggregates and - if given - the local Cognee store
+    """
+    from src.database import get_db_connection
+    from src import progress_analytics
+    from src.emotion_aggregates import emotion_aggregates
+
+    rows = list(_conversations(users, conversations, seed, start_user))
+    now = datetime.now().isoformat()
+    conn = get_db_connection()
+    try:
+        conn.executemany('''
+            INSERT OR REPLACE INTO users (user_id, name, personality_type, communication_style,
+                                          first_visit, last_visit, onboarding_complete, total_conversations)
+            VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+        ''', [(f"bench_user_{u}", f"User {u}", "introvert", "gentle", now, now, conversations)
+              for u in range(start_user, start_user + users)])
+        conn.executemany('''
+            INSERT INTO conversations (user_id, timestamp, user_message, ora_response, emotion,
+                                       emotion_intensity, topic, session_id, crisis_indicators)
+            VALUES (?, ?, ?, ?, ?, ?, 'general', 'bench', ?)
+        ''', [(r["user_id"], r["timestamp"], r["user_message"], r["ora_response"], r["emotion"],
+               r["emotion_intensity"], json.dumps(r["crisis_indicators"])) for r in rows])
+        conn.commit()
+    finally:
+        conn.close()
+
+    progress_analytics.rebuild_rollups()
+    for r in rows:
+        emotion_aggregates.record(r["user_id"], r["emotion"], r["emotion_intensity"],
+                                  r["timestamp"], r["crisis_indicators"])
+    if cognee_store is not None:
+        # Same document shape as CogneeService.store_conversation
+        cognee_store.add_many([
+            (f"{r['user_message']}\n{r['ora_response']}", r["user_id"], {
+                "user_id": r["user_id"], "timestamp": r["timestamp"], "user_message": r["user_message"],
+                "ai_response": r["ora_response"], "emotion": r["emotion"],
+                "emotion_intensity": r["emotion_intensity"], "crisis_indicators": r["crisis_indicators"],
+                "conversation_type": "therapeutic_chat"
+            })
+            for r in rows
+        ])
+    return {"users": users, "conversations": len(rows)}
+
+
+def populate_therapeutic_db(service, users: int, conversations: int, seed: int = 17,
+                            start_user: int = 0) -> int:
+    """Store conversations through SimplifiedTherapeuticService so its profiles stay consistent"""
+    count = 0
+    for r in _conversations(users, conversations, seed, start_user):
+        level = r["crisis_indicators"][0] if r["crisis_indicators"] else "low"
+        service._store_therapeutic_conversation(r["user_id"], r["user_message"], r["emotion"], level)
+        count += 1
+    service.storage.flush()
+    return count
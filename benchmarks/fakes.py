@@ -0,0 +1,179 @@
+"""
+In-process stand-ins for the external services, for load tests and benchmarks
+without network access or API keys:
+- FakeCognee: the `cognee` module API the Cognee service uses (add, cognify, search)
+- FakeMemory: the mem0 Memory API ORAMem0Service uses (add, search, get_all)
+- chat completions: fake_llm_server.FakeLLMServer with a sampled latency
+Each call sleeps for a latency drawn from a LatencyModel and fails at its error rate.
+"""
+import time
+import uuid
+import random
+import asyncio
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+
+class FakeServiceError(Exception):
+    """Injected failure from a fake backend"""
+
+
+class LatencyModel:
+    """
+    Latency distribution from a spec string (seconds):
+        const:0.05              always 50ms
+        uniform:0.01,0.2        uniform between 10ms and 200ms
+        normal:0.08,0.02        mean 80ms, std 20ms (clamped at 0)
+        lognormal:0.05,0.6      median 50ms, sigma 0.6 - a realistic long tail
+    An optional "@0.02" suffix adds an error rate, e.g. "lognormal:0.05,0.6@0.02"
+    """
+
+    def __init__(self, spec: str = "const:0", seed: Optional[int] = None):
+        self.spec = spec
+        spec, _, error_rate = spec.partition("@")
+        kind, _, args = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.args = [float(a) for a in args.split(",") if a.strip()] or [0.0]
+        self.error_rate = float(error_rate) if error_rate else 0.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        if self.kind not in ("const", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution '{self.kind}' in '{self.spec}'")
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == "uniform":
+                return self._rng.uniform(self.args[0], self.args[1])
+            if self.kind == "normal":
+                return max(0.0, self._rng.gauss(self.args[0], self.args[1]))
+            if self.kind == "lognormal":
+                # median * e^(sigma * z): the median stays the first parameter
+                return self._rng.lognormvariate(0.0, self.args[1]) * self.args[0]
+            return self.args[0]
+
+    def fails(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def __call__(self) -> float:
+        return self.sample()
+
+    def __repr__(self) -> str:
+        return f"LatencyModel({self.spec!r})"
+
+
+class _Calls:
+    """Per-operation call, failure and simulated-latency counters shared by the fakes"""
+
+    def __init__(self):
+        self.counts: Dict[str, Dict[str, float]] = defaultdict(lambda: {"calls": 0, "errors": 0, "latency_s": 0.0})
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, latency: float, failed: bool):
+        with self._lock:
+            entry = self.counts[operation]
+            entry["calls"] += 1
+            entry["latency_s"] += latency
+            if failed:
+                entry["errors"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {op: {"calls": e["calls"], "errors": e["errors"],
+                         "mean_latency_ms": round(e["latency_s"] / e["calls"] * 1000, 2) if e["calls"] else 0.0}
+                    for op, e in self.counts.items()}
+
+
+class _Result:
+    """What cognee.search returns: objects exposing the stored document as `.payload`"""
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+
+
+class FakeCognee:
+    """Async cognee module stand-in; documents are kept per user, newest first"""
+
+    def __init__(self, search_latency: LatencyModel, add_latency: LatencyModel = None,
+                 cognify_latency: LatencyModel = None, max_documents_per_user: int = 1000):
+        self.search_latency = search_latency
+        self.add_latency = add_latency or LatencyModel("const:0")
+        self.cognify_latency = cognify_latency or LatencyModel("const:0")
+        self.documents: Dict[str, Deque[Dict]] = defaultdict(lambda: deque(maxlen=max_documents_per_user))
+        self.calls = _Calls()
+
+    async def _simulate(self, operation: str, model: LatencyModel):
+        latency, failed = model.sample(), model.fails()
+        self.calls.record(operation, latency, failed)
+        await asyncio.sleep(latency)
+        if failed:
+            raise FakeServiceError(f"fake cognee {operation} failed")
+
+    async def add(self, documents: List[Dict]):
+        await self._simulate("add", self.add_latency)
+        for document in documents:
+            self.documents[document.get("user_id", "")].appendleft(document)
+
+    async def cognify(self):
+        await self._simulate("cognify", self.cognify_latency)
+
+    async def search(self, search_type: str, query: str) -> List[_Result]:
+        await self._simulate("search", self.search_latency)
+        # The service's query names the user; answer with that user's documents
+        for token in query.split():
+            if token in self.documents:
+                return [_Result(d) for d in self.documents[token]]
+        return []
+
+    def add_many(self, items: List[tuple]):
+        """Preload [(text, user_id, document)] without simulated latency (LocalMemoryStore's signature)"""
+        for _, user_id, document in items:
+            self.documents[user_id].appendleft({"user_id": user_id, **document})
+
+
+class FakeMemory:
+    """mem0 Memory stand-in (the subset ORAMem0Service calls); blocking, like the real client"""
+
+    def __init__(self, search_latency: LatencyModel, add_latency: LatencyModel,
+                 max_memories_per_user: int = 1000):
+        self.search_latency = search_latency
+        self.add_latency = add_latency
+        self.memories: Dict[str, Deque[Dict]] = defaultdict(lambda: deque(maxlen=max_memories_per_user))
+        self._lock = threading.Lock()
+        self.calls = _Calls()
+
+    def _simulate(self, operation: str, model: LatencyModel):
+        latency, failed = model.sample(), model.fails()
+        self.calls.record(operation, latency, failed)
+        time.sleep(latency)
+        if failed:
+            raise FakeServiceError(f"fake mem0 {operation} failed")
+
+    def add(self, messages: List[Dict], user_id: str, metadata: Dict = None) -> Dict[str, Any]:
+        self._simulate("add", self.add_latency)
+        results = []
+        with self._lock:
+            for message in messages:
+                if message.get("content"):
+                    memory = {"id": str(uuid.uuid4()), "memory": message["content"], "metadata": metadata or {},
+                              "created_at": datetime.now().isoformat()}
+                    self.memories[user_id].appendleft(memory)
+                    results.append({"id": memory["id"], "event": "ADD"})
+        return {"id": results[0]["id"] if results else None, "results": results}
+
+    def search(self, query: str, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        self._simulate("search", self.search_latency)
+        words = set(query.lower().split())
+        with self._lock:
+            memories = list(self.memories.get(user_id, ()))
+        scored = [(len(words & set(m["memory"].lower().split())) / (len(words) or 1), m) for m in memories]
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [{**memory, "score": round(score, 4)} for score, memory in scored[:limit]]
+
+    def get_all(self, user_id: str, limit: int = 100) -> Dict[str, Any]:
+        self._simulate("get_all", self.search_latency)
+        with self._lock:
+            return {"results": list(self.memories.get(user_id, ()))[:limit]}
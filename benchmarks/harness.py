@@ -0,0 +1,147 @@
+"""
+Timing harness for the ORA benchmark suite: repeated measurements with
+warmup, percentile summaries, JSON results and comparison against a stored
+baseline (a regression is a p50 that grew by more than the threshold).
+"""
+import json
+import time
+import platform
+import subprocess
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class BenchResult:
+    name: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    iterations: int = 0
+    mean_ms: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    min_ms: float = 0.0
+    ops_per_sec: float = 0.0
+    skipped: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """Stable identity across runs: the name plus its parameters"""
+        if not self.params:
+            return self.name
+        return self.name + "[" + ",".join(f"{k}={v}" for k, v in sorted(self.params.items())) + "]"
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def measure(fn: Callable[[int], Any], iterations: int, warmup: int = 3) -> List[float]:
+    """Seconds per call; fn gets the iteration index so it can vary its input"""
+    for i in range(warmup):
+        fn(i)
+    timings = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        fn(i)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summarize(name: str, timings: List[float], params: Dict[str, Any] = None) -> BenchResult:
+    ordered = sorted(timings)
+    total = sum(ordered)
+    return BenchResult(
+        name=name,
+        params=params or {},
+        iterations=len(ordered),
+        mean_ms=round(total / len(ordered) * 1000, 4),
+        p50_ms=round(percentile(ordered, 0.50) * 1000, 4),
+        p95_ms=round(percentile(ordered, 0.95) * 1000, 4),
+        p99_ms=round(percentile(ordered, 0.99) * 1000, 4),
+        min_ms=round(ordered[0] * 1000, 4),
+        ops_per_sec=round(len(ordered) / total, 1) if total else 0.0
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+class Harness:
+    def __init__(self, iterations: int = 200, warmup: int = 3, only: Optional[List[str]] = None,
+                 verbose: bool = True):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.only = only
+        self.verbose = verbose
+        self.results: List[BenchResult] = []
+
+    def selected(self, name: str) -> bool:
+        return not self.only or any(pattern in name for pattern in self.only)
+
+    def run(self, name: str, fn: Callable[[int], Any], iterations: int = None, **params) -> Optional[BenchResult]:
+        if not self.selected(name):
+            return None
+        timings = measure(fn, iterations or self.iterations, self.warmup)
+        result = summarize(name, timings, params)
+        self.results.append(result)
+        if self.verbose:
+            print(f"  {result.key:<74} p50 {result.p50_ms:>9.3f}ms  p95 {result.p95_ms:>9.3f}ms"
+                  f"  {result.ops_per_sec:>10.1f} ops/s")
+        return result
+
+    def skip(self, name: str, reason: str, **params):
+        if not self.selected(name):
+            return
+        result = BenchResult(name=name, params=params, skipped=reason)
+        self.results.append(result)
+        if self.verbose:
+            print(f"  {result.key:<74} skipped: {reason}")
+
+    def to_dict(self, config: Dict[str, Any] = None) -> Dict[str, Any]:
+        return {
+            "meta": {
+                "timestamp": datetime.now().isoformat(),
+                "git_commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "config": config or {}
+            },
+            "results": [asdict(result) for result in self.results]
+        }
+
+    def save(self, path: str, config: Dict[str, Any] = None):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(config), f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, BenchResult]:
+    with open(path) as f:
+        data = json.load(f)
+    results = (BenchResult(**entry) for entry in data["results"])
+    return {result.key: result for result in results}
+
+
+def compare(current: List[BenchResult], baseline: Dict[str, BenchResult],
+            threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """Per-benchmark p50 change vs the baseline; `regression` when slower by more than threshold"""
+    rows = []
+    for result in current:
+        before = baseline.get(result.key)
+        if result.skipped or before is None or before.skipped or not before.p50_ms:
+            continue
+        change = (result.p50_ms - before.p50_ms) / before.p50_ms
+        rows.append({
+            "benchmark": result.key,
+            "baseline_p50_ms": before.p50_ms,
+            "p50_ms": result.p50_ms,
+            "change": round(change, 4),
+            "regression": change > threshold
+        })
+    return rows
@@ -0,0 +1,281 @@
+"""
+Load test: mixed traffic against the memory-api and mem0 Flask apps, with
+Cognee, mem0 and chat completions replaced by in-process fakes
+Usage: python benchmarks/loadtest.py --duration 30 --concurrency 16 \\
+           --mix get-context=30,save=20,search=10,cognee-context=10,unified=10,mem0-store=10,mem0-context=10 \\
+           --cognee-latency lognormal:0.05,0.6 --mem0-search-latency lognormal:0.08,0.5@0.01
+
+Workers are closed-loop threads (each sends its next request when the last
+one returns, after --think-time). Latencies are "kind:args[@error_rate]"
+specs, see benchmarks/fakes.py. The report gives throughput, p50/p95/p99 and
+error rate per operation, the fakes' call counts and the circuit breaker
+states at the end of the run.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORK_DIR = tempfile.mkdtemp(prefix="ora_loadtest_")
+os.environ["ORA_MEMORY_DB_PATH"] = os.path.join(WORK_DIR, "ora_memory.db")
+os.environ["ORA_THERAPEUTIC_DB_PATH"] = os.path.join(WORK_DIR, "ora_therapeutic.db")
+os.environ["ORA_LOCAL_MEMORY_PATH"] = os.path.join(WORK_DIR, "local_memory")
+os.environ["ORA_OUTBOX_PATH"] = os.path.join(WORK_DIR, "outbox")
+# Import-time setup takes the local path; the fakes are swapped in afterwards
+os.environ["ORA_MEMORY_BACKEND"] = "local"
+os.environ.setdefault("ORA_TRACE_EXPORT", "none")
+
+sys.path.insert(0, ROOT)
+sys.path.insert(1, os.path.join(ROOT, "memory-api"))
+
+import logging  # noqa: E402
+
+from fakes import FakeCognee, FakeMemory, LatencyModel  # noqa: E402
+from datagen import message_corpus, populate_memory_db  # noqa: E402
+from harness import percentile  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+# name -> (app, method, path, payload(user_id, message))
+OPERATIONS = {
+    "get-context": ("memory", "POST", "/api/memory/get-context", lambda u, m: {"user_id": u}),
+    "save": ("memory", "POST", "/api/memory/save-conversation", lambda u, m: {
+        "user_id": u, "user_message": m, "ora_response": "Thank you for telling me.",
+        "emotion": "anxious", "emotion_intensity": 0.6}),
+    "search": ("memory", "POST", "/api/memory/search-conversations",
+               lambda u, m: {"user_id": u, "query": m.split()[0], "limit": 10}),
+    "stats": ("memory", "POST", "/api/memory/get-stats", lambda u, m: {"user_id": u}),
+    "cognee-context": ("memory", "POST", "/api/enhanced/cognee/context", lambda u, m: {"user_id": u, "limit": 10}),
+    "cognee-store": ("memory", "POST", "/api/enhanced/cognee/store", lambda u, m: {"user_id": u, "conversation_data": {
+        "user_message": m, "ai_response": "I hear you.", "emotion": "sad", "emotion_intensity": 0.7}}),
+    "insights": ("memory", "POST", "/api/enhanced/therapeutic/insights", lambda u, m: {"user_id": u}),
+    "crisis": ("memory", "POST", "/api/enhanced/crisis/assess", lambda u, m: {"user_id": u, "message": m}),
+    "respond": ("memory", "POST", "/api/enhanced/therapeutic/respond",
+                lambda u, m: {"user_id": u, "message": m, "emotion": "anxious"}),
+    "unified": ("memory", "POST", "/api/context/unified", lambda u, m: {"user_id": u, "message": m}),
+    "mem0-store": ("mem0", "POST", "/api/ora/mem0/store", lambda u, m: {"user_id": u, "message": m}),
+    "mem0-context": ("mem0", "POST", "/api/ora/mem0/context", lambda u, m: {"user_id": u, "message": m}),
+    "make-enhanced": ("mem0", "POST", "/api/make/ora/memory-enhanced", lambda u, m: {
+        "user_id": u, "user_message": m, "ai_response": "I hear you.", "emotional_tone": "anxious"}),
+}
+DEFAULT_MIX = "get-context=30,save=20,search=10,cognee-context=10,unified=10,mem0-store=10,mem0-context=10"
+
+
+def parse_mix(spec: str):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def build_apps(args):
+    """Both Flask apps wired to the fakes; returns (apps, fakes)"""
+    from flask import Flask
+    from fake_llm_server import FakeLLMServer
+    from llm_client import llm_client
+    from ora_mem0_service import mem0_service
+    from ora_adapted_mem0_routes import register_ora_mem0_routes
+    from src import cognee_service as cognee_module
+    from src.main import app as memory_app, init_db
+
+    fake_cognee = FakeCognee(LatencyModel(args.cognee_latency, args.seed),
+                             LatencyModel(args.cognee_add_latency, args.seed + 1),
+                             LatencyModel(args.cognify_latency, args.seed + 2))
+    cognee_module.cognee = fake_cognee
+    cognee_module.cognee_service.local_store = None
+
+    fake_memory = FakeMemory(LatencyModel(args.mem0_search_latency, args.seed + 3),
+                             LatencyModel(args.mem0_add_latency, args.seed + 4))
+    mem0_service.memory_factory = lambda: fake_memory
+    mem0_service.wait_until_ready(timeout=10)
+
+    llm_latency = LatencyModel(args.llm_latency, args.seed + 5)
+    llm_server = FakeLLMServer(port=_free_port(), latency=llm_latency, fail_rate=llm_latency.error_rate)
+    llm_client.base_url = llm_server.start()
+
+    init_db()
+    populate_memory_db(args.users, args.history, args.seed, cognee_store=fake_cognee)
+
+    mem0_app = Flask("ora_mem0_loadtest")
+    register_ora_mem0_routes(mem0_app)
+    apps = {"memory": memory_app, "mem0": mem0_app}
+    return apps, {"cognee": fake_cognee, "mem0": fake_memory, "llm": llm_server}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, latency: float, status: str, ok: bool):
+        with self._lock:
+            self.latencies[operation].append(latency)
+            self.statuses[operation][status] += 1
+            if not ok:
+                self.errors[operation] += 1
+
+
+def worker(index: int, apps, mix, args, corpus, stop_at: float, budget, recorder: Recorder):
+    rng = random.Random(args.seed * 1000 + index)
+    clients = {name: app.test_client() for name, app in apps.items()}
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < stop_at:
+        if budget is not None:
+            with budget["lock"]:
+                if budget["left"] <= 0:
+                    return
+                budget["left"] -= 1
+        operation = rng.choices(names, weights)[0]
+        app_name, method, path, payload = OPERATIONS[operation]
+        user_id = f"bench_user_{rng.randrange(args.users)}"
+        message = corpus[rng.randrange(len(corpus))][0]
+        started = time.perf_counter()
+        try:
+            response = clients[app_name].open(path, method=method, json=payload(user_id, message))
+            status = str(response.status_code)
+            ok = response.status_code < 400
+        except Exception as e:
+            status, ok = type(e).__name__, False
+        recorder.record(operation, time.perf_counter() - started, status, ok)
+        if args.think_time:
+            time.sleep(rng.expovariate(1 / args.think_time))
+
+
+def summarize(recorder: Recorder, elapsed: float):
+    operations = {}
+    total = errors = 0
+    for operation, latencies in sorted(recorder.latencies.items()):
+        ordered = sorted(latencies)
+        count = len(ordered)
+        total += count
+        errors += recorder.errors[operation]
+        operations[operation] = {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 1),
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+            "error_rate": round(recorder.errors[operation] / count, 4),
+            "statuses": dict(recorder.statuses[operation])
+        }
+    everything = sorted(l for latencies in recorder.latencies.values() for l in latencies)
+    overall = {
+        "requests": total,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0
+    }
+    if everything:
+        overall.update({
+            "p50_ms": round(percentile(everything, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(everything, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(everything, 0.99) * 1000, 2)
+        })
+    return overall, operations
+
+
+def print_report(config, overall, operations, fakes, fakes_llm_requests, breakers):
+    mix = ",".join(f"{name}={weight:g}" for name, weight in config["mix"].items())
+    print(f"\nConcurrency {config['concurrency']}, {overall['elapsed_s']}s, mix {mix}")
+    print(f"{'operation':<16}{'requests':>10}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for name, op in operations.items():
+        print(f"{name:<16}{op['requests']:>10}{op['throughput_rps']:>9.1f}{op['p50_ms']:>10.1f}"
+              f"{op['p95_ms']:>10.1f}{op['p99_ms']:>10.1f}{op['error_rate']:>9.1%}")
+    print(f"{'total':<16}{overall['requests']:>10}{overall['throughput_rps']:>9.1f}{overall.get('p50_ms', 0):>10.1f}"
+          f"{overall.get('p95_ms', 0):>10.1f}{overall.get('p99_ms', 0):>10.1f}{overall['error_rate']:>9.1%}")
+    print("\nFake backend calls:")
+    for backend, stats in fakes.items():
+        for operation, entry in stats.items():
+            print(f"  {backend}.{operation:<12} {entry['calls']:>8} calls  {entry['errors']:>6} errors"
+                  f"  mean {entry['mean_latency_ms']:.1f}ms")
+    print(f"  llm.chat         {fakes_llm_requests:>8} calls")
+    opened = {name: b["state"] for name, b in breakers.items() if b["opened"]}
+    print(f"Circuit breakers opened during run: {opened or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation=weight,... (" + ", ".join(OPERATIONS) + ")")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests instead")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds between a worker's requests")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--history", type=int, default=20, help="seeded conversations per user")
+    parser.add_argument("--cognee-latency", default="lognormal:0.05,0.6", help="cognee.search")
+    parser.add_argument("--cognee-add-latency", default="lognormal:0.02,0.4")
+    parser.add_argument("--cognify-latency", default="lognormal:0.3,0.5")
+    parser.add_argument("--mem0-search-latency", default="lognormal:0.08,0.5", help="Memory.search / get_all")
+    parser.add_argument("--mem0-add-latency", default="lognormal:0.4,0.5", help="Memory.add")
+    parser.add_argument("--llm-latency", default="lognormal:0.8,0.4", help="chat completions")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", default=None, help="write the report to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    llm_server = None
+    try:
+        print(f"Seeding {args.users} users x {args.history} conversations...")
+        apps, fakes = build_apps(args)
+        llm_server = fakes["llm"]
+        from resilience import breaker_states
+
+        corpus = message_corpus(1000, args.seed)
+        recorder = Recorder()
+        budget = {"left": args.requests, "lock": threading.Lock()} if args.requests else None
+        duration = args.duration if not args.requests else float("inf")
+        print(f"Running {args.concurrency} workers for "
+              f"{f'{args.requests} requests' if args.requests else f'{args.duration:.0f}s'}...")
+
+        started = time.perf_counter()
+        stop_at = started + duration
+        threads = [threading.Thread(target=worker, args=(i, apps, mix, args, corpus, stop_at, budget, recorder),
+                                    daemon=True) for i in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        overall, operations = summarize(recorder, elapsed)
+        fake_stats = {"cognee": fakes["cognee"].calls.stats(), "mem0": fakes["mem0"].calls.stats()}
+        config = {**vars(args), "mix": mix}
+        breakers = breaker_states()
+        print_report(config, overall, operations, fake_stats, llm_server.requests, breakers)
+
+        if args.json_out:
+            with open(args.json_out, "w") as f:
+                json.dump({"config": config, "overall": overall, "operations": operations,
+                           "fakes": {**fake_stats, "llm": {"chat": {"calls": llm_server.requests}}},
+                           "breakers": breakers}, f, indent=2, default=str)
+            print(f"Report: {args.json_out}")
+    finally:
+        if llm_server is not None:
+            llm_server.stop()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Benchmark suite: audio features, MLP inference, every memory-api route, crisis
+detection, routing and therapeutic summaries across growing data sizes
+Usage: python benchmarks/run_benchmarks.py [--quick] [--sizes 10x20,100x50]
+                                           [--only routes,crisis] [--save-baseline]
+
+Each size is N users x M conversations of synthetic data (benchmarks/datagen.py)
+in throwaway databases; sizes grow cumulatively so the larger runs reuse the
+data of the smaller ones. Results go to --out as JSON and are compared with
+--baseline: a p50 more than --threshold slower is a regression (exit code 1).
+Everything runs against the local memory backend, so no network or API keys.
+"""
+import os
+import sys
+import json
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Every store the services open at import time must point at the scratch directory
+WORK_DIR = tempfile.mkdtemp(prefix="ora_bench_")
+os.environ["ORA_MEMORY_DB_PATH"] = os.path.join(WORK_DIR, "ora_memory.db")
+os.environ["ORA_THERAPEUTIC_DB_PATH"] = os.path.join(WORK_DIR, "ora_therapeutic.db")
+os.environ["ORA_LOCAL_MEMORY_PATH"] = os.path.join(WORK_DIR, "local_memory")
+os.environ["ORA_OUTBOX_PATH"] = os.path.join(WORK_DIR, "outbox")
+os.environ["ORA_MEMORY_BACKEND"] = "local"
+os.environ.setdefault("ORA_TRACE_EXPORT", "none")
+
+sys.path.insert(0, ROOT)
+sys.path.insert(1, os.path.join(ROOT, "memory-api"))
+
+import logging  # noqa: E402
+
+from harness import Harness, compare, load_results  # noqa: E402
+from datagen import message_corpus, populate_memory_db, populate_therapeutic_db, synthetic_clip  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+
+def parse_sizes(spec: str):
+    sizes = []
+    for part in spec.split(","):
+        users, conversations = part.lower().split("x")
+        sizes.append((int(users), int(conversations)))
+    return sizes
+
+
+# 📌 Audio and model
+def bench_audio(harness: Harness, clip_seconds):
+    try:
+        from prototype import extract_feature
+    except ImportError as e:
+        for seconds in clip_seconds:
+            harness.skip("audio.extract_feature", f"librosa unavailable ({e})", clip_s=seconds)
+        return
+    for seconds in clip_seconds:
+        clip = synthetic_clip(seconds)
+        harness.run("audio.extract_feature", lambda i: extract_feature(clip, 44100),
+                    iterations=max(5, harness.iterations // 20), clip_s=seconds)
+
+
+def bench_mlp(harness: Harness):
+    try:
+        import numpy as np
+        from sklearn.neural_network import MLPClassifier
+    except ImportError as e:
+        harness.skip("model.mlp_inference", f"scikit-learn unavailable ({e})")
+        return
+    # Same shape as train_model.py: 180 features, (128, 64) hidden layers, 8 emotions
+    rng = np.random.default_rng(0)
+    model = MLPClassifier(hidden_layer_sizes=(128, 64), max_iter=20)
+    model.fit(rng.normal(size=(400, 180)), rng.integers(0, 8, 400))
+    features = rng.normal(size=(64, 180))
+    harness.run("model.mlp_inference", lambda i: model.predict_proba(features[i % 64:i % 64 + 1]))
+
+
+# 📌 Crisis detection and routing
+def bench_crisis_and_routing(harness: Harness, corpus):
+    from memory_router import MemoryRouter
+    from ora_mem0_service import mem0_service
+    from src.cognee_service import cognee_service
+
+    messages = [message for message, _ in corpus]
+    n = len(messages)
+    harness.run("crisis.detect_crisis_indicators",
+                lambda i: asyncio.run(cognee_service.detect_crisis_indicators(messages[i % n], {})))
+    harness.run("routing.is_therapeutic_content[warm]",
+                lambda i: mem0_service.is_therapeutic_content(messages[i % 64]))
+    uncached = MemoryRouter(cache_size=0)
+    harness.run("routing.is_therapeutic_content[cold]", lambda i: uncached.route(messages[i % n]))
+
+
+# 📌 memory-api routes
+ROUTES = [
+    ("/api/memory/get-context", lambda user, message: {"user_id": user}),
+    ("/api/memory/save-conversation", lambda user, message: {
+        "user_id": user, "user_message": message, "ora_response": "Thank you for telling me.",
+        "emotion": "sad", "emotion_intensity": 0.6}),
+    ("/api/memory/update-profile", lambda user, message: {"user_id": user, "communication_style": "direct"}),
+    ("/api/memory/get-stats", lambda user, message: {"user_id": user}),
+    ("/api/memory/search-conversations", lambda user, message: {"user_id": user, "query": "work", "limit": 10}),
+    ("/api/enhanced/cognee/context", lambda user, message: {"user_id": user, "limit": 10}),
+    ("/api/enhanced/cognee/store", lambda user, message: {"user_id": user, "conversation_data": {
+        "user_message": message, "ai_response": "I hear you.", "emotion": "anxious", "emotion_intensity": 0.7}}),
+    ("/api/enhanced/therapeutic/insights", lambda user, message: {"user_id": user}),
+    ("/api/enhanced/therapeutic/progress", lambda user, message: {"user_id": user, "timeframe_days": 30}),
+    ("/api/enhanced/crisis/assess", lambda user, message: {"user_id": user, "message": message}),
+    ("/api/enhanced/exercises/get", lambda user, message: {"user_id": user, "emotion": "anxious"}),
+    ("/api/enhanced/checkin/generate", lambda user, message: {"user_id": user}),
+    ("/api/enhanced/analytics/emotional-patterns", lambda user, message: {"user_id": user, "timeframe_days": 30}),
+    ("/api/context/unified", lambda user, message: {"user_id": user, "message": message}),
+    ("/api/enhanced/cache/stats", None),
+    ("/api/enhanced/health", None),
+]
+
+
+def bench_routes(harness: Harness, client, users: int, corpus, params):
+    # The LLM-backed respond routes are excluded: they would measure the provider, not ORA
+    n = len(corpus)
+    for path, payload in ROUTES:
+        name = "route" + path
+        if not harness.selected(name):
+            continue
+
+        def call(i, path=path, payload=payload):
+            if payload is None:
+                response = client.get(path)
+            else:
+                response = client.post(path, json=payload(f"bench_user_{i % users}", corpus[i % n][0]))
+            if response.status_code >= 500:
+                raise RuntimeError(f"{path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+        harness.run(name, call, **params)
+
+
+def bench_therapeutic_summary(harness: Harness, service, users: int, params):
+    harness.run("therapeutic.get_user_therapeutic_summary",
+                lambda i: service.get_user_therapeutic_summary(f"bench_user_{i % users}"), **params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10x20,100x50,500x100", help="users x conversations, cumulative")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--clip-seconds", default="1,5,15")
+    parser.add_argument("--quick", action="store_true", help="small sizes and few iterations (smoke run)")
+    parser.add_argument("--only", default="", help="comma-separated substrings of benchmark names")
+    parser.add_argument("--out", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="also write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p50 slowdown that counts as a regression")
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    if args.quick:
+        args.sizes, args.iterations, args.clip_seconds = "5x10,20x20", 30, "1"
+    sizes = parse_sizes(args.sizes)
+    clip_seconds = [float(s) for s in args.clip_seconds.split(",")]
+    harness = Harness(iterations=args.iterations, only=[s for s in args.only.split(",") if s])
+
+    from src.main import app, init_db
+    from src.cognee_service import cognee_service
+    from therapeutic_storage import TherapeuticStorage
+    from simplified_therapeutic_service import SimplifiedTherapeuticService
+
+    config = {"sizes": args.sizes, "iterations": args.iterations, "clip_seconds": clip_seconds, "seed": args.seed}
+    try:
+        print("Audio and model")
+        bench_audio(harness, clip_seconds)
+        bench_mlp(harness)
+
+        print("Crisis detection and routing")
+        bench_crisis_and_routing(harness, message_corpus(2000, args.seed))
+
+        init_db()
+        client = app.test_client()
+        therapeutic = SimplifiedTherapeuticService(
+            storage=TherapeuticStorage(os.path.join(WORK_DIR, "bench_therapeutic.db"), batch_writes=False))
+        corpus = message_corpus(500, args.seed + 1)
+        loaded_users = loaded_per_user = 0
+        for users, conversations in sizes:
+            # Top up to users x conversations: existing users get the missing history, new users all of it
+            extra = conversations - loaded_per_user
+            if loaded_users and extra > 0:
+                populate_memory_db(loaded_users, extra, args.seed + conversations, 0, cognee_service.local_store)
+                populate_therapeutic_db(therapeutic, loaded_users, extra, args.seed + conversations, 0)
+            if users > loaded_users:
+                populate_memory_db(users - loaded_users, conversations, args.seed, loaded_users,
+                                   cognee_service.local_store)
+                populate_therapeutic_db(therapeutic, users - loaded_users, conversations, args.seed, loaded_users)
+            loaded_users, loaded_per_user = max(users, loaded_users), max(conversations, loaded_per_user)
+
+            params = {"users": users, "conversations": conversations}
+            print(f"Data size {users} users x {conversations} conversations")
+            bench_therapeutic_summary(harness, therapeutic, users, params)
+            bench_routes(harness, client, users, corpus, params)
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    harness.save(args.out, config)
+    print(f"Results: {args.out}")
+    if args.save_baseline:
+        harness.save(args.baseline, config)
+        print(f"Baseline saved: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline to create one)")
+        return 0
+    rows = compare(harness.results, load_results(args.baseline), args.threshold)
+    regressions = [row for row in rows if row["regression"]]
+    print(f"\nvs baseline ({len(rows)} comparable, threshold +{args.threshold:.0%} p50):")
+    for row in sorted(rows, key=lambda r: r["change"], reverse=True):
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"  {row['benchmark']:<74} {row['baseline_p50_ms']:>9.3f} -> {row['p50_ms']:>9.3f}ms "
+              f"{row['change']:>+8.1%} {flag}")
+    print(json.dumps({"regressions": len(regressions)}))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Conversation Manager for ORA Emotion System
+Token-budgeted chat prompts: token counts are tracked incrementally, recent
+turns stay verbatim in a sliding window and older turns are folded into a
+rolling summary. The same budgeting trims memory context (see
+ORAMem0Service.get_context) so every prompt stays within a fixed size.
+"""
+import os
+import re
+import math
+import logging
+from collections import deque
+from typing import Callable, Deque, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("ORA_CONTEXT_TOKEN_BUDGET", "3000"))
+DEFAULT_SUMMARY_TOKENS = int(os.getenv("ORA_SUMMARY_TOKEN_BUDGET", "300"))
+DEFAULT_MEMORY_TOKENS = int(os.getenv("ORA_MEMORY_TOKEN_BUDGET", "500"))
+SUMMARY_HEADER = "Earlier in this conversation:"
+MESSAGE_OVERHEAD = 4  # role/separator tokens per chat message
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken not installed or encoding unavailable offline
+    _encoding = None
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Exact count with tiktoken when available, otherwise ~4 characters per token"""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def message_tokens(message: Dict) -> int:
+    return MESSAGE_OVERHEAD + estimate_tokens(message.get("content", ""))
+
+
+def fit_lines(lines: List[str], max_tokens: int) -> List[str]:
+    """Keep lines in order (most relevant first) until the token budget runs out"""
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def extractive_summary(message: Dict, max_chars: int = 160) -> str:
+    """Default summarizer: the first sentence of an evicted turn, truncated"""
+    content = " ".join(message.get("content", "").split())
+    first = _SENTENCE_RE.split(content, 1)[0]
+    if len(first) > max_chars:
+        first = first[:max_chars - 1].rstrip() + "…"
+    speaker = "User" if message.get("role") == "user" else "Assistant"
+    return f"{speaker}: {first}"
+
+
+class ConversationManager:
+    """Sliding window of recent turns + rolling summary of older ones, within a token budget"""
+
+    def __init__(self, system_prompt: str, budget: int = DEFAULT_TOKEN_BUDGET,
+                 summary_budget: int = DEFAULT_SUMMARY_TOKENS, memory_budget: int = DEFAULT_MEMORY_TOKENS,
+                 min_recent: int = 4, summarizer: Callable[[Dict], str] = extractive_summary):
+        self.system_prompt = system_prompt
+        self.system_tokens = message_tokens({"content": system_prompt})
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.memory_budget = memory_budget  # reserved for memory context in build_messages
+        self.min_recent = min_recent
+        self.summarizer = summarizer
+
+        self.window: Deque[Tuple[Dict, int]] = deque()
+        self.window_tokens = 0
+        self.summary: Deque[Tuple[str, int]] = deque()
+        self.summary_tokens = 0
+        self.turns_summarized = 0
+
+    def add(self, role: str, content: str):
+        """Append a turn; each message is counted once and older turns are compacted as needed"""
+        message = {"role": role, "content": content}
+        tokens = message_tokens(message)
+        self.window.append((message, tokens))
+        self.window_tokens += tokens
+        self._compact()
+
+    def _available_for_window(self) -> int:
+        return self.budget - self.memory_budget - self.system_tokens - self._summary_cost()
+
+    def _summary_cost(self) -> int:
+        return self.summary_tokens + (estimate_tokens(SUMMARY_HEADER) + 2 if self.summary else 0)
+
+    def _compact(self):
+        while len(self.window) > self.min_recent and self.window_tokens > self._available_for_window():
+            message, tokens = self.window.popleft()
+            self.window_tokens -= tokens
+            self._summarize(message)
+
+    def _summarize(self, message: Dict):
+        line = self.summarizer(message)
+        cost = estimate_tokens(line) + 1
+        self.summary.append((line, cost))
+        self.summary_tokens += cost
+        self.turns_summarized += 1
+        # Rolling: the oldest summary lines go first once the summary outgrows its budget
+        while self.summary and self.summary_tokens > self.summary_budget:
+            _, dropped = self.summary.popleft()
+            self.summary_tokens -= dropped
+
+    @property
+    def total_tokens(self) -> int:
+        return self.system_tokens + self._summary_cost() + self.window_tokens
+
+    def build_messages(self, memory_context: str = "") -> List[Dict]:
+        """
+        Prompt for the next completion: system prompt (+ summary of earlier turns
+        + memory context trimmed to whatever budget is left) followed by the window
+        """
+        system = self.system_prompt
+        if self.summary:
+            system += f"\n\n{SUMMARY_HEADER}\n" + "\n".join(line for line, _ in self.summary)
+
+        if memory_context:
+            remaining = min(self.memory_budget, self.budget - self.total_tokens)
+            kept = fit_lines(memory_context.splitlines(), remaining)
+            if kept:
+                system += "\n\n" + "\n".join(kept)
+
+        return [{"role": "system", "content": system}] + [message for message, _ in self.window]
+
+    def stats(self) -> Dict:
+        return {
+            "budget": self.budget,
+            "total_tokens": self.total_tokens,
+            "window_turns": len(self.window),
+            "window_tokens": self.window_tokens,
+            "summary_lines": len(self.summary),
+            "summary_tokens": self.summary_tokens,
+            "turns_summarized": self.turns_summarized,
+            "exact_token_counts": _encoding is not None
+        }
@@ -0,0 +1,186 @@
+"""
+Crisis Risk Classifier for ORA Emotion System
+Hashed n-gram linear model loaded from a compact NumPy artifact (train with
+train_crisis_classifier.py). Scores run in microseconds on CPU and return
+temperature-calibrated probabilities alongside the keyword lexicon.
+"""
+import os
+import re
+import zlib
+import sqlite3
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CLASSES = ("low", "medium", "high")
+DEFAULT_MODEL_PATH = os.getenv(
+    "ORA_CRISIS_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "crisis_classifier.npz")
+)
+# Keyword-low messages are escalated to medium when P(medium) + P(high) reaches this
+ESCALATION_THRESHOLD = float(os.getenv("ORA_CRISIS_MODEL_ESCALATION", "0.8"))
+
+_TOKEN_RE = re.compile(r"[a-z']+")
+
+
+def hashed_features(text: str, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Signed feature hashing of word unigrams and bigrams -> (indices, signs)"""
+    tokens = _TOKEN_RE.findall(text.lower().replace("’", "'"))
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint32, count=len(grams))
+    indices = (hashes % n_features).astype(np.int64)
+    signs = np.where(hashes >> 31, 1.0, -1.0).astype(np.float32)
+    return indices, signs
+
+
+def batch_features(texts: List[str], n_features: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flattened features for a batch -> (row ids, indices, signs)"""
+    rows, indices, signs = [], [], []
+    for row, text in enumerate(texts):
+        idx, sgn = hashed_features(text, n_features)
+        rows.append(np.full(len(idx), row, dtype=np.int64))
+        indices.append(idx)
+        signs.append(sgn)
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.float32)
+    return np.concatenate(rows), np.concatenate(indices), np.concatenate(signs)
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+@dataclass
+class CrisisScore:
+    probabilities: Dict[str, float]
+    risk_level: str
+    at_risk_probability: float  # P(medium) + P(high)
+
+
+class CrisisClassifier:
+    """Linear softmax classifier over hashed n-grams with temperature calibration"""
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, temperature: float = 1.0):
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.temperature = float(temperature)
+        self.n_features = weights.shape[0]
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> "CrisisClassifier":
+        artifact = np.load(path)
+        if tuple(artifact["classes"]) != CLASSES:
+            raise ValueError(f"Unexpected classes in {path}: {artifact['classes']}")
+        return cls(artifact["weights"], artifact["bias"], float(artifact["temperature"]))
+
+    def save(self, path: str):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias,
+                            temperature=np.float32(self.temperature), classes=np.array(CLASSES))
+
+    def logits_batch(self, texts: List[str]) -> np.ndarray:
+        rows, indices, signs = batch_features(texts, self.n_features)
+        logits = np.tile(self.bias, (len(texts), 1))
+        np.add.at(logits, rows, self.weights[indices] * signs[:, None])
+        return logits
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        return softmax(self.logits_batch(texts) / self.temperature)
+
+    def score_batch(self, messages: List[str]) -> List[CrisisScore]:
+        probabilities = self.predict_proba(messages)
+        return [
+            CrisisScore(
+                probabilities={label: round(float(p), 4) for label, p in zip(CLASSES, row)},
+                risk_level=CLASSES[int(np.argmax(row))],
+                at_risk_probability=round(float(row[1] + row[2]), 4)
+            )
+            for row in probabilities
+        ]
+
+    def score(self, message: str) -> CrisisScore:
+        return self.score_batch([message])[0]
+
+
+class CrisisModelService:
+    """Optional model wrapper: scores are None when no trained artifact is available"""
+
+    def __init__(self, path: str = DEFAULT_MODEL_PATH):
+        self.model: Optional[CrisisClassifier] = None
+        self.is_ready = False
+        if os.path.exists(path):
+            try:
+                self.model = CrisisClassifier.load(path)
+                self.is_ready = True
+                logger.info(f"✅ Crisis classifier loaded ({self.model.n_features} features)")
+            except Exception as e:
+                logger.error(f"❌ Failed to load crisis classifier: {e}")
+
+    def score(self, message: str) -> Optional[CrisisScore]:
+        return self.model.score(message) if self.is_ready else None
+
+    def score_batch(self, messages: List[str]) -> Optional[List[CrisisScore]]:
+        return self.model.score_batch(messages) if self.is_ready else None
+
+    def should_escalate(self, score: Optional[CrisisScore]) -> bool:
+        return score is not None and score.at_risk_probability >= ESCALATION_THRESHOLD
+
+    def backtest(self, db_path: str, batch_size: int = 2048) -> Dict:
+        """Score historical therapeutic_conversations and compare with the stored crisis_level"""
+        if not self.is_ready:
+            return {"error": "Crisis classifier not loaded"}
+
+        conn = sqlite3.connect(db_path)
+        try:
+            cursor = conn.execute("SELECT message, crisis_level FROM therapeutic_conversations")
+            confusion = {stored: {predicted: 0 for predicted in CLASSES} for stored in CLASSES}
+            bins = np.zeros((10, 3))  # (count, confidence sum, correct) per confidence decile
+            total = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                probabilities = self.model.predict_proba([message or "" for message, _ in rows])
+                for (_, stored), row in zip(rows, probabilities):
+                    stored = stored if stored in CLASSES else "low"
+                    predicted = CLASSES[int(np.argmax(row))]
+                    confusion[stored][predicted] += 1
+                    confidence = float(row.max())
+                    b = min(int(confidence * 10), 9)
+                    bins[b] += (1, confidence, predicted == stored)
+                total += len(rows)
+        finally:
+            conn.close()
+
+        populated = bins[:, 0] > 0
+        ece = float(np.sum(
+            np.abs(bins[populated, 1] - bins[populated, 2]) / max(total, 1)
+        ))
+        agreement = sum(confusion[c][c] for c in CLASSES) / max(total, 1)
+        return {
+            "conversations": total,
+            "agreement_with_keyword_levels": round(agreement, 4),
+            "expected_calibration_error": round(ece, 4),
+            "confusion": confusion
+        }
+
+
+# Global instance
+crisis_model = CrisisModelService()
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+    from therapeutic_storage import DEFAULT_DB_PATH
+
+    parser = argparse.ArgumentParser(description="Back-test the crisis classifier on stored conversations")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    args = parser.parse_args()
+    print(json.dumps(crisis_model.backtest(args.db), indent=2))
@@ -0,0 +1,232 @@
+"""
+Crisis Event Pipeline for ORA Emotion System
+High/medium risk assessments are queued without blocking the response, recorded
+in crisis_interventions and fanned out to pluggable alert sinks (log, webhook,
+stub) by a background dispatcher with retry and exponential backoff
+"""
+import os
+import json
+import uuid
+import time
+import heapq
+import queue
+import random
+import threading
+import logging
+import urllib.request
+from datetime import datetime
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional
+
+from metrics import track_queue
+
+logger = logging.getLogger(__name__)
+
+ALERT_LEVELS = ("high", "medium")
+WEBHOOK_URL = os.getenv("ORA_CRISIS_WEBHOOK_URL")
+
+
+@dataclass
+class CrisisEvent:
+    user_id: str
+    risk_level: str
+    indicators: List[str]
+    actions_taken: List[str]
+    source: str
+    risk_probabilities: Optional[Dict[str, float]] = None
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+    event_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["timestamp"] = self.timestamp.isoformat()
+        return data
+
+
+class CrisisSink:
+    """Alert destination - send() raises on failure so the dispatcher can retry"""
+    name = "sink"
+
+    def send(self, event: CrisisEvent):
+        raise NotImplementedError
+
+
+class LogSink(CrisisSink):
+    name = "log"
+
+    def send(self, event: CrisisEvent):
+        logger.warning(f"🚨 Crisis event {event.event_id}: {event.risk_level} risk for user "
+                       f"{event.user_id} ({', '.join(event.indicators) or 'no indicators'})")
+
+
+class WebhookSink(CrisisSink):
+    """POSTs the event as JSON (message text is never included)"""
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 5.0, headers: Dict[str, str] = None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def send(self, event: CrisisEvent):
+        request = urllib.request.Request(
+            self.url, data=json.dumps(event.to_dict()).encode("utf-8"),
+            headers=self.headers, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status >= 300:
+                raise RuntimeError(f"Webhook returned HTTP {response.status}")
+
+
+class StubSink(CrisisSink):
+    """Collects events in memory; fails the first `fail_times` sends (for local testing)"""
+    name = "stub"
+
+    def __init__(self, fail_times: int = 0):
+        self.events: List[CrisisEvent] = []
+        self.attempts = 0
+        self.fail_times = fail_times
+
+    def send(self, event: CrisisEvent):
+        self.attempts += 1
+        if self.attempts <= self.fail_times:
+            raise RuntimeError("Stub sink failure")
+        self.events.append(event)
+
+
+def default_sinks() -> List[CrisisSink]:
+    sinks: List[CrisisSink] = [LogSink()]
+    if WEBHOOK_URL:
+        sinks.append(WebhookSink(WEBHOOK_URL))
+    return sinks
+
+
+class _Lane:
+    """One delivery target with its own queue, retry heap and worker thread"""
+
+    def __init__(self, target: Optional[CrisisSink], max_queue: int):
+        self.target = target  # None means the recorder
+        self.name = target.name if target else "recorder"
+        self.queue: "queue.Queue[CrisisEvent]" = queue.Queue(maxsize=max_queue)
+        self.retries: List = []  # heap of (due, seq, event, attempt); this lane's thread only
+        self.seq = 0
+        self.thread: Optional[threading.Thread] = None
+
+
+class CrisisEventDispatcher:
+    """
+    Non-blocking crisis event queue. publish() only enqueues; the recorder and
+    each sink have their own queue and daemon thread, rescheduling failed
+    deliveries with jittered exponential backoff, so one slow sink (a webhook
+    waiting out its timeout) never holds up the recorder or the other sinks
+    """
+
+    def __init__(self, recorder: Callable[[CrisisEvent], None] = None, sinks: List[CrisisSink] = None,
+                 max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 max_queue: int = 10000):
+        self.recorder = recorder
+        self.sinks = default_sinks() if sinks is None else sinks
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lanes = [_Lane(target, max_queue) for target in ([None] if recorder else []) + list(self.sinks)]
+        self._outstanding = 0
+        self._idle = threading.Condition()
+        self._started = False
+        self._start_lock = threading.Lock()
+        self.stats = {"published": 0, "dropped": 0, "recorded": 0, "delivered": 0, "retried": 0, "failed": 0}
+        self._stats_lock = threading.Lock()  # publish() runs on request threads, lanes on their own
+        track_queue("crisis_events", lambda: self.pending)
+
+    def publish(self, event: CrisisEvent) -> bool:
+        """Enqueue an event for every target; never blocks the caller (False if any queue was full)"""
+        self._ensure_started()
+        with self._idle:
+            self._outstanding += len(self._lanes)
+        accepted = True
+        for lane in self._lanes:
+            try:
+                lane.queue.put_nowait(event)
+            except queue.Full:
+                accepted = False
+                self._settle(1)
+                self._count("dropped")
+                logger.error(f"❌ Crisis event queue for {lane.name} full, dropped event {event.event_id}")
+        if accepted:
+            self._count("published")
+        return accepted
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every published event is recorded and delivered (or gave up)"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout)
+
+    @property
+    def pending(self) -> int:
+        return self._outstanding
+
+    def status(self) -> Dict:
+        return {
+            "sinks": [sink.name for sink in self.sinks],
+            "queued": {lane.name: lane.queue.qsize() for lane in self._lanes},
+            "scheduled_retries": sum(len(lane.retries) for lane in self._lanes),
+            **self._stats_snapshot()
+        }
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _stats_snapshot(self) -> Dict:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _ensure_started(self):
+        if not self._started:
+            with self._start_lock:
+                if not self._started:
+                    for lane in self._lanes:
+                        lane.thread = threading.Thread(target=self._run, args=(lane,),
+                                                       name=f"crisis-events-{lane.name}", daemon=True)
+                        lane.thread.start()
+                    self._started = True
+
+    def _settle(self, count: int):
+        with self._idle:
+            self._outstanding -= count
+            if self._outstanding == 0:
+                self._idle.notify_all()
+
+    def _run(self, lane: _Lane):
+        while True:
+            timeout = None
+            if lane.retries:
+                timeout = max(0.0, lane.retries[0][0] - time.monotonic())
+            try:
+                self._attempt(lane, lane.queue.get(timeout=timeout), 1)
+            except queue.Empty:
+                pass
+
+            while lane.retries and lane.retries[0][0] <= time.monotonic():
+                _, _, event, attempt = heapq.heappop(lane.retries)
+                self._attempt(lane, event, attempt)
+
+    def _attempt(self, lane: _Lane, event: CrisisEvent, attempt: int):
+        try:
+            if lane.target is None:
+                self.recorder(event)
+                self._count("recorded")
+            else:
+                lane.target.send(event)
+                self._count("delivered")
+            self._settle(1)
+        except Exception as e:
+            if attempt >= self.max_attempts:
+                self._count("failed")
+                logger.error(f"❌ Crisis event {event.event_id} to {lane.name} failed after {attempt} attempts: {e}")
+                self._settle(1)
+                return
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+            self._count("retried")
+            lane.seq += 1
+            heapq.heappush(lane.retries, (time.monotonic() + delay, lane.seq, event, attempt + 1))
@@ -0,0 +1,201 @@
+"""
+Crisis Lexicon for ORA Emotion System
+One tiered keyword lexicon compiled to a single regex, shared by
+SimplifiedTherapeuticService, CogneeMemoryService and ORAMem0Service
+"""
+import re
+from itertools import product
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Severity tiers, most severe first. "therapeutic" marks content for therapeutic
+# memory routing without implying any risk.
+TIERS = ("high", "medium", "low", "therapeutic")
+
+LEXICON: Dict[str, List[str]] = {
+    "high": [
+        "want to die", "kill myself", "suicide", "suicidal", "end it all",
+        "better off dead", "no point living", "not worth living", "hurt myself",
+        "self-harm", "cut myself", "cut my wrists", "overdosed", "overdose on",
+        "take an overdose", "jump off a bridge", "jump off the bridge", "jump off a building",
+        "jump off the roof", "jump in front of a train", "hang myself"
+    ],
+    "medium": [
+        "hopeless", "worthless", "burden", "give up", "no point",
+        "can't go on", "end the pain", "no way out",
+        "everyone would be better", "tired of living", "overdose"
+    ],
+    "low": [
+        "sad", "depressed", "anxious", "stressed",
+        "overwhelmed", "lonely", "frustrated"
+    ],
+    "therapeutic": [
+        "anxiety", "angry", "worried", "therapy", "therapist", "mental health",
+        "trauma", "grief", "loss", "relationship", "breakup", "divorce"
+    ]
+}
+
+# Inflected forms matched for any lexicon word ("killing myself", "overdosing on");
+# matches are still reported under the lexicon's own term
+INFLECTIONS: Dict[str, List[str]] = {
+    "kill": ["killing", "killed"],
+    "hurt": ["hurting", "hurts"],
+    "cut": ["cutting", "cuts"],
+    "hang": ["hanging", "hanged"],
+    "jump": ["jumping", "jumped"],
+    "overdose": ["overdosing", "overdoses"],
+    "overdosed": ["overdosing"],
+    "take": ["taking", "took", "taken"],
+    "want": ["wanted", "wanting", "wants"],
+    "end": ["ending", "ended"],
+    "give": ["giving", "gave", "given"]
+}
+
+# Negation never downgrades high-risk phrases ("I'm not going to kill myself"
+# still warrants a safety check); it only suppresses the lower tiers.
+NEGATABLE_TIERS = {"medium", "low", "therapeutic"}
+NEGATORS = {"not", "no", "never", "dont", "don't", "isnt", "isn't", "wasnt", "wasn't",
+            "arent", "aren't", "without", "hardly", "cant", "can't", "cannot", "wont", "won't",
+            "didnt", "didn't", "doesnt", "doesn't", "nobody"}
+# "can't stop feeling hopeless" affirms rather than negates
+NEGATION_CANCELLERS = {"stop", "help", "shake", "escape"}
+NEGATION_WINDOW = 3
+
+_WORD_RE = re.compile(r"[a-z']+")
+# Negation scope ends at the clause: "I'm not sad, just hopeless" keeps "hopeless"
+_CLAUSE_BREAK_RE = re.compile(r"[,;:.!?]|\b(?:but|just|and|though|although|yet|however|except)\b")
+
+
+def _normalize(text: str) -> str:
+    return text.lower().replace("’", "'").replace("‘", "'")
+
+
+def _lookup_key(text: str) -> str:
+    return re.sub(r"[\s-]+", " ", text).replace("'", "")
+
+
+def _variants(phrase: str) -> List[str]:
+    """The phrase plus every combination of its words' INFLECTIONS"""
+    options = [[word] + INFLECTIONS.get(word, []) for word in phrase.split(" ")]
+    return [" ".join(words) for words in product(*options)]
+
+
+def _units(phrase: str) -> List[str]:
+    """Regex atoms for a phrase: whitespace/hyphen runs and apostrophes are optional-tolerant"""
+    units = []
+    for part in re.split(r"([\s-]+)", phrase):
+        if not part:
+            continue
+        if re.fullmatch(r"[\s-]+", part):
+            units.append(r"[\s-]+")
+        else:
+            units.extend("'?" if ch == "'" else re.escape(ch) for ch in part)
+    return units
+
+
+def _trie_pattern(phrases: List[str]) -> str:
+    """
+    Compile phrases into a prefix-trie regex ("hope(?:less|...)") so the regex
+    engine never backtracks through the whole alternation at each position
+    """
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for unit in _units(phrase):
+            node = node.setdefault(unit, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        ends = "" in node
+        branches = [unit + build(child) for unit, child in sorted(node.items()) if unit]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+@dataclass(frozen=True)
+class LexiconMatch:
+    term: str
+    tier: str
+    start: int
+    end: int
+    negated: bool = False
+
+
+@dataclass
+class LexiconResult:
+    matches: List[LexiconMatch] = field(default_factory=list)
+
+    def terms(self, tier: str, include_negated: bool = False) -> List[str]:
+        seen = []
+        for match in self.matches:
+            if match.tier == tier and (include_negated or not match.negated) and match.term not in seen:
+                seen.append(match.term)
+        return seen
+
+    @property
+    def severity(self) -> Optional[str]:
+        """Most severe risk tier with a non-negated match ("high"/"medium"/"low"), else None"""
+        for tier in ("high", "medium", "low"):
+            if self.terms(tier):
+                return tier
+        return None
+
+    @property
+    def is_therapeutic(self) -> bool:
+        return any(not match.negated for match in self.matches)
+
+
+class CrisisLexicon:
+    """Single-pass, word-boundary aware matcher over the tiered lexicon"""
+
+    def __init__(self, lexicon: Dict[str, List[str]] = None):
+        lexicon = lexicon or LEXICON
+        self.tier_of: Dict[str, str] = {}
+        self.term_of: Dict[str, str] = {}
+        phrases: Dict[str, str] = {}
+        for tier in TIERS:
+            for term in lexicon.get(tier, []):
+                for variant in _variants(term):
+                    key = _lookup_key(variant)
+                    self.tier_of.setdefault(key, tier)
+                    self.term_of.setdefault(key, term)
+                    phrases.setdefault(key, variant)
+
+        # Greedy trie branches prefer the longest phrase ("no point living" over "no point");
+        # if the boundary check fails the engine backtracks to the shorter one
+        self.pattern = re.compile(r"\b" + _trie_pattern(list(phrases.values())) + r"\b")
+
+    def _is_negated(self, text: str, start: int) -> bool:
+        preceding = text[max(0, start - 80):start]
+        clause_breaks = list(_CLAUSE_BREAK_RE.finditer(preceding))
+        if clause_breaks:
+            preceding = preceding[clause_breaks[-1].end():]
+        words = _WORD_RE.findall(preceding)[-NEGATION_WINDOW:]
+        for i, word in enumerate(words):
+            if word in NEGATORS and not NEGATION_CANCELLERS.intersection(words[i + 1:]):
+                return True
+        return False
+
+    def scan(self, message: str) -> LexiconResult:
+        text = _normalize(message or "")
+        first = self.pattern.search(text)
+        if first is None:
+            return LexiconResult()  # Fast path: the vast majority of messages
+
+        matches = []
+        for m in self.pattern.finditer(text, first.start()):
+            key = _lookup_key(m.group(0))
+            tier = self.tier_of[key]
+            negated = tier in NEGATABLE_TIERS and self._is_negated(text, m.start())
+            matches.append(LexiconMatch(self.term_of[key], tier, m.start(), m.end(), negated))
+        return LexiconResult(matches)
+
+
+# Global instance
+crisis_lexicon = CrisisLexicon()
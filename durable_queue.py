@@ -0,0 +1,201 @@
+"""
+Durable Queue for ORA Emotion System
+SQLite-backed outbox for fire-and-forget work (e.g. mem0 stores from the
+Make.com endpoint). Jobs are committed before the request returns and are
+deleted only after a handler succeeds, so they survive crashes and restarts;
+failures are retried with backoff and parked as 'dead' after max_attempts.
+Workers claim jobs under a lease, so several processes can drain one outbox;
+a job whose worker died is reclaimed once its lease expires. Each job's lease is
+renewed right before it runs (a batch can outlast the claim), and a job whose
+lease was lost to another worker in the meantime is skipped rather than run twice.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from metrics import track_queue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTBOX_PATH = os.getenv(
+    "ORA_OUTBOX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "ora_outbox.db")
+)
+
+Handler = Callable[[Dict[str, Any]], None]
+
+
+class DurableQueue:
+    """Named queue in a shared SQLite outbox, drained by one background worker per queue"""
+
+    def __init__(self, name: str, path: str = DEFAULT_OUTBOX_PATH, max_attempts: int = 8,
+                 base_delay: float = 1.0, max_delay: float = 300.0, batch_size: int = 32,
+                 lease_seconds: float = 300.0):
+        self.name = name
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.handler: Optional[Handler] = None
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    queue TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    lease_until REAL
+                )
+            ''')
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}
+            if "lease_until" not in columns:
+                conn.execute("ALTER TABLE outbox ADD COLUMN lease_until REAL")
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_outbox_queue_status_available
+                ON outbox (queue, status, available_at)
+            ''')
+        track_queue(f"outbox_{name}", lambda: self.stats()["pending"])
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, payload: Dict[str, Any]) -> int:
+        """Persist a job (one small local insert) and wake the worker"""
+        now = time.time()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO outbox (queue, payload, available_at, created_at) VALUES (?, ?, ?, ?)",
+                (self.name, json.dumps(payload, default=str), now, now)
+            )
+        self._idle.clear()
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def start(self, handler: Handler):
+        """Start draining with `handler` (idempotent); jobs left from a previous run are picked up"""
+        self.handler = handler
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=f"outbox-{self.name}", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            processed = self._drain_once()
+            if processed:
+                continue
+            delay = self._next_due_in()
+            if delay is None and not self._wakeup.is_set():
+                self._idle.set()
+            self._wakeup.wait(timeout=delay if delay is not None else 5.0)
+            self._wakeup.clear()
+
+    def _claim(self, conn: sqlite3.Connection) -> tuple:
+        """
+        Atomically lease up to batch_size due jobs (or jobs whose lease expired) to
+        this worker; BEGIN IMMEDIATE serializes claims across processes. Returns the
+        rows and the lease_until they were claimed with
+        """
+        now = time.time()
+        lease = now + self.lease_seconds
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute('''
+                SELECT id, payload, attempts FROM outbox
+                WHERE queue = ? AND ((status = 'pending' AND available_at <= ?)
+                                     OR (status = 'running' AND lease_until <= ?))
+                ORDER BY id LIMIT ?
+            ''', (self.name, now, now, self.batch_size)).fetchall()
+            conn.executemany(
+                "UPDATE outbox SET status = 'running', lease_until = ? WHERE id = ?",
+                [(lease, job_id) for job_id, _, _ in rows]
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return rows, lease
+
+    def _renew(self, conn: sqlite3.Connection, job_id: int, lease: float) -> bool:
+        """Extend a job's lease if this worker still holds it (lease_until unchanged since the claim)"""
+        with conn:
+            cursor = conn.execute(
+                "UPDATE outbox SET lease_until = ? WHERE id = ? AND status = 'running' AND lease_until = ?",
+                (time.time() + self.lease_seconds, job_id, lease)
+            )
+        return cursor.rowcount == 1
+
+    def _drain_once(self) -> int:
+        conn = self._connection()
+        rows, lease = self._claim(conn)
+
+        for job_id, payload, attempts in rows:
+            if not self._renew(conn, job_id, lease):
+                logger.warning(f"⚠️ Outbox job {job_id} ({self.name}) lease expired before it ran, skipped")
+                continue
+            try:
+                self.handler(json.loads(payload))
+                with conn:
+                    conn.execute("DELETE FROM outbox WHERE id = ?", (job_id,))
+            except Exception as e:
+                attempts += 1
+                dead = attempts >= self.max_attempts
+                delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+                with conn:
+                    conn.execute('''
+                        UPDATE outbox SET attempts = ?, status = ?, available_at = ?, last_error = ?,
+                                          lease_until = NULL
+                        WHERE id = ?
+                    ''', (attempts, "dead" if dead else "pending", time.time() + delay, str(e)[:500], job_id))
+                if dead:
+                    logger.error(f"❌ Outbox job {job_id} ({self.name}) dead after {attempts} attempts: {e}")
+                else:
+                    logger.warning(f"⚠️ Outbox job {job_id} ({self.name}) failed, retry in {delay:.0f}s: {e}")
+        return len(rows)
+
+    def _next_due_in(self) -> Optional[float]:
+        row = self._connection().execute('''
+            SELECT MIN(CASE status WHEN 'pending' THEN available_at ELSE lease_until END)
+            FROM outbox WHERE queue = ? AND status IN ('pending', 'running')
+        ''', (self.name,)).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until no pending jobs remain (dead jobs don't count)"""
+        return self._idle.wait(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        counts = dict(self._connection().execute(
+            "SELECT status, COUNT(*) FROM outbox WHERE queue = ? GROUP BY status", (self.name,)
+        ).fetchall())
+        return {
+            "queue": self.name,
+            "pending": counts.get("pending", 0),
+            "running": counts.get("running", 0),
+            "dead": counts.get("dead", 0),
+            "worker_running": self._thread is not None
+        }
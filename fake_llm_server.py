@@ -0,0 +1,114 @@
+"""
+Fake LLM Server for ORA Emotion System
+Local OpenAI-compatible /v1/chat/completions endpoint (plain and streamed)
+with configurable latency and failure rate, for exercising llm_client.py
+without network access or API keys.
+
+Usage: python fake_llm_server.py --port 8089 --latency 0.2 --fail-rate 0.1
+       ORA_LLM_BASE_URL=http://127.0.0.1:8089/v1
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+from typing import Callable, Optional, Union
+
+from aiohttp import web
+
+DEFAULT_REPLY = ("I hear you, and it makes sense to feel this way. "
+                 "What feels like the most helpful next step for you right now?")
+
+
+class FakeLLMServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8089,
+                 latency: Union[float, Callable[[], float]] = 0.05, token_delay: float = 0.005,
+                 fail_rate: float = 0.0, reply: str = DEFAULT_REPLY):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.token_delay = token_delay
+        self.fail_rate = fail_rate
+        self.reply = reply
+        self.requests = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        return app
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        payload = await request.json()
+        # A callable latency is sampled per request (e.g. a distribution from benchmarks/fakes.py)
+        await asyncio.sleep(self.latency() if callable(self.latency) else self.latency)
+        if random.random() < self.fail_rate:
+            return web.json_response({"error": {"message": "fake overload"}}, status=503)
+
+        created = int(time.time())
+        model = payload.get("model", "fake")
+        if not payload.get("stream"):
+            return web.json_response({
+                "id": f"fake-{self.requests}", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": self.reply},
+                             "finish_reason": "stop"}]
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for token in self.reply.split(" "):
+            chunk = {"id": f"fake-{self.requests}", "object": "chat.completion.chunk", "created": created,
+                     "model": model, "choices": [{"index": 0, "delta": {"content": token + " "}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            await asyncio.sleep(self.token_delay)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    def start(self) -> str:
+        """Serve from a background thread; returns the base URL"""
+        ready = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._runner = web.AppRunner(self.app())
+            self._loop.run_until_complete(self._runner.setup())
+            self._loop.run_until_complete(web.TCPSite(self._runner, self.host, self.port).start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, name="fake-llm-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.base_url
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.host, args.port, args.latency, args.token_delay, args.fail_rate)
+    print(f"🚀 Fake LLM server on {server.base_url}")
+    web.run_app(server.app(), host=args.host, port=args.port, print=None)
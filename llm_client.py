@@ -0,0 +1,186 @@
+"""
+Async LLM Client for ORA Emotion System
+OpenAI-compatible chat completions over a pooled aiohttp session (one per
+event loop), with per-call deadlines, jittered retries and token streaming.
+Point ORA_LLM_BASE_URL at fake_llm_server.py for local testing.
+"""
+import os
+import json
+import random
+import asyncio
+import logging
+import weakref
+from typing import AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+from metrics import time_stage
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = os.getenv("ORA_LLM_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+DEFAULT_MODEL = os.getenv("ORA_LLM_MODEL", "gpt-4")
+DEFAULT_TIMEOUT = float(os.getenv("ORA_LLM_TIMEOUT", "20"))
+MAX_RETRIES = int(os.getenv("ORA_LLM_MAX_RETRIES", "3"))
+POOL_SIZE = int(os.getenv("ORA_LLM_POOL_SIZE", "32"))
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMTimeout(LLMError):
+    pass
+
+
+class _RetryableError(LLMError):
+    pass
+
+
+class AsyncLLMClient:
+    """Chat completions client; sessions are pooled per event loop and reused across calls"""
+
+    def __init__(self, base_url: str = BASE_URL, api_key: str = None, model: str = DEFAULT_MODEL,
+                 timeout: float = DEFAULT_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 pool_size: int = POOL_SIZE, backoff_base: float = 0.25, backoff_cap: float = 4.0):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY")
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        # aiohttp sessions are bound to the loop that created them
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = \
+            weakref.WeakKeyDictionary()
+        self.stats = {"requests": 0, "retries": 0, "timeouts": 0, "errors": 0}
+
+    def _session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            # Forget sessions whose loop has already been closed (they can't be reused)
+            for stale in [other for other in list(self._sessions) if other.is_closed()]:
+                self._sessions.pop(stale, None)
+            headers = {"Content-Type": "application/json"}
+            if self.api_key:
+                headers["Authorization"] = f"Bearer {self.api_key}"
+            session = aiohttp.ClientSession(
+                headers=headers,
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            )
+            self._sessions[loop] = session
+        return session
+
+    def _payload(self, messages: List[Dict], model: Optional[str], stream: bool, **params) -> Dict:
+        return {"model": model or self.model, "messages": messages, "stream": stream, **params}
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps concurrent retries from synchronizing
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def _with_retries(self, attempt_fn, deadline: float):
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self.stats["timeouts"] += 1
+                raise LLMTimeout("LLM call exceeded its deadline")
+            try:
+                return await asyncio.wait_for(attempt_fn(), timeout=remaining)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise LLMTimeout("LLM call exceeded its deadline")
+            except (_RetryableError, aiohttp.ClientConnectionError) as e:
+                if attempt >= self.max_retries:
+                    self.stats["errors"] += 1
+                    raise LLMError(f"LLM call failed after {attempt + 1} attempts: {e}")
+                delay = self._backoff(attempt)
+                if loop.time() + delay >= deadline:
+                    self.stats["timeouts"] += 1
+                    raise LLMTimeout(f"No time left to retry: {e}")
+                attempt += 1
+                self.stats["retries"] += 1
+                logger.warning(f"⚠️ LLM call failed ({e}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _check(response: aiohttp.ClientResponse):
+        if response.status in RETRYABLE_STATUS:
+            raise _RetryableError(f"HTTP {response.status}")
+        if response.status >= 400:
+            raise LLMError(f"HTTP {response.status}: {(await response.text())[:200]}")
+
+    async def chat(self, messages: List[Dict], model: str = None, timeout: float = None, **params) -> str:
+        """Single completion; `timeout` is the deadline for the whole call including retries"""
+        deadline = asyncio.get_running_loop().time() + (timeout or self.timeout)
+        payload = self._payload(messages, model, False, **params)
+        self.stats["requests"] += 1
+
+        async def attempt():
+            async with self._session().post(f"{self.base_url}/chat/completions", json=payload) as response:
+                await self._check(response)
+                data = await response.json()
+                return data["choices"][0]["message"]["content"].strip()
+
+        with time_stage("llm_call"):
+            return await self._with_retries(attempt, deadline)
+
+    async def stream_chat(self, messages: List[Dict], model: str = None, timeout: float = None,
+                          **params) -> AsyncIterator[str]:
+        """
+        Yield content tokens as they arrive (server-sent events). Retries only
+        happen before the first token; the deadline covers the whole stream.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or self.timeout)
+        payload = self._payload(messages, model, True, **params)
+        self.stats["requests"] += 1
+
+        async def connect():
+            response = await self._session().post(f"{self.base_url}/chat/completions", json=payload)
+            try:
+                await self._check(response)
+            except Exception:
+                response.release()
+                raise
+            return response
+
+        with time_stage("llm_first_token"):
+            response = await self._with_retries(connect, deadline)
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                line = await asyncio.wait_for(response.content.readline(), timeout=remaining)
+                if not line:
+                    break
+                line = line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {})
+                if delta.get("content"):
+                    yield delta["content"]
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise LLMTimeout("LLM stream exceeded its deadline")
+        finally:
+            response.release()
+
+    async def close(self):
+        """Close the session owned by the running loop"""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+# Global instance
+llm_client = AsyncLLMClient()
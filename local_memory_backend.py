@@ -0,0 +1,465 @@
+"""
+Local Memory Backend for ORA Emotion System
+On-box embeddings + in-process IVF vector index - works fully offline
+Select with ORA_MEMORY_BACKEND=local (used by CogneeMemoryService and ORAMem0Service)
+"""
+import os
+import json
+import uuid
+import zlib
+import re
+import time
+import atexit
+import threading
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MEMORY_BACKEND = os.getenv("ORA_MEMORY_BACKEND", "remote").lower()
+LOCAL_MEMORY_PATH = os.getenv(
+    "ORA_LOCAL_MEMORY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_memory")
+)
+# Index state is flushed every N added rows or T seconds (and at exit); a crash
+# loses at most that window - records.jsonl lines past the flushed count are dropped
+FLUSH_EVERY = int(os.getenv("ORA_LOCAL_FLUSH_EVERY", "256"))
+FLUSH_INTERVAL = float(os.getenv("ORA_LOCAL_FLUSH_INTERVAL", "2.0"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def use_local_backend() -> bool:
+    """True when the semantic memory layer should run on the local backend"""
+    return MEMORY_BACKEND == "local"
+
+
+@dataclass
+class SearchHit:
+    id: str
+    score: float
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+class HashingEmbedder:
+    """
+    Feature-hashing embedder (word unigrams/bigrams + char trigrams)
+    No model download, deterministic across processes, runs in microseconds on CPU
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> Iterable[str]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        for i, token in enumerate(tokens):
+            yield token
+            if i + 1 < len(tokens):
+                yield f"{token} {tokens[i + 1]}"
+            padded = f"#{token}#"
+            for j in range(len(padded) - 2):
+                yield padded[j:j + 3]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SentenceTransformerEmbedder:
+    """CPU sentence-transformers model, used when ORA_LOCAL_EMBEDDER names a model"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = model_name
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        return vectors.astype(np.float32)
+
+
+def get_embedder():
+    """Pick the local embedder from ORA_LOCAL_EMBEDDER (default: hashing)"""
+    name = os.getenv("ORA_LOCAL_EMBEDDER", "hashing")
+    if name != "hashing":
+        try:
+            return SentenceTransformerEmbedder(name)
+        except Exception as e:
+            logger.warning(f"⚠️ Local embedder {name} unavailable ({e}), using hashing embedder")
+    return HashingEmbedder()
+
+
+def _kmeans(data: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Plain Lloyd's k-means on unit vectors (cosine), returns normalized centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(data @ centroids.T, axis=1)
+        for c in range(k):
+            members = data[assignments == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+            else:
+                centroids[c] = data[rng.integers(len(data))]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Inverted-file ANN index over a memory-mapped float32 matrix
+    Exact search below train_threshold rows, IVF probing above it
+    """
+
+    def __init__(self, path: str, dim: int, train_threshold: int = 2048, nprobe: int = 8):
+        self.path = path
+        self.dim = dim
+        self.train_threshold = train_threshold
+        self.nprobe = nprobe
+        self.count = 0
+        self.capacity = 0
+        self.vectors: Optional[np.memmap] = None
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.zeros(0, dtype=np.int32)  # Sized to capacity, valid up to count
+        self.lists: Dict[int, List[int]] = {}
+        self.trained_at = 0
+        self.training = False
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    @property
+    def _vectors_file(self) -> str:
+        return os.path.join(self.path, "vectors.f32")
+
+    @property
+    def _state_file(self) -> str:
+        return os.path.join(self.path, "index.json")
+
+    def _load(self):
+        if not os.path.exists(self._state_file):
+            self._grow(1024)
+            return
+
+        with open(self._state_file) as f:
+            state = json.load(f)
+        if state["dim"] != self.dim:
+            raise ValueError(f"Index at {self.path} has dim {state['dim']}, embedder has {self.dim}")
+
+        self.count = state["count"]
+        self.capacity = state["capacity"]
+        self.trained_at = state.get("trained_at", 0)
+        self.vectors = np.memmap(self._vectors_file, dtype=np.float32, mode="r+",
+                                 shape=(self.capacity, self.dim))
+
+        centroids_file = os.path.join(self.path, "centroids.npy")
+        if os.path.exists(centroids_file):
+            # assignments.npy is only written after training; assign rows added since then
+            centroids = np.load(centroids_file)
+            saved = np.load(os.path.join(self.path, "assignments.npy"))[:self.count]
+            self._install(centroids, saved, len(saved))
+
+    def _grow(self, capacity: int):
+        """Extend the backing file and remap (capacity doubles, so amortized O(1) per add)"""
+        if self.vectors is not None:
+            self.vectors.flush()
+            del self.vectors
+        with open(self._vectors_file, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        self.capacity = capacity
+        self.vectors = np.memmap(self._vectors_file, dtype=np.float32, mode="r+",
+                                 shape=(capacity, self.dim))
+        if self.centroids is not None:
+            assignments = np.zeros(capacity, dtype=np.int32)
+            assignments[:self.count] = self.assignments[:self.count]
+            self.assignments = assignments
+
+    def _rebuild_lists(self):
+        self.lists = {}
+        for row, centroid in enumerate(self.assignments[:self.count]):
+            self.lists.setdefault(int(centroid), []).append(row)
+
+    def add(self, vectors: np.ndarray) -> List[int]:
+        n = len(vectors)
+        if self.count + n > self.capacity:
+            capacity = self.capacity
+            while self.count + n > capacity:
+                capacity *= 2
+            self._grow(capacity)
+
+        rows = list(range(self.count, self.count + n))
+        self.vectors[self.count:self.count + n] = vectors
+
+        if self.centroids is not None:
+            assigned = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+            self.assignments[self.count:self.count + n] = assigned
+            for row, centroid in zip(rows, assigned):
+                self.lists.setdefault(int(centroid), []).append(row)
+        self.count += n
+        return rows
+
+    @property
+    def needs_training(self) -> bool:
+        """Retrain once the index has doubled since the last training run"""
+        return (not self.training and self.count >= self.train_threshold
+                and self.count >= 2 * self.trained_at)
+
+    @staticmethod
+    def fit(vectors: np.ndarray, n: int) -> tuple:
+        """k-means over the first n rows -> (centroids, assignments); touches no index state"""
+        data = np.asarray(vectors[:n])
+        sample = data
+        if len(data) > 20000:
+            sample = data[np.random.default_rng(0).choice(len(data), 20000, replace=False)]
+        centroids = _kmeans(sample, max(1, int(np.sqrt(n))))
+        return centroids, np.argmax(data @ centroids.T, axis=1).astype(np.int32)
+
+    def _install(self, centroids: np.ndarray, assignments: np.ndarray, n: int):
+        """Swap in a trained model for rows [0, n) and assign any rows added after n"""
+        buffer = np.zeros(self.capacity, dtype=np.int32)
+        buffer[:n] = assignments
+        if self.count > n:
+            tail = np.asarray(self.vectors[n:self.count])
+            buffer[n:self.count] = np.argmax(tail @ centroids.T, axis=1)
+        self.centroids = centroids
+        self.assignments = buffer
+        self._rebuild_lists()
+
+    def install(self, centroids: np.ndarray, assignments: np.ndarray, n: int):
+        self._install(centroids, assignments, n)
+        self.trained_at = n
+        np.save(os.path.join(self.path, "centroids.npy"), self.centroids)
+        np.save(os.path.join(self.path, "assignments.npy"), self.assignments[:self.count])
+        logger.info(f"✅ IVF index trained: {n} vectors, {len(centroids)} lists")
+
+    def train(self):
+        n = self.count
+        self.install(*self.fit(self.vectors, n), n)
+
+    def search(self, query: np.ndarray, k: int, rows: Optional[List[int]] = None) -> List[tuple]:
+        """Return [(row, score)] for the top-k rows, optionally restricted to a row subset"""
+        if self.count == 0:
+            return []
+
+        if rows is not None and (self.centroids is None or len(rows) <= self.train_threshold):
+            candidates = np.asarray(rows, dtype=np.int64)
+        elif self.centroids is None:
+            candidates = np.arange(self.count)
+        else:
+            probes = np.argsort(-(self.centroids @ query))[:self.nprobe]
+            candidates = np.asarray(
+                [row for c in probes for row in self.lists.get(int(c), [])], dtype=np.int64
+            )
+            if rows is not None:
+                candidates = np.intersect1d(candidates, np.asarray(rows, dtype=np.int64))
+
+        if len(candidates) == 0:
+            return []
+
+        scores = self.vectors[candidates] @ query
+        top = np.argsort(-scores)[:k]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def flush(self):
+        """Persist vectors and the row count (O(dirty pages); centroids are saved by install)"""
+        self.vectors.flush()
+        with open(self._state_file, "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "count": self.count,
+                "capacity": self.capacity,
+                "trained_at": self.trained_at
+            }, f)
+
+
+class LocalMemoryStore:
+    """Persistent per-namespace semantic memory: embedder + IVF index + JSONL payloads"""
+
+    def __init__(self, path: str, embedder=None):
+        self.path = path
+        self.embedder = embedder or get_embedder()
+        self.index = IVFIndex(path, self.embedder.dim)
+        self.records: List[Dict[str, Any]] = []
+        self.user_rows: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self._trainer: Optional[threading.Thread] = None
+        self._load_records()
+
+    @property
+    def _records_file(self) -> str:
+        return os.path.join(self.path, "records.jsonl")
+
+    def _load_records(self):
+        if not os.path.exists(self._records_file):
+            return
+        stale = False
+        with open(self._records_file) as f:
+            for line in f:
+                if len(self.records) >= self.index.count:
+                    stale = True  # Payload written but vector never flushed - drop it
+                    break
+                self._index_record(json.loads(line))
+        if stale:
+            # Cut the file back to the index, or the next append lands after the dropped lines
+            # and row N no longer matches line N
+            tmp = self._records_file + ".tmp"
+            with open(tmp, "w") as f:
+                f.writelines(json.dumps(record, default=str) + "\n" for record in self.records)
+            os.replace(tmp, self._records_file)
+            logger.warning(f"⚠️ Dropped unflushed records past row {self.index.count} in {self._records_file}")
+
+    def _index_record(self, record: Dict[str, Any]):
+        row = len(self.records)
+        self.records.append(record)
+        self.user_rows.setdefault(record.get("user_id") or "", []).append(row)
+
+    def add(self, text: str, user_id: str, payload: Dict[str, Any] = None) -> str:
+        return self.add_many([(text, user_id, payload or {})])[0]
+
+    def add_many(self, items: List[tuple]) -> List[str]:
+        """Add [(text, user_id, payload)] in one embedding pass"""
+        vectors = self.embedder.embed([text for text, _, _ in items])
+        with self._lock:
+            self.index.add(vectors)
+            ids = []
+            with open(self._records_file, "a") as f:
+                for text, user_id, payload in items:
+                    record = {
+                        "id": str(uuid.uuid4()),
+                        "user_id": user_id,
+                        "text": text,
+                        "payload": payload,
+                        "created_at": datetime.now().isoformat()
+                    }
+                    f.write(json.dumps(record, default=str) + "\n")
+                    self._index_record(record)
+                    ids.append(record["id"])
+            self._unflushed += len(items)
+            if self._unflushed >= FLUSH_EVERY or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+                self._flush_locked()
+            if self.index.needs_training:
+                self._start_training()
+        return ids
+
+    def _flush_locked(self):
+        self.index.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def _start_training(self):
+        """k-means runs on a background thread over a snapshot of the rows; adds keep going"""
+        self.index.training = True
+        self._trainer = threading.Thread(
+            target=self._train, args=(self.index.vectors, self.index.count),
+            name=f"ora-ivf-train-{os.path.basename(self.path)}", daemon=True
+        )
+        self._trainer.start()
+
+    def _train(self, vectors: np.ndarray, n: int):
+        try:
+            centroids, assignments = self.index.fit(vectors, n)
+            with self._lock:
+                self.index.install(centroids, assignments, n)
+                self._flush_locked()
+        except Exception as e:
+            logger.error(f"❌ IVF index training failed: {e}")
+        finally:
+            with self._lock:
+                self.index.training = False
+
+    def flush(self):
+        """Wait for any background training, then persist the index state"""
+        trainer = self._trainer
+        if trainer is not None:
+            trainer.join()
+        with self._lock:
+            self._flush_locked()
+
+    def search(self, query: str, user_id: Optional[str] = None, limit: int = 10) -> List[SearchHit]:
+        vector = self.embedder.embed([query])[0]
+        with self._lock:
+            rows = self.user_rows.get(user_id, []) if user_id is not None else None
+            if rows is not None and not rows:
+                return []
+            results = self.index.search(vector, limit, rows)
+            return [
+                SearchHit(id=self.records[row]["id"], score=score, payload=self.records[row]["payload"])
+                for row, score in results if row < len(self.records)
+            ]
+
+    def records_for_user(self, user_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self.records[row] for row in self.user_rows.get(user_id, [])]
+
+
+class LocalMem0Memory:
+    """Adapter exposing the subset of mem0's Memory API that ORAMem0Service uses"""
+
+    def __init__(self, store: LocalMemoryStore):
+        self.store = store
+
+    def add(self, messages: List[Dict], user_id: str, metadata: Dict = None) -> Dict[str, Any]:
+        items = [
+            (m.get("content", ""), user_id, {"memory": m.get("content", ""), "role": m.get("role"),
+                                             "metadata": metadata or {}})
+            for m in messages if m.get("content")
+        ]
+        ids = self.store.add_many(items) if items else []
+        return {
+            "id": ids[0] if ids else None,
+            "results": [{"id": memory_id, "event": "ADD"} for memory_id in ids]
+        }
+
+    def search(self, query: str, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        return [
+            {"id": hit.id, "memory": hit.payload.get("memory", ""), "score": hit.score,
+             "metadata": hit.payload.get("metadata", {})}
+            for hit in self.store.search(query, user_id=user_id, limit=limit)
+        ]
+
+    def get_all(self, user_id: str, limit: int = 100) -> Dict[str, Any]:
+        records = self.store.records_for_user(user_id)[-limit:]
+        return {"results": [
+            {"id": r["id"], "memory": r["payload"].get("memory", r["text"]),
+             "metadata": r["payload"].get("metadata", {}), "created_at": r["created_at"]}
+            for r in reversed(records)
+        ]}
+
+
+_stores: Dict[str, LocalMemoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_local_store(namespace: str) -> LocalMemoryStore:
+    """Shared store per namespace ("cognee", "mem0") under ORA_LOCAL_MEMORY_PATH"""
+    with _stores_lock:
+        if namespace not in _stores:
+            _stores[namespace] = LocalMemoryStore(os.path.join(LOCAL_MEMORY_PATH, namespace))
+            logger.info(f"✅ Local memory store ready: {namespace}")
+        return _stores[namespace]
+
+
+@atexit.register
+def _flush_stores():
+    for store in list(_stores.values()):
+        if not os.path.isdir(store.path):
+            continue  # Scratch stores (benchmarks, load tests) whose directory is already gone
+        try:
+            store.flush()
+        except Exception as e:
+            logger.error(f"❌ Failed to flush local memory store {store.path}: {e}")
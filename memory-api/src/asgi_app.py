@@ -0,0 +1,108 @@
+"""
+Async-native ORA memory API: the same URLs and JSON as src/main.py, served by
+Quart on an ASGI server. Handlers await Cognee/therapeutic/LLM calls directly
+on one event loop (shared aiohttp sessions instead of one per worker thread)
+and SQLite goes through the async_db connection pool. /ws/session adds a
+realtime WebSocket session (src/realtime_session.py).
+
+    cd memory-api && hypercorn src.asgi_app:app --bind 0.0.0.0:5000
+"""
+import os
+import sys
+import asyncio
+from datetime import datetime
+# Same import roots as src/main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from quart import Quart, jsonify
+from src.asgi_routes.memory import memory_bp
+from src.asgi_routes.enhanced_memory import enhanced_memory_bp
+from src.asgi_routes.context import context_bp
+from src.asgi_routes.session import session_bp
+from src.async_db import async_db
+from src.audio_emotion import audio_emotion
+from src.database import init_db
+from llm_client import llm_client
+from resilience import breaker_states
+from metrics import instrument_quart
+from tracing import trace_quart
+from profiler import profile_quart
+
+app = Quart(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+app.config['SECRET_KEY'] = 'ora-memory-secret-key-2024'
+
+app.register_blueprint(memory_bp, url_prefix='/api/memory')
+app.register_blueprint(enhanced_memory_bp, url_prefix='/api/enhanced')
+app.register_blueprint(context_bp, url_prefix='/api/context')
+app.register_blueprint(session_bp, url_prefix='/ws')
+instrument_quart(app, "memory_api_asgi")
+trace_quart(app, "memory_api_asgi")
+profile_quart(app)
+
+@app.before_serving
+async def startup():
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, init_db)
+    # Load the audio emotion model (if any) now rather than on the first session
+    await loop.run_in_executor(None, lambda: audio_emotion.available)
+
+@app.after_serving
+async def shutdown():
+    # Sessions and connections belong to the serving loop; close them on it
+    await llm_client.close()
+    await async_db.close()
+
+@app.route('/health')
+async def health_check():
+    return jsonify({
+        'status': 'healthy',
+        'service': 'Enhanced ORA Memory API',
+        'version': '2.0.0',
+        'server': 'asgi',
+        'features': [
+            'cognee_integration',
+            'therapeutic_ai',
+            'crisis_detection',
+            'progress_tracking',
+            'semantic_memory'
+        ],
+        'circuit_breakers': breaker_states(),
+        'database_pool': async_db.stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/')
+async def root():
+    return jsonify({
+        'message': 'Enhanced ORA Memory API is running! 🧠✨',
+        'endpoints': {
+            'health': '/health',
+            'admin_panel': '/admin',
+            'legacy_memory': '/api/memory/*',
+            'enhanced_memory': '/api/enhanced/*',
+            'cognee_context': '/api/enhanced/cognee/context',
+            'unified_context': '/api/context/unified',
+            'realtime_session': '/ws/session',
+            'metrics': '/metrics',
+            'profiler': '/admin/profiler/status',
+            'therapeutic_insights': '/api/enhanced/therapeutic/insights',
+            'crisis_assessment': '/api/enhanced/crisis/assess',
+            'progress_tracking': '/api/enhanced/therapeutic/progress'
+        },
+        'documentation': 'Enhanced with Cognee semantic memory and therapeutic AI capabilities'
+    })
+
+@app.route('/admin')
+async def admin_panel():
+    """Serve the enhanced admin panel HTML"""
+    return await app.send_static_file('admin.html')
+
+if __name__ == '__main__':
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = [f"0.0.0.0:{int(os.environ.get('PORT', 5000))}"]
+    print("🚀 Starting async ORA Memory API (Quart + Hypercorn)...")
+    asyncio.run(serve(app, config))
@@ -0,0 +1,87 @@
+from quart import Blueprint, request, jsonify
+from .. import enhanced_endpoints
+from response_cache import response_cache
+
+enhanced_memory_bp = Blueprint('enhanced_memory', __name__)
+
+def _respond(result):
+    payload, status = result
+    return jsonify(payload), status
+
+async def _body():
+    return await request.get_json(silent=True)
+
+@enhanced_memory_bp.route('/cognee/context', methods=['POST'])
+async def get_cognee_context():
+    """Get user context from Cognee semantic memory"""
+    return _respond(await enhanced_endpoints.cognee_context(await _body()))
+
+@enhanced_memory_bp.route('/cognee/store', methods=['POST'])
+async def store_in_cognee():
+    """Store conversation in Cognee semantic memory"""
+    return _respond(await enhanced_endpoints.cognee_store(await _body()))
+
+@enhanced_memory_bp.route('/therapeutic/insights', methods=['POST'])
+async def get_therapeutic_insights():
+    """Get therapeutic insights for user"""
+    return _respond(await enhanced_endpoints.therapeutic_insights(await _body()))
+
+@enhanced_memory_bp.route('/therapeutic/progress', methods=['POST'])
+async def analyze_therapeutic_progress():
+    """Analyze user's therapeutic progress"""
+    return _respond(await enhanced_endpoints.therapeutic_progress(await _body()))
+
+@enhanced_memory_bp.route('/therapeutic/respond', methods=['POST'])
+async def therapeutic_respond():
+    """Generate a context-aware therapeutic response"""
+    return _respond(await enhanced_endpoints.therapeutic_respond(await _body()))
+
+@enhanced_memory_bp.route('/therapeutic/respond/stream', methods=['POST'])
+async def therapeutic_respond_stream():
+    """Stream a therapeutic response token by token as server-sent events"""
+    data = await _body()
+    error = enhanced_endpoints.therapeutic_stream_error(data)
+    if error:
+        return _respond(error)
+
+    async def events():
+        async for event in enhanced_endpoints.therapeutic_stream_events(data):
+            yield event.encode()
+
+    return events(), 200, {'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache',
+                           'X-Accel-Buffering': 'no'}
+
+@enhanced_memory_bp.route('/crisis/assess', methods=['POST'])
+async def assess_crisis():
+    """Assess crisis risk in user message"""
+    return _respond(await enhanced_endpoints.crisis_assess(await _body()))
+
+@enhanced_memory_bp.route('/exercises/get', methods=['POST'])
+async def get_exercises():
+    """Get therapeutic exercises for user"""
+    return _respond(await enhanced_endpoints.exercises(await _body()))
+
+@enhanced_memory_bp.route('/checkin/generate', methods=['POST'])
+async def generate_checkin():
+    """Generate proactive check-in for user"""
+    return _respond(await enhanced_endpoints.checkin(await _body()))
+
+@enhanced_memory_bp.route('/analytics/emotional-patterns', methods=['POST'])
+async def get_emotional_patterns():
+    """Get detailed emotional patterns analysis"""
+    return _respond(await enhanced_endpoints.emotional_patterns(await _body()))
+
+@enhanced_memory_bp.route('/cache/stats', methods=['GET'])
+async def get_cache_stats():
+    """Response cache size, hit rate and bypass/eviction counters"""
+    return jsonify(response_cache.stats())
+
+@enhanced_memory_bp.route('/cache/opt-out', methods=['POST'])
+async def set_cache_opt_out():
+    """Opt a user out of (or back into) response caching"""
+    return _respond(enhanced_endpoints.cache_opt_out(await _body()))
+
+@enhanced_memory_bp.route('/health', methods=['GET'])
+async def health_check():
+    """Health check for enhanced memory service"""
+    return jsonify(enhanced_endpoints.health())
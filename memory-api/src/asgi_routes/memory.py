@@ -0,0 +1,92 @@
+from quart import Blueprint, request, jsonify
+from ..async_db import async_db
+from .. import memory_queries
+
+memory_bp = Blueprint('memory', __name__)
+
+@memory_bp.route('/get-context', methods=['POST'])
+async def get_user_context():
+    """Get user context for personalized AI responses"""
+    try:
+        data = await request.get_json()
+        user_id = data.get('user_id')
+
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+
+        return jsonify(await async_db.run(memory_queries.get_context, user_id))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@memory_bp.route('/save-conversation', methods=['POST'])
+async def save_conversation():
+    """Save conversation to database"""
+    try:
+        data = await request.get_json()
+        user_id = data.get('user_id')
+        user_message = data.get('user_message')
+        ora_response = data.get('ora_response')
+
+        if not all([user_id, user_message, ora_response]):
+            return jsonify({'error': 'user_id, user_message, and ora_response are required'}), 400
+
+        return jsonify(await async_db.run(
+            memory_queries.save_conversation, user_id, user_message, ora_response,
+            data.get('emotion', ''), data.get('topic', ''), data.get('session_id', ''),
+            data.get('emotion_intensity'), data.get('crisis_indicators')
+        ))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@memory_bp.route('/update-profile', methods=['POST'])
+async def update_user_profile():
+    """Update user profile information"""
+    try:
+        data = await request.get_json()
+        user_id = data.get('user_id')
+
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+
+        return jsonify(await async_db.run(memory_queries.update_profile, user_id, data))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@memory_bp.route('/get-stats', methods=['POST'])
+async def get_user_stats():
+    """Get user statistics and insights"""
+    try:
+        data = await request.get_json()
+        user_id = data.get('user_id')
+
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+
+        stats = await async_db.run(memory_queries.get_stats, user_id)
+        if stats is None:
+            return jsonify({'error': 'User not found'}), 404
+
+        return jsonify(stats)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@memory_bp.route('/search-conversations', methods=['POST'])
+async def search_conversations():
+    """Search through user's conversation history"""
+    try:
+        data = await request.get_json()
+        user_id = data.get('user_id')
+
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+
+        return jsonify(await async_db.run(
+            memory_queries.search_conversations, user_id, data.get('query', ''), data.get('limit', 10)
+        ))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,27 @@
+import json
+import asyncio
+import logging
+from quart import Blueprint, websocket
+from ..realtime_session import RealtimeSession
+
+logger = logging.getLogger(__name__)
+
+session_bp = Blueprint('session', __name__)
+
+@session_bp.websocket('/session')
+async def realtime_session():
+    """Persistent emotion + memory session (protocol in realtime_session.py)"""
+    session = RealtimeSession(lambda event: websocket.send(json.dumps(event)))
+    try:
+        while True:
+            message = await websocket.receive()
+            try:
+                if isinstance(message, bytes):
+                    await session.handle_audio(message)
+                elif not await session.handle(json.loads(message)):
+                    break
+            except (ValueError, TypeError, AttributeError) as e:
+                await session.emit({'type': 'error', 'error': f'invalid message: {e}'})
+    finally:
+        # Runs on disconnect too (the handler is cancelled); shield the final save from that
+        await asyncio.shield(session.close())
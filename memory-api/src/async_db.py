@@ -0,0 +1,130 @@
+"""
+Async SQLite access for the ASGI memory API
+sqlite3 has no async driver, so each pooled connection is owned by a single
+worker thread and a coroutine borrows one connection per unit of work; the
+event loop only awaits. Work is a plain function over a cursor (the same ones
+the Flask routes run through database.run_in_transaction), so both servers
+share one copy of the SQL.
+"""
+import os
+import asyncio
+import sqlite3
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from tracing import wrap_context
+from .database import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.getenv("ORA_ASYNC_DB_POOL_SIZE", "4"))
+
+
+async def run_blocking(fn: Callable, *args) -> Any:
+    """
+    Run a blocking call that manages its own connection (emotion aggregates, rollups,
+    the local vector index) on the default executor, carrying the trace context
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, wrap_context(fn), *args)
+
+
+class _PooledConnection:
+    """A sqlite3 connection and the one thread that may use it"""
+
+    def __init__(self, path: str, index: int):
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"ora-async-db-{index}")
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        # WAL: readers on the other pooled connections don't block the writer
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        self.conn = conn
+
+    def transaction(self, fn: Callable, *args) -> Any:
+        cursor = self.conn.cursor()
+        try:
+            result = fn(cursor, *args)
+            self.conn.commit()
+            return result
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class AsyncDatabase:
+    def __init__(self, path: str = None, pool_size: int = POOL_SIZE):
+        self.path = path or DB_PATH
+        self.pool_size = max(1, pool_size)
+        self._idle: Optional[asyncio.Queue] = None
+        self._connections: List[_PooledConnection] = []
+
+    async def _acquire(self) -> _PooledConnection:
+        if self._idle is None:
+            # Created on first use so the queue belongs to the serving loop
+            self._idle = asyncio.Queue()
+            for _ in range(self.pool_size):
+                self._idle.put_nowait(None)  # a free slot; connections open lazily
+        pooled = await self._idle.get()
+        if pooled is None:
+            pooled = _PooledConnection(self.path, len(self._connections))
+            try:
+                await asyncio.get_running_loop().run_in_executor(pooled.executor, pooled.connect)
+            except Exception:
+                pooled.executor.shutdown(wait=False)
+                self._idle.put_nowait(None)
+                raise
+            self._connections.append(pooled)
+        return pooled
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn(cursor, *args) as one transaction on a pooled connection and return its result"""
+        pooled = await self._acquire()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                pooled.executor, wrap_context(pooled.transaction), fn, *args)
+        finally:
+            # Safe even if we were cancelled mid-query: the connection's single thread serializes work
+            self._idle.put_nowait(pooled)
+
+    async def fetchall(self, sql: str, params=()) -> List[sqlite3.Row]:
+        return await self.run(lambda cursor: cursor.execute(sql, params).fetchall())
+
+    async def fetchone(self, sql: str, params=()) -> Optional[sqlite3.Row]:
+        return await self.run(lambda cursor: cursor.execute(sql, params).fetchone())
+
+    async def execute(self, sql: str, params=()) -> int:
+        """Execute and commit one statement; returns the affected row count"""
+        return await self.run(lambda cursor: cursor.execute(sql, params).rowcount)
+
+    def stats(self):
+        return {
+            "pool_size": self.pool_size,
+            "open_connections": len(self._connections),
+            "idle": self._idle.qsize() if self._idle is not None else self.pool_size
+        }
+
+    async def close(self):
+        connections, self._connections, self._idle = self._connections, [], None
+        loop = asyncio.get_running_loop()
+        for pooled in connections:
+            await loop.run_in_executor(pooled.executor, pooled.close)
+            pooled.executor.shutdown(wait=False)
+        if connections:
+            logger.info(f"✅ Closed {len(connections)} async SQLite connections")
+
+
+# Global instance
+async_db = AsyncDatabase()
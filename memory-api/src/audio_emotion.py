@@ -0,0 +1,101 @@
+"""
+Speech emotion estimates from raw audio for the realtime session endpoint
+Uses the MLP trained by train_model.py (trained_emotion_model.pkl and
+label_encoder.pkl, plus feature_scaler.pkl when present) on the
+prototype.extract_feature vector. librosa and scikit-learn are optional:
+without them, or without the model files, `available` is False and sessions
+fall back to emotion events sent by the client.
+"""
+import os
+import pickle
+import logging
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from metrics import time_stage
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODEL_PATH = os.getenv("ORA_EMOTION_MODEL_PATH", os.path.join(REPO_ROOT, "trained_emotion_model.pkl"))
+ENCODER_PATH = os.getenv("ORA_EMOTION_ENCODER_PATH", os.path.join(REPO_ROOT, "label_encoder.pkl"))
+SCALER_PATH = os.getenv("ORA_EMOTION_SCALER_PATH", os.path.join(REPO_ROOT, "feature_scaler.pkl"))
+
+# RAVDESS filename emotion codes (the labels train_model.py encodes)
+RAVDESS_EMOTIONS = {
+    1: "neutral", 2: "calm", 3: "happy", 4: "sad",
+    5: "angry", 6: "fearful", 7: "disgust", 8: "surprised"
+}
+
+
+def decode_pcm(data: bytes, encoding: str = "f32le") -> np.ndarray:
+    """Mono PCM bytes (f32le or s16le) to float32 samples in [-1, 1]"""
+    if encoding == "s16le":
+        return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    if encoding == "f32le":
+        return np.frombuffer(data, dtype="<f4").astype(np.float32)
+    raise ValueError(f"Unsupported audio encoding '{encoding}' (f32le or s16le)")
+
+
+class AudioEmotionEstimator:
+    def __init__(self, model_path: str = MODEL_PATH, encoder_path: str = ENCODER_PATH,
+                 scaler_path: str = SCALER_PATH):
+        self.model_path = model_path
+        self.encoder_path = encoder_path
+        self.scaler_path = scaler_path
+        self._model = None
+        self._labels = None
+        self._scaler = None
+        self._extract_feature = None
+        self._load_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is not None or self._load_error is not None:
+                return
+            try:
+                from prototype import extract_feature  # librosa
+                with open(self.model_path, "rb") as f:
+                    model = pickle.load(f)
+                with open(self.encoder_path, "rb") as f:
+                    encoder = pickle.load(f)
+                if os.path.exists(self.scaler_path):
+                    with open(self.scaler_path, "rb") as f:
+                        self._scaler = pickle.load(f)
+                self._labels = [RAVDESS_EMOTIONS.get(int(label), str(label))
+                                if str(label).isdigit() else str(label) for label in encoder.classes_]
+                self._extract_feature = extract_feature
+                self._model = model
+                logger.info(f"✅ Audio emotion model loaded from {self.model_path}")
+            except Exception as e:
+                self._load_error = f"{type(e).__name__}: {e}"
+                logger.warning(f"⚠️ Audio emotion estimates disabled ({self._load_error})")
+
+    @property
+    def available(self) -> bool:
+        self._load()
+        return self._model is not None
+
+    @property
+    def unavailable_reason(self) -> Optional[str]:
+        self._load()
+        return self._load_error
+
+    def estimate(self, samples: np.ndarray, sample_rate: int) -> Dict[str, float]:
+        """Emotion probabilities for one window of audio (blocking - run it in an executor)"""
+        if not self.available:
+            raise RuntimeError(f"audio emotion model unavailable ({self._load_error})")
+        with time_stage("feature_extraction"):
+            features = self._extract_feature(samples, sample_rate).reshape(1, -1)
+        if self._scaler is not None:
+            features = self._scaler.transform(features)
+        with time_stage("mlp_inference"):
+            probabilities = self._model.predict_proba(features)[0]
+        return {label: round(float(p), 4) for label, p in zip(self._labels, probabilities)}
+
+
+# Global instance
+audio_emotion = AudioEmotionEstimator()
@@ -0,0 +1,64 @@
+"""
+Shared event loop for the Flask (WSGI) routes
+Sync handlers submit coroutines to one long-lived loop on a daemon thread, so
+loop-bound resources (the llm_client aiohttp session, connector pools) exist
+once per process instead of once per request thread - app.run starts a thread
+per request, and a loop per thread leaked a loop and a session every time.
+"""
+import atexit
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundLoop:
+    def __init__(self, name: str = "ora-flask-async"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=self._serve, args=(loop,),
+                                                    name=self.name, daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+
+    @staticmethod
+    def _serve(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def run(self, coro: Awaitable, timeout: float = None) -> Any:
+        """
+        Run a coroutine on the shared loop and block the calling thread for its result
+        (call_soon_threadsafe copies the caller's contextvars, so trace context follows)
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+        return future.result(timeout)
+
+    def close(self):
+        """Close the shared aiohttp session, then stop the loop"""
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            return
+        from llm_client import llm_client
+        try:
+            asyncio.run_coroutine_threadsafe(llm_client.close(), loop).result(5)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to close LLM session on the shared loop: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(5)
+
+
+# Global instance
+background_loop = BackgroundLoop()
+atexit.register(background_loop.close)
@@ -2,10 +2,24 @@ import os
 import json
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-import cognee
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 import logging
+from local_memory_backend import use_local_backend, get_local_store
+from crisis_lexicon import crisis_lexicon
+from crisis_classifier import crisis_model
+from therapeutic_catalog import therapeutic_catalog
+from resilience import FallbackChain, TierUnavailable, get_breaker
+from metrics import time_stage
+from tracing import span
+from .emotion_aggregates import emotion_aggregates
+from .database import get_db_connection
+from .async_db import run_blocking
+
+try:
+    import cognee
+except ImportError:
+    cognee = None  # Only required for the remote backend
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,10 +44,23 @@ class TherapeuticInsight:
 class CogneeMemoryService:
     def __init__(self):
         """Initialize Cognee memory service with therapeutic capabilities"""
+        self.local_store = None
+        # Semantic search → SQLite recent history → nothing; a slow Cognee costs one short deadline
+        self.search_breaker = get_breaker("cognee_search", timeout=float(os.getenv("ORA_COGNEE_TIMEOUT", "2.0")))
+        self.context_chain = FallbackChain("cognee_context", [
+            ("semantic", self._semantic_conversations, None),
+            ("sqlite_history", self._recent_history, None)
+        ], empty=list)
         self.setup_cognee()
         
     def setup_cognee(self):
         """Setup Cognee with proper configuration"""
+        if use_local_backend():
+            # On-box embeddings + IVF index, no network round-trips
+            self.local_store = get_local_store("cognee")
+            logger.info("✅ Cognee service using local memory backend")
+            return
+
         try:
             # Initialize Cognee
             cognee.config.set_llm_api_key(os.getenv("OPENAI_API_KEY"))
@@ -43,6 +70,7 @@ class CogneeMemoryService:
             logger.error(f"❌ Failed to initialize Cognee: {e}")
             raise
 
+    @span("cognee.store_conversation")
     async def store_conversation(self, user_id: str, conversation_data: Dict) -> bool:
         """Store conversation with emotional and therapeutic context"""
         try:
@@ -60,9 +88,23 @@ class CogneeMemoryService:
                 "conversation_type": "therapeutic_chat"
             }
             
-            # Add to Cognee
-            await cognee.add([document])
-            await cognee.cognify()
+            with time_stage("cognify"):
+                if self.local_store is not None:
+                    text = f"{document['user_message']}\n{document['ai_response']}"
+                    await run_blocking(self.local_store.add, text, user_id, document)
+                else:
+                    # Add to Cognee
+                    await cognee.add([document])
+                    await cognee.cognify()
+
+            await run_blocking(
+                emotion_aggregates.record,
+                user_id,
+                document["emotion"],
+                document["emotion_intensity"],
+                document["timestamp"],
+                document["crisis_indicators"]
+            )
             
             logger.info(f"✅ Stored conversation for user {user_id}")
             return True
@@ -71,18 +113,67 @@ class CogneeMemoryService:
             logger.error(f"❌ Failed to store conversation: {e}")
             return False
 
+    @time_stage("vector_search")
+    async def _search(self, query: str, user_id: str, limit: int = 100) -> List[Any]:
+        """Similarity search on the configured backend; results expose `.payload`"""
+        if self.local_store is not None:
+            return await run_blocking(self.local_store.search, query, user_id, limit)
+        return await cognee.search("SIMILARITY", query)
+
+    @span("cognee.semantic_conversations")
+    async def _semantic_conversations(self, user_id: str, limit: int) -> List[Dict]:
+        if self.local_store is None and cognee is None:
+            raise TierUnavailable("cognee not installed")
+        # Query for user's conversation history
+        query = f"conversations for user {user_id} emotional patterns therapeutic insights"
+        search_results = await self.search_breaker.acall(self._search, query, user_id, limit)
+        
+        conversations = []
+        for result in search_results[:limit]:
+            if hasattr(result, 'payload') and result.payload.get('user_id') == user_id:
+                conversation = result.payload
+                conversations.append({
+                    "timestamp": conversation.get("timestamp"),
+                    "emotion": conversation.get("emotion"),
+                    "intensity": conversation.get("emotion_intensity"),
+                    "message": conversation.get("user_message", "")[:100] + "..."
+                })
+        return conversations
+
+    @span("cognee.recent_conversations")
+    def _recent_conversations(self, user_id: str, limit: int) -> List[Dict]:
+        """Most recent conversations from the SQLite store (fallback when Cognee is slow or down)"""
+        conn = get_db_connection()
+        try:
+            with time_stage("db_query"):
+                rows = conn.execute('''
+                    SELECT timestamp, emotion, emotion_intensity, user_message
+                    FROM conversations WHERE user_id = ?
+                    ORDER BY timestamp DESC LIMIT ?
+                ''', (user_id, limit)).fetchall()
+        finally:
+            conn.close()
+        return [{
+            "timestamp": row["timestamp"],
+            "emotion": row["emotion"],
+            "intensity": row["emotion_intensity"],
+            "message": (row["user_message"] or "")[:100] + "..."
+        } for row in rows]
+
+    async def _recent_history(self, user_id: str, limit: int) -> List[Dict]:
+        return await run_blocking(self._recent_conversations, user_id, limit)
+
+    @span("cognee.get_user_context")
     async def get_user_context(self, user_id: str, limit: int = 10) -> Dict:
         """Retrieve comprehensive user context with therapeutic insights"""
         try:
-            # Query for user's conversation history
-            query = f"conversations for user {user_id} emotional patterns therapeutic insights"
-            
-            search_results = await cognee.search("SIMILARITY", query)
+            recent_conversations, source = await self.context_chain.arun(user_id, limit)
             
             # Process results to extract meaningful context
             context = {
                 "user_id": user_id,
-                "recent_conversations": [],
+                "recent_conversations": recent_conversations,
+                "context_source": source,
                 "emotional_patterns": {},
                 "therapeutic_insights": [],
                 "crisis_history": [],
@@ -90,16 +181,6 @@ class CogneeMemoryService:
                 "recommended_interventions": []
             }
             
-            for result in search_results[:limit]:
-                if hasattr(result, 'payload') and result.payload.get('user_id') == user_id:
-                    conversation = result.payload
-                    context["recent_conversations"].append({
-                        "timestamp": conversation.get("timestamp"),
-                        "emotion": conversation.get("emotion"),
-                        "intensity": conversation.get("emotion_intensity"),
-                        "message": conversation.get("user_message", "")[:100] + "..."
-                    })
-            
             # Analyze emotional patterns
             context["emotional_patterns"] = await self._analyze_emotional_patterns(user_id)
             
@@ -112,68 +193,25 @@ class CogneeMemoryService:
             logger.error(f"❌ Failed to get user context: {e}")
             return {"user_id": user_id, "error": str(e)}
 
+    @span("cognee.analyze_emotional_patterns")
     async def _analyze_emotional_patterns(self, user_id: str) -> Dict:
-        """Analyze user's emotional patterns over time"""
+        """Analyze user's emotional patterns over time (O(1) read of incremental aggregates)"""
         try:
-            query = f"emotional patterns trends for user {user_id}"
-            results = await cognee.search("SIMILARITY", query)
-            
-            patterns = {
-                "dominant_emotions": {},
-                "emotional_volatility": 0.0,
-                "improvement_trend": "stable",
-                "trigger_patterns": [],
-                "time_patterns": {}
-            }
-            
-            emotions = []
-            timestamps = []
-            
-            for result in results:
-                if hasattr(result, 'payload') and result.payload.get('user_id') == user_id:
-                    emotion = result.payload.get('emotion', 'neutral')
-                    timestamp = result.payload.get('timestamp')
-                    
-                    emotions.append(emotion)
-                    timestamps.append(timestamp)
-            
-            # Calculate dominant emotions
-            if emotions:
-                emotion_counts = {}
-                for emotion in emotions:
-                    emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-                
-                total = len(emotions)
-                patterns["dominant_emotions"] = {
-                    emotion: count/total for emotion, count in emotion_counts.items()
-                }
-            
-            return patterns
+            return await run_blocking(emotion_aggregates.get_patterns, user_id)
             
         except Exception as e:
             logger.error(f"❌ Failed to analyze emotional patterns: {e}")
             return {}
 
+    @span("cognee.generate_therapeutic_insights")
     async def _generate_therapeutic_insights(self, user_id: str) -> List[TherapeuticInsight]:
         """Generate therapeutic insights based on conversation history"""
         try:
-            query = f"therapeutic insights recommendations for user {user_id}"
-            results = await cognee.search("SIMILARITY", query)
-            
+            aggregate = await run_blocking(emotion_aggregates.get, user_id)
             insights = []
             
-            # Analyze conversation patterns for therapeutic insights
-            conversation_themes = []
-            crisis_indicators = []
-            
-            for result in results:
-                if hasattr(result, 'payload') and result.payload.get('user_id') == user_id:
-                    payload = result.payload
-                    conversation_themes.append(payload.get('user_message', ''))
-                    crisis_indicators.extend(payload.get('crisis_indicators', []))
-            
             # Generate insights based on patterns
-            if conversation_themes:
+            if aggregate.conversation_count:
                 insights.append(TherapeuticInsight(
                     pattern_type="communication_style",
                     description="User shows consistent patterns in emotional expression",
@@ -185,7 +223,7 @@ class CogneeMemoryService:
                     created_at=datetime.now()
                 ))
             
-            if crisis_indicators:
+            if aggregate.crisis_indicator_count:
                 insights.append(TherapeuticInsight(
                     pattern_type="crisis_risk",
                     description="Detected potential crisis indicators in recent conversations",
@@ -204,28 +242,25 @@ class CogneeMemoryService:
             logger.error(f"❌ Failed to generate therapeutic insights: {e}")
             return []
 
+    @span("cognee.detect_crisis_indicators")
     async def detect_crisis_indicators(self, message: str, user_context: Dict) -> Dict:
         """Detect crisis indicators in user messages"""
-        crisis_keywords = [
-            "suicide", "kill myself", "end it all", "not worth living",
-            "hurt myself", "self-harm", "cutting", "overdose",
-            "hopeless", "no point", "give up", "can't go on"
-        ]
-        
-        message_lower = message.lower()
-        detected_indicators = []
+        lexicon_result = crisis_lexicon.scan(message)
+        detected_indicators = lexicon_result.terms("high") + lexicon_result.terms("medium")
         
-        for keyword in crisis_keywords:
-            if keyword in message_lower:
-                detected_indicators.append(keyword)
+        model_score = crisis_model.score(message)
         
         risk_level = "low"
         if len(detected_indicators) > 0:
-            risk_level = "high" if len(detected_indicators) > 2 else "medium"
+            high_risk = bool(lexicon_result.terms("high")) or len(detected_indicators) > 2
+            risk_level = "high" if high_risk else "medium"
+        elif crisis_model.should_escalate(model_score):
+            risk_level = "medium"
         
         return {
             "risk_level": risk_level,
             "indicators": detected_indicators,
+            "risk_probabilities": model_score.probabilities if model_score else None,
             "immediate_intervention_needed": risk_level == "high",
             "recommended_actions": self._get_crisis_recommendations(risk_level)
         }
@@ -253,95 +288,11 @@ class CogneeMemoryService:
                 "Provide general wellness resources"
             ]
 
-    async def get_therapeutic_exercises(self, user_id: str, emotion: str) -> List[Dict]:
+    async def get_therapeutic_exercises(self, user_id: str, emotion: str) -> Tuple[Dict, ...]:
         """Get personalized therapeutic exercises based on user's emotional state"""
-        exercises = {
-            "anxiety": [
-                {
-                    "name": "4-7-8 Breathing",
-                    "description": "Breathe in for 4, hold for 7, exhale for 8",
-                    "duration": "5 minutes",
-                    "type": "breathing",
-                    "instructions": [
-                        "Sit comfortably with your back straight",
-                        "Exhale completely through your mouth",
-                        "Inhale through nose for 4 counts",
-                        "Hold breath for 7 counts",
-                        "Exhale through mouth for 8 counts",
-                        "Repeat 3-4 times"
-                    ]
-                },
-                {
-                    "name": "Progressive Muscle Relaxation",
-                    "description": "Systematically tense and relax muscle groups",
-                    "duration": "10-15 minutes",
-                    "type": "relaxation",
-                    "instructions": [
-                        "Start with your toes, tense for 5 seconds",
-                        "Release and notice the relaxation",
-                        "Move up through each muscle group",
-                        "End with your face and scalp"
-                    ]
-                }
-            ],
-            "depression": [
-                {
-                    "name": "Gratitude Practice",
-                    "description": "Identify three things you're grateful for",
-                    "duration": "5 minutes",
-                    "type": "cognitive",
-                    "instructions": [
-                        "Think of three specific things from today",
-                        "Write them down if possible",
-                        "Reflect on why each matters to you",
-                        "Notice the positive feelings that arise"
-                    ]
-                },
-                {
-                    "name": "Behavioral Activation",
-                    "description": "Plan one small, achievable activity",
-                    "duration": "Variable",
-                    "type": "behavioral",
-                    "instructions": [
-                        "Choose something you used to enjoy",
-                        "Make it small and manageable",
-                        "Set a specific time to do it",
-                        "Focus on the action, not the feeling"
-                    ]
-                }
-            ],
-            "anger": [
-                {
-                    "name": "STOP Technique",
-                    "description": "Stop, Take a breath, Observe, Proceed mindfully",
-                    "duration": "2-3 minutes",
-                    "type": "mindfulness",
-                    "instructions": [
-                        "STOP what you're doing",
-                        "TAKE a deep breath",
-                        "OBSERVE your thoughts and feelings",
-                        "PROCEED with intention"
-                    ]
-                }
-            ],
-            "neutral": [
-                {
-                    "name": "Mindful Check-in",
-                    "description": "Brief awareness of current state",
-                    "duration": "3 minutes",
-                    "type": "mindfulness",
-                    "instructions": [
-                        "Notice your current emotional state",
-                        "Observe without judgment",
-                        "Acknowledge what you're feeling",
-                        "Set an intention for the day"
-                    ]
-                }
-            ]
-        }
-        
-        return exercises.get(emotion.lower(), exercises["neutral"])
+        return therapeutic_catalog.exercises(emotion)
 
+    @span("cognee.generate_proactive_checkin")
     async def generate_proactive_checkin(self, user_id: str) -> Dict:
         """Generate personalized proactive check-in based on user history"""
         try:
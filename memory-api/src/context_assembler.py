@@ -0,0 +1,200 @@
+"""
+Unified context assembly for the ORA memory API
+Fans out to the SQLite profile/history, Cognee and mem0 concurrently, then
+merges whatever answered within the deadline into one ranked, deduplicated,
+token-budgeted context block
+"""
+import os
+import re
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from conversation_manager import estimate_tokens, fit_lines
+from ora_mem0_service import mem0_service
+from metrics import time_stage
+from tracing import span, wrap_context
+from .cognee_service import cognee_service
+from .database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_DEADLINE = float(os.getenv("ORA_CONTEXT_DEADLINE", "0.8"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("ORA_UNIFIED_CONTEXT_TOKENS", "600"))
+# Items this similar (word overlap coefficient) to a higher-ranked one are the same memory
+DUPLICATE_SIMILARITY = 0.8
+
+# Base weight per source: semantic matches to the current message beat plain recency
+SOURCE_WEIGHTS = {"mem0": 1.0, "cognee": 0.9, "sqlite": 0.7}
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _tokens(text: str) -> Set[str]:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+@dataclass
+class ContextItem:
+    text: str
+    source: str
+    score: float
+    timestamp: Optional[str] = None
+    sources: List[str] = field(default_factory=list)
+    words: Set[str] = field(default_factory=set, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "sources": self.sources or [self.source],
+            "score": round(self.score, 4),
+            "timestamp": self.timestamp
+        }
+
+
+class ContextAssembler:
+    def __init__(self, deadline: float = CONTEXT_DEADLINE, token_budget: int = CONTEXT_TOKEN_BUDGET):
+        self.deadline = deadline
+        self.token_budget = token_budget
+
+    # 📌 Backends (each returns (profile lines, items))
+    def _sqlite(self, user_id: str, limit: int):
+        conn = get_db_connection()
+        try:
+            with time_stage("db_query"):
+                user = conn.execute('SELECT * FROM users WHERE user_id = ?', (user_id,)).fetchone()
+                rows = conn.execute('''
+                    SELECT user_message, ora_response, timestamp FROM conversations
+                    WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?
+                ''', (user_id, limit)).fetchall()
+        finally:
+            conn.close()
+
+        profile = []
+        if user:
+            if user['name']:
+                profile.append(f"User's name: {user['name']}")
+            if user['personality_type']:
+                profile.append(f"Personality: {user['personality_type']}")
+            if user['communication_style']:
+                profile.append(f"Communication style: {user['communication_style']}")
+
+        items = [
+            ContextItem(f"User said: {row['user_message']}", "sqlite",
+                        SOURCE_WEIGHTS["sqlite"] / (1 + rank), row['timestamp'])
+            for rank, row in enumerate(rows) if row['user_message']
+        ]
+        return profile, items
+
+    async def _cognee(self, user_id: str, limit: int):
+        conversations = await cognee_service._semantic_conversations(user_id, limit)
+        return [], [
+            ContextItem(f"User said: {conv['message'].rstrip('.')}", "cognee",
+                        SOURCE_WEIGHTS["cognee"] / (1 + rank), conv.get("timestamp"))
+            for rank, conv in enumerate(conversations) if conv.get("message")
+        ]
+
+    def _mem0(self, user_id: str, message: str, limit: int):
+        result = mem0_service.get_memories(user_id, query=message, limit=limit)
+        if not result.get("success"):
+            raise RuntimeError(result.get("error", "mem0 unavailable"))
+        items = []
+        for rank, memory in enumerate(result["memories"]):
+            if memory.get("memory"):
+                relevance = memory.get("score")
+                relevance = max(0.0, relevance) if isinstance(relevance, (int, float)) else 1 / (1 + rank)
+                items.append(ContextItem(f"Remembered: {memory['memory']}", "mem0",
+                                         SOURCE_WEIGHTS["mem0"] * relevance, memory.get("created_at")))
+        return [], items
+
+    # 📌 Assembly
+    @span("context.assemble")
+    async def assemble(self, user_id: str, message: str = "", limit: int = 5,
+                       deadline: float = None, max_tokens: int = None) -> Dict[str, Any]:
+        """One context for the prompt from every backend that answered before the deadline"""
+        started = time.perf_counter()
+        deadline = self.deadline if deadline is None else deadline
+        max_tokens = self.token_budget if max_tokens is None else max_tokens
+        loop = asyncio.get_event_loop()
+
+        tasks = {
+            "sqlite": loop.run_in_executor(None, wrap_context(self._sqlite), user_id, limit),
+            "cognee": asyncio.ensure_future(self._cognee(user_id, limit)),
+            "mem0": loop.run_in_executor(None, wrap_context(self._mem0), user_id, message, limit)
+        }
+        finished_at: Dict[str, float] = {}
+        for name, task in tasks.items():
+            task.add_done_callback(lambda _, name=name: finished_at.setdefault(name, time.perf_counter()))
+
+        await asyncio.wait(tasks.values(), timeout=deadline)
+
+        profile: List[str] = []
+        items: List[ContextItem] = []
+        sources: Dict[str, Dict[str, Any]] = {}
+        for name, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                sources[name] = {"status": "timeout"}
+                continue
+            latency_ms = round((finished_at.get(name, time.perf_counter()) - started) * 1000, 1)
+            if task.exception() is not None:
+                sources[name] = {"status": "error", "error": str(task.exception()), "latency_ms": latency_ms}
+                continue
+            source_profile, source_items = task.result()
+            profile.extend(source_profile)
+            items.extend(source_items)
+            sources[name] = {"status": "ok", "items": len(source_items), "latency_ms": latency_ms}
+
+        ranked = self._rank(self._dedupe(items), message)
+        lines = fit_lines(profile + [item.text for item in ranked], max_tokens)
+        kept = ranked[:max(0, len(lines) - len(profile))]
+        context = "\n".join(lines)
+
+        return {
+            "user_id": user_id,
+            "context": context,
+            "profile": profile,
+            "memories": [item.to_dict() for item in kept],
+            "sources": sources,
+            "deduplicated": len(items) - len(ranked),
+            "truncated": len(ranked) - len(kept),
+            "token_estimate": estimate_tokens(context),
+            "token_budget": max_tokens,
+            "deadline_ms": round(deadline * 1000),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    @staticmethod
+    def _dedupe(items: List[ContextItem]) -> List[ContextItem]:
+        """Collapse the same memory reported by several backends, keeping the best score"""
+        kept: List[ContextItem] = []
+        for item in sorted(items, key=lambda i: i.score, reverse=True):
+            item.words = _tokens(item.text.split(":", 1)[-1])
+            for existing in kept:
+                # Overlap over the smaller set, so a truncated copy still matches the full text
+                smaller = min(len(item.words), len(existing.words))
+                if smaller and len(item.words & existing.words) / smaller >= DUPLICATE_SIMILARITY:
+                    if item.source not in existing.sources:
+                        existing.sources.append(item.source)
+                    break
+            else:
+                item.sources = [item.source]
+                kept.append(item)
+        return kept
+
+    @staticmethod
+    def _rank(items: List[ContextItem], message: str) -> List[ContextItem]:
+        """Source score, boosted by word overlap with the current message"""
+        query = _tokens(message)
+        for item in items:
+            if query:
+                item.score *= 1 + len(query & item.words) / len(query)
+            # Corroborated by several backends: a little more trustworthy
+            item.score *= 1 + 0.1 * (len(item.sources) - 1)
+        return sorted(items, key=lambda i: i.score, reverse=True)
+
+
+# Global instance
+context_assembler = ContextAssembler()
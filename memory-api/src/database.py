@@ -0,0 +1,138 @@
+"""
+Shared SQLite access for the ORA memory API
+"""
+import os
+import sqlite3
+
+DB_PATH = os.getenv('ORA_MEMORY_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ora_memory.db'))
+
+
+def get_db_connection():
+    """Get SQLite database connection"""
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row  # This enables column access by name
+    return conn
+
+
+def run_in_transaction(fn, *args):
+    """Run fn(cursor, *args) as one transaction on a fresh connection and return its result"""
+    conn = get_db_connection()
+    try:
+        result = fn(conn.cursor(), *args)
+        conn.commit()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def init_db():
+    """Initialize SQLite database with required tables"""
+    db_path = DB_PATH
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    # Users table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY,
+            name TEXT,
+            personality_type TEXT,
+            communication_style TEXT,
+            first_visit TIMESTAMP,
+            last_visit TIMESTAMP,
+            onboarding_complete BOOLEAN DEFAULT 0,
+            preferences TEXT,
+            total_conversations INTEGER DEFAULT 0,
+            therapeutic_profile TEXT,
+            crisis_history TEXT,
+            progress_metrics TEXT
+        )
+    ''')
+    
+    # Conversations table (enhanced)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            timestamp TIMESTAMP,
+            user_message TEXT,
+            ora_response TEXT,
+            emotion TEXT,
+            emotion_intensity REAL,
+            topic TEXT,
+            session_id TEXT,
+            therapeutic_context TEXT,
+            crisis_indicators TEXT,
+            intervention_applied BOOLEAN DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    ''')
+    
+    # User insights table (enhanced)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_insights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            insight_type TEXT,
+            insight_value TEXT,
+            confidence_score REAL,
+            created_at TIMESTAMP,
+            therapeutic_relevance TEXT,
+            action_taken TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    ''')
+    
+    # Therapeutic sessions table (new)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS therapeutic_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            session_id TEXT,
+            start_time TIMESTAMP,
+            end_time TIMESTAMP,
+            session_type TEXT,
+            techniques_used TEXT,
+            outcomes TEXT,
+            notes TEXT,
+            crisis_level TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    ''')
+    
+    # Progress tracking table (new)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS progress_tracking (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            metric_name TEXT,
+            metric_value REAL,
+            measurement_date TIMESTAMP,
+            trend TEXT,
+            notes TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    ''')
+    
+    # Crisis interventions table (new)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS crisis_interventions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            intervention_time TIMESTAMP,
+            risk_level TEXT,
+            indicators TEXT,
+            actions_taken TEXT,
+            outcome TEXT,
+            follow_up_required BOOLEAN DEFAULT 1,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    ''')
+    
+    conn.commit()
+    conn.close()
+    print(f"✅ Enhanced database initialized at: {db_path}")
@@ -0,0 +1,208 @@
+import json
+import math
+import logging
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Dict, List, Optional
+from .database import get_db_connection
+from therapeutic_catalog import therapeutic_catalog
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Valence is scored on the label as given ("calm" is positive, its catalog label "neutral" isn't)
+POSITIVE_EMOTIONS = {"happy", "happiness", "joy", "excited", "calm", "content", "grateful", "hopeful"}
+NEGATIVE_EMOTIONS = {"sad", "sadness", "angry", "anger", "anxious", "anxiety", "fear", "depression", "stressed",
+                     "frustrated", "lonely", "overwhelmed"}
+
+DAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+@dataclass
+class EmotionAggregate:
+    """Per-user running emotional statistics, updated in O(1) per conversation"""
+    user_id: str
+    conversation_count: int = 0
+    crisis_indicator_count: int = 0
+    decayed_counts: Dict[str, float] = field(default_factory=dict)
+    last_update: float = 0.0
+    intensity_mean: float = 0.0
+    intensity_var: float = 0.0
+    hour_histogram: List[int] = field(default_factory=lambda: [0] * 24)
+    weekday_histogram: List[int] = field(default_factory=lambda: [0] * 7)
+    first_seen: float = 0.0
+    # Least-squares sums for valence over time (x = days since first_seen)
+    sum_x: float = 0.0
+    sum_y: float = 0.0
+    sum_xx: float = 0.0
+    sum_xy: float = 0.0
+
+
+class EmotionAggregateStore:
+    """
+    Incremental emotional-pattern aggregates
+    Exponentially decayed emotion frequencies, EW intensity variance,
+    hour/weekday histograms and a valence trend slope - no vector search needed
+    """
+
+    def __init__(self, half_life_days: float = 14.0, intensity_alpha: float = 0.1):
+        self.decay_rate = math.log(2) / (half_life_days * 86400)
+        self.intensity_alpha = intensity_alpha
+        self._schema_ready = False
+
+    def _ensure_schema(self, conn):
+        if not self._schema_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS emotion_aggregates (
+                    user_id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    updated_at TIMESTAMP
+                )
+            ''')
+            conn.commit()
+            self._schema_ready = True
+
+    @staticmethod
+    def _read(conn, user_id: str) -> EmotionAggregate:
+        row = conn.execute('SELECT state FROM emotion_aggregates WHERE user_id = ?', (user_id,)).fetchone()
+        return EmotionAggregate(**json.loads(row['state'])) if row else EmotionAggregate(user_id=user_id)
+
+    @span("emotion_aggregates.record")
+    def record(self, user_id: str, emotion: str, intensity: float = 0.5,
+               timestamp: Optional[str] = None, crisis_indicators: Optional[List] = None):
+        """Fold one stored conversation into the user's aggregate"""
+        try:
+            when = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+        except (TypeError, ValueError):
+            when = datetime.now()
+        label = (emotion or "neutral").strip().lower()
+        intensity = float(intensity if intensity is not None else 0.5)
+
+        conn = get_db_connection()
+        try:
+            self._ensure_schema(conn)
+            # Read-modify-write under SQLite's write lock so concurrent workers
+            # (threads or processes) never fold into a stale copy of the row
+            conn.execute('BEGIN IMMEDIATE')
+            aggregate = self._read(conn, user_id)
+            self._fold(aggregate, label, intensity, when, len(crisis_indicators or []))
+            conn.execute('''
+                INSERT INTO emotion_aggregates (user_id, state, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at
+            ''', (aggregate.user_id, json.dumps(asdict(aggregate)), datetime.now().isoformat()))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _fold(self, aggregate: EmotionAggregate, emotion: str, intensity: float,
+              when: datetime, crisis_count: int):
+        now = when.timestamp()
+        # Frequencies are kept per catalog label, so "anxious"/"anxiety" or "sad"/"depression" count together
+        canonical = therapeutic_catalog.canonical(emotion)
+
+        # Decay every frequency to `now`, then add this observation
+        if aggregate.last_update:
+            factor = math.exp(-self.decay_rate * max(now - aggregate.last_update, 0.0))
+            for key in aggregate.decayed_counts:
+                aggregate.decayed_counts[key] *= factor
+        aggregate.decayed_counts[canonical] = aggregate.decayed_counts.get(canonical, 0.0) + 1.0
+        aggregate.last_update = max(now, aggregate.last_update)
+
+        # Exponentially weighted mean/variance of intensity (volatility)
+        if aggregate.conversation_count == 0:
+            aggregate.intensity_mean = intensity
+            aggregate.intensity_var = 0.0
+        else:
+            delta = intensity - aggregate.intensity_mean
+            aggregate.intensity_mean += self.intensity_alpha * delta
+            aggregate.intensity_var = (1 - self.intensity_alpha) * (
+                aggregate.intensity_var + self.intensity_alpha * delta * delta
+            )
+
+        aggregate.hour_histogram[when.hour] += 1
+        aggregate.weekday_histogram[when.weekday()] += 1
+
+        if not aggregate.first_seen:
+            aggregate.first_seen = now
+        x = (now - aggregate.first_seen) / 86400
+        y = self._valence(emotion, intensity)
+        aggregate.sum_x += x
+        aggregate.sum_y += y
+        aggregate.sum_xx += x * x
+        aggregate.sum_xy += x * y
+
+        aggregate.conversation_count += 1
+        aggregate.crisis_indicator_count += crisis_count
+
+    @staticmethod
+    def _valence(emotion: str, intensity: float) -> float:
+        if emotion in POSITIVE_EMOTIONS:
+            return intensity
+        if emotion in NEGATIVE_EMOTIONS:
+            return -intensity
+        return 0.0
+
+    def get(self, user_id: str) -> EmotionAggregate:
+        """Current aggregate, read from the database (other workers may have updated it)"""
+        conn = get_db_connection()
+        try:
+            self._ensure_schema(conn)
+            return self._read(conn, user_id)
+        finally:
+            conn.close()
+
+    @span("emotion_aggregates.get_patterns")
+    def get_patterns(self, user_id: str) -> Dict:
+        """Emotional patterns in the shape returned by CogneeMemoryService"""
+        aggregate = self.get(user_id)
+        patterns = {
+            "dominant_emotions": {},
+            "emotional_volatility": 0.0,
+            "improvement_trend": "stable",
+            "trend_slope": 0.0,
+            "trigger_patterns": [],
+            "time_patterns": {},
+            "conversation_count": aggregate.conversation_count
+        }
+        if not aggregate.conversation_count:
+            return patterns
+
+        # Rows written before labels were normalized may still hold raw labels - merge them
+        counts: Dict[str, float] = {}
+        for emotion, weight in aggregate.decayed_counts.items():
+            canonical = therapeutic_catalog.canonical(emotion)
+            counts[canonical] = counts.get(canonical, 0.0) + weight
+        total = sum(counts.values())
+        if total > 0:
+            patterns["dominant_emotions"] = {
+                emotion: round(weight / total, 4) for emotion, weight in counts.items()
+            }
+
+        patterns["emotional_volatility"] = round(math.sqrt(aggregate.intensity_var), 4)
+
+        n = aggregate.conversation_count
+        denominator = n * aggregate.sum_xx - aggregate.sum_x ** 2
+        if n > 1 and denominator > 1e-9:
+            slope = (n * aggregate.sum_xy - aggregate.sum_x * aggregate.sum_y) / denominator
+            patterns["trend_slope"] = round(slope, 4)
+            if slope > 0.01:
+                patterns["improvement_trend"] = "improving"
+            elif slope < -0.01:
+                patterns["improvement_trend"] = "declining"
+
+        peak_hour = max(range(24), key=lambda h: aggregate.hour_histogram[h])
+        peak_day = max(range(7), key=lambda d: aggregate.weekday_histogram[d])
+        patterns["time_patterns"] = {
+            "hour_of_day": {str(h): c for h, c in enumerate(aggregate.hour_histogram) if c},
+            "day_of_week": {DAY_NAMES[d]: c for d, c in enumerate(aggregate.weekday_histogram) if c},
+            "peak_hour": peak_hour,
+            "peak_day": DAY_NAMES[peak_day]
+        }
+        return patterns
+
+
+# Global instance
+emotion_aggregates = EmotionAggregateStore()
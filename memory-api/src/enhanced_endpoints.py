@@ -0,0 +1,197 @@
+"""
+/api/enhanced request handling shared by the Flask routes (routes/enhanced_memory.py)
+and the Quart routes (asgi_routes/enhanced_memory.py). Handlers take the parsed JSON
+body and return (payload, status); the route modules only parse, await and serialize.
+"""
+import json
+import asyncio
+import functools
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from .cognee_service import cognee_service
+from .therapeutic_service import therapeutic_service
+from .emotion_aggregates import emotion_aggregates
+from .async_db import run_blocking
+from . import progress_analytics
+from response_cache import response_cache
+from resilience import breaker_states
+
+Result = Tuple[Any, int]
+
+
+def _endpoint(handler):
+    """Missing bodies read as {}; any error becomes {'error': ...}, 500 like every other route"""
+    @functools.wraps(handler)
+    async def wrapper(data: Optional[Dict]) -> Result:
+        try:
+            return await handler(data or {})
+        except Exception as e:
+            return {'error': str(e)}, 500
+    return wrapper
+
+
+def _required(*names) -> Optional[Result]:
+    return {'error': f"{' and '.join(names)} {'is' if len(names) == 1 else 'are'} required"}, 400
+
+
+@_endpoint
+async def cognee_context(data: Dict) -> Result:
+    user_id = data.get('user_id')
+    if not user_id:
+        return _required('user_id')
+    return await cognee_service.get_user_context(user_id, data.get('limit', 10)), 200
+
+
+@_endpoint
+async def cognee_store(data: Dict) -> Result:
+    user_id = data.get('user_id')
+    if not user_id:
+        return _required('user_id')
+    success = await cognee_service.store_conversation(user_id, data.get('conversation_data', {}))
+    return {
+        'success': success,
+        'user_id': user_id,
+        'timestamp': datetime.now().isoformat()
+    }, 200
+
+
+@_endpoint
+async def therapeutic_insights(data: Dict) -> Result:
+    user_id = data.get('user_id')
+    if not user_id:
+        return _required('user_id')
+    return await therapeutic_service.get_user_insights(user_id), 200
+
+
+@_endpoint
+async def therapeutic_progress(data: Dict) -> Result:
+    user_id = data.get('user_id')
+    if not user_id:
+        return _required('user_id')
+    return await therapeutic_service.analyze_user_progress(user_id, data.get('timeframe_days', 30)), 200
+
+
+@_endpoint
+async def therapeutic_respond(data: Dict) -> Result:
+    user_id = data.get('user_id')
+    message = data.get('message', '')
+    if not user_id or not message:
+        return _required('user_id', 'message')
+    user_context = await cognee_service.get_user_context(user_id)
+    user_context.setdefault('user_id', user_id)
+    return await therapeutic_service.generate_therapeutic_response(
+        message, user_context, data.get('emotion', 'neutral')), 200
+
+
+def therapeutic_stream_error(data: Optional[Dict]) -> Optional[Result]:
+    """Validation for the streaming route (checked before the event stream starts)"""
+    data = data or {}
+    if not data.get('user_id') or not data.get('message'):
+        return _required('user_id', 'message')
+    return None
+
+
+async def therapeutic_stream_events(data: Dict) -> AsyncIterator[str]:
+    """Server-sent events for a streamed therapeutic response"""
+    user_id = data['user_id']
+    user_context = await cognee_service.get_user_context(user_id)
+    user_context.setdefault('user_id', user_id)
+    async for event in therapeutic_service.stream_therapeutic_response(
+            data['message'], user_context, data.get('emotion', 'neutral')):
+        yield f"data: {json.dumps(event)}\n\n"
+
+
+@_endpoint
+async def crisis_assess(data: Dict) -> Result:
+    message = data.get('message', '')
+    user_id = data.get('user_id')
+    if not message:
+        return _required('message')
+    user_context = await cognee_service.get_user_context(user_id or 'anonymous')
+    crisis_assessment = await cognee_service.detect_crisis_indicators(message, user_context)
+    return {
+        'crisis_assessment': crisis_assessment,
+        'user_id': user_id,
+        'timestamp': datetime.now().isoformat()
+    }, 200
+
+
+@_endpoint
+async def exercises(data: Dict) -> Result:
+    user_id = data.get('user_id')
+    emotion = data.get('emotion', 'neutral')
+    exercise_type = data.get('type', 'any')
+    if not user_id:
+        return _required('user_id')
+
+    found = await cognee_service.get_therapeutic_exercises(user_id, emotion)
+    # Filter by type if specified
+    if exercise_type != 'any':
+        found = [ex for ex in found if ex.get('type') == exercise_type]
+    return {
+        'exercises': found,
+        'user_id': user_id,
+        'emotion': emotion,
+        'generated_at': datetime.now().isoformat()
+    }, 200
+
+
+@_endpoint
+async def checkin(data: Dict) -> Result:
+    user_id = data.get('user_id')
+    if not user_id:
+        return _required('user_id')
+    return await cognee_service.generate_proactive_checkin(user_id), 200
+
+
+@_endpoint
+async def emotional_patterns(data: Dict) -> Result:
+    user_id = data.get('user_id')
+    timeframe_days = int(data.get('timeframe_days', 30))
+    if not user_id:
+        return _required('user_id')
+
+    # Windowed rollups, incremental aggregates and insights are independent - run them concurrently
+    windows, patterns, insights = await asyncio.gather(
+        run_blocking(progress_analytics.compare_windows, user_id,
+                     tuple(sorted(set(progress_analytics.STANDARD_WINDOWS) | {timeframe_days}))),
+        run_blocking(emotion_aggregates.get_patterns, user_id),
+        cognee_service._generate_therapeutic_insights(user_id)
+    )
+    return {
+        'user_id': user_id,
+        'timeframe_days': timeframe_days,
+        'emotional_patterns': patterns,
+        'window_comparison': windows[timeframe_days],
+        'windows': {str(days): windows[days] for days in progress_analytics.STANDARD_WINDOWS},
+        'insights': insights,
+        'recommendations': progress_analytics.emotional_recommendations(patterns),
+        'generated_at': datetime.now().isoformat()
+    }, 200
+
+
+def cache_opt_out(data: Optional[Dict]) -> Result:
+    data = data or {}
+    user_id = data.get('user_id')
+    opt_out = bool(data.get('opt_out', True))
+    if not user_id:
+        return _required('user_id')
+    response_cache.set_opt_out(user_id, opt_out)
+    return {'user_id': user_id, 'opt_out': opt_out}, 200
+
+
+def health() -> Dict:
+    return {
+        'status': 'healthy',
+        'service': 'Enhanced Memory API',
+        'features': [
+            'cognee_integration',
+            'therapeutic_insights',
+            'crisis_detection',
+            'progress_tracking',
+            'emotional_analytics'
+        ],
+        'circuit_breakers': breaker_states(),
+        'context_sources': cognee_service.context_chain.stats(),
+        'timestamp': datetime.now().isoformat()
+    }
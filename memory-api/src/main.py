@@ -1,13 +1,20 @@
 import os
 import sys
-import sqlite3
 from datetime import datetime
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+# Shared ORA modules (local memory backend, ...) live in the repository root
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from flask import Flask, request, jsonify
 from src.routes.memory import memory_bp
 from src.routes.enhanced_memory import enhanced_memory_bp
+from src.routes.context import context_bp
+from src.database import init_db
+from resilience import breaker_states
+from metrics import instrument_flask
+from tracing import trace_flask
+from profiler import profile_flask
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'ora-memory-secret-key-2024'
@@ -15,116 +22,10 @@ app.config['SECRET_KEY'] = 'ora-memory-secret-key-2024'
 # Register memory routes
 app.register_blueprint(memory_bp, url_prefix='/api/memory')
 app.register_blueprint(enhanced_memory_bp, url_prefix='/api/enhanced')
-
-# Initialize SQLite database
-def init_db():
-    """Initialize SQLite database with required tables"""
-    db_path = os.path.join(os.path.dirname(__file__), 'ora_memory.db')
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            user_id TEXT PRIMARY KEY,
-            name TEXT,
-            personality_type TEXT,
-            communication_style TEXT,
-            first_visit TIMESTAMP,
-            last_visit TIMESTAMP,
-            onboarding_complete BOOLEAN DEFAULT 0,
-            preferences TEXT,
-            total_conversations INTEGER DEFAULT 0,
-            therapeutic_profile TEXT,
-            crisis_history TEXT,
-            progress_metrics TEXT
-        )
-    ''')
-    
-    # Conversations table (enhanced)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS conversations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            timestamp TIMESTAMP,
-            user_message TEXT,
-            ora_response TEXT,
-            emotion TEXT,
-            emotion_intensity REAL,
-            topic TEXT,
-            session_id TEXT,
-            therapeutic_context TEXT,
-            crisis_indicators TEXT,
-            intervention_applied BOOLEAN DEFAULT 0,
-            FOREIGN KEY (user_id) REFERENCES users (user_id)
-        )
-    ''')
-    
-    # User insights table (enhanced)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_insights (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            insight_type TEXT,
-            insight_value TEXT,
-            confidence_score REAL,
-            created_at TIMESTAMP,
-            therapeutic_relevance TEXT,
-            action_taken TEXT,
-            FOREIGN KEY (user_id) REFERENCES users (user_id)
-        )
-    ''')
-    
-    # Therapeutic sessions table (new)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS therapeutic_sessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            session_id TEXT,
-            start_time TIMESTAMP,
-            end_time TIMESTAMP,
-            session_type TEXT,
-            techniques_used TEXT,
-            outcomes TEXT,
-            notes TEXT,
-            crisis_level TEXT,
-            FOREIGN KEY (user_id) REFERENCES users (user_id)
-        )
-    ''')
-    
-    # Progress tracking table (new)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS progress_tracking (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            metric_name TEXT,
-            metric_value REAL,
-            measurement_date TIMESTAMP,
-            trend TEXT,
-            notes TEXT,
-            FOREIGN KEY (user_id) REFERENCES users (user_id)
-        )
-    ''')
-    
-    # Crisis interventions table (new)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS crisis_interventions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            intervention_time TIMESTAMP,
-            risk_level TEXT,
-            indicators TEXT,
-            actions_taken TEXT,
-            outcome TEXT,
-            follow_up_required BOOLEAN DEFAULT 1,
-            FOREIGN KEY (user_id) REFERENCES users (user_id)
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
-    print(f"✅ Enhanced database initialized at: {db_path}")
+app.register_blueprint(context_bp, url_prefix='/api/context')
+instrument_flask(app, "memory_api")
+trace_flask(app, "memory_api")
+profile_flask(app)
 
 # Health check endpoint
 @app.route('/health')
@@ -140,6 +41,7 @@ def health_check():
             'progress_tracking',
             'semantic_memory'
         ],
+        'circuit_breakers': breaker_states(),
         'timestamp': datetime.now().isoformat()
     })
 
@@ -154,6 +56,9 @@ def root():
             'legacy_memory': '/api/memory/*',
             'enhanced_memory': '/api/enhanced/*',
             'cognee_context': '/api/enhanced/cognee/context',
+            'unified_context': '/api/context/unified',
+            'metrics': '/metrics',
+            'profiler': '/admin/profiler/status',
             'therapeutic_insights': '/api/enhanced/therapeutic/insights',
             'crisis_assessment': '/api/enhanced/crisis/assess',
             'progress_tracking': '/api/enhanced/therapeutic/progress'
@@ -0,0 +1,232 @@
+"""
+Legacy memory queries shared by the Flask routes and the async (ASGI) routes
+Each function does its work on the caller's cursor and returns the JSON payload,
+so the same SQL runs under database.run_in_transaction or async_db.run
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from . import progress_analytics
+
+PROFILE_FIELDS = ['name', 'personality_type', 'communication_style', 'preferences', 'onboarding_complete']
+
+
+def get_context(cursor, user_id: str) -> Dict[str, Any]:
+    """User context for personalized AI responses (creates the profile of a new user)"""
+    cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
+    user = cursor.fetchone()
+
+    if not user:
+        # New user - create profile
+        now = datetime.now().isoformat()
+        cursor.execute('''
+            INSERT INTO users (user_id, first_visit, last_visit, onboarding_complete, total_conversations)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (user_id, now, now, False, 0))
+        return {
+            'is_new_user': True,
+            'user_id': user_id,
+            'context': 'New user - start onboarding',
+            'onboarding_complete': False,
+            'suggested_response': "Hi! I'm ORA, your wellness companion. What's your name?"
+        }
+
+    # Existing user - get recent conversations
+    cursor.execute('''
+        SELECT user_message, ora_response, emotion, topic, timestamp
+        FROM conversations
+        WHERE user_id = ?
+        ORDER BY timestamp DESC
+        LIMIT 5
+    ''', (user_id,))
+    recent_conversations = cursor.fetchall()
+
+    # Update last visit
+    cursor.execute('UPDATE users SET last_visit = ? WHERE user_id = ?',
+                   (datetime.now().isoformat(), user_id))
+
+    # Build context string
+    context_parts = []
+
+    if user['name']:
+        context_parts.append(f"User's name: {user['name']}")
+
+    if user['personality_type']:
+        context_parts.append(f"Personality: {user['personality_type']}")
+
+    if user['communication_style']:
+        context_parts.append(f"Communication style: {user['communication_style']}")
+
+    if user['total_conversations'] > 0:
+        context_parts.append(f"Total conversations: {user['total_conversations']}")
+
+    # Add recent conversation history
+    if recent_conversations:
+        context_parts.append("Recent conversation history:")
+        for conv in reversed(list(recent_conversations)[-3:]):  # Last 3 conversations
+            context_parts.append(f"User: {conv['user_message']}")
+            context_parts.append(f"ORA: {conv['ora_response']}")
+
+    # Calculate days since last visit
+    if user['last_visit']:
+        try:
+            last_visit = datetime.fromisoformat(user['last_visit'])
+            days_since = (datetime.now() - last_visit).days
+            if days_since > 0:
+                context_parts.append(f"Days since last conversation: {days_since}")
+        except:
+            pass
+
+    context = "\n".join(context_parts) if context_parts else "Returning user with no previous context"
+
+    return {
+        'is_new_user': False,
+        'user_id': user_id,
+        'name': user['name'],
+        'personality_type': user['personality_type'],
+        'communication_style': user['communication_style'],
+        'onboarding_complete': bool(user['onboarding_complete']),
+        'total_conversations': user['total_conversations'],
+        'context': context,
+        'recent_conversations_count': len(recent_conversations)
+    }
+
+
+def save_conversation(cursor, user_id: str, user_message: str, ora_response: str, emotion: str = '',
+                      topic: str = '', session_id: str = '', emotion_intensity: Optional[float] = None,
+                      crisis_indicators: list = None, timestamp: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Save one conversation, its daily rollups and the user's counters in the caller's transaction
+    timestamp (ISO) dates a turn saved after the fact, e.g. from a batch; defaults to now
+    """
+    crisis_indicators = crisis_indicators or []
+    timestamp = timestamp or datetime.now().isoformat()
+
+    cursor.execute('''
+        INSERT INTO conversations (user_id, timestamp, user_message, ora_response, emotion, topic, session_id,
+                                   emotion_intensity, crisis_indicators)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (user_id, timestamp, user_message, ora_response, emotion, topic, session_id,
+          emotion_intensity, json.dumps(crisis_indicators)))
+
+    # Daily rollups for windowed progress analytics (same transaction)
+    progress_analytics.record_conversation(
+        cursor, user_id, timestamp, emotion, emotion_intensity, bool(crisis_indicators)
+    )
+
+    # Update user's total conversation count
+    cursor.execute('''
+        UPDATE users
+        SET total_conversations = total_conversations + 1, last_visit = MAX(COALESCE(last_visit, ''), ?)
+        WHERE user_id = ?
+    ''', (timestamp, user_id))
+
+    return {
+        'status': 'saved',
+        'user_id': user_id,
+        'timestamp': timestamp
+    }
+
+
+def update_profile(cursor, user_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Update the allowed profile fields present in data"""
+    update_fields = []
+    values = []
+
+    for field in PROFILE_FIELDS:
+        if field in data:
+            update_fields.append(f"{field} = ?")
+            values.append(data[field])
+
+    if update_fields:
+        update_fields.append("last_visit = ?")
+        values.append(datetime.now().isoformat())
+        values.append(user_id)
+
+        query = f"UPDATE users SET {', '.join(update_fields)} WHERE user_id = ?"
+        cursor.execute(query, values)
+
+    return {
+        'status': 'updated',
+        'user_id': user_id,
+        'updated_fields': list(data.keys())
+    }
+
+
+def get_stats(cursor, user_id: str) -> Optional[Dict[str, Any]]:
+    """User statistics and emotion patterns, or None for an unknown user"""
+    cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
+    user = cursor.fetchone()
+
+    if not user:
+        return None
+
+    # Get conversation stats
+    cursor.execute('''
+        SELECT
+            COUNT(*) as total_conversations,
+            MIN(timestamp) as first_conversation,
+            MAX(timestamp) as last_conversation
+        FROM conversations
+        WHERE user_id = ?
+    ''', (user_id,))
+    conv_stats = cursor.fetchone()
+
+    # Get emotion patterns
+    cursor.execute('''
+        SELECT emotion, COUNT(*) as count
+        FROM conversations
+        WHERE user_id = ? AND emotion != ''
+        GROUP BY emotion
+        ORDER BY count DESC
+        LIMIT 5
+    ''', (user_id,))
+    emotion_patterns = cursor.fetchall()
+
+    return {
+        'user_id': user_id,
+        'name': user['name'],
+        'member_since': user['first_visit'],
+        'last_visit': user['last_visit'],
+        'total_conversations': conv_stats['total_conversations'],
+        'onboarding_complete': bool(user['onboarding_complete']),
+        'personality_type': user['personality_type'],
+        'communication_style': user['communication_style'],
+        'emotion_patterns': [dict(row) for row in emotion_patterns]
+    }
+
+
+def search_conversations(cursor, user_id: str, query: str = '', limit: int = 10) -> Dict[str, Any]:
+    """Conversations matching query (or the most recent ones), newest first"""
+    if query:
+        # Search in messages
+        cursor.execute('''
+            SELECT user_message, ora_response, emotion, topic, timestamp
+            FROM conversations
+            WHERE user_id = ? AND (
+                user_message LIKE ? OR
+                ora_response LIKE ? OR
+                topic LIKE ?
+            )
+            ORDER BY timestamp DESC
+            LIMIT ?
+        ''', (user_id, f'%{query}%', f'%{query}%', f'%{query}%', limit))
+    else:
+        # Get recent conversations
+        cursor.execute('''
+            SELECT user_message, ora_response, emotion, topic, timestamp
+            FROM conversations
+            WHERE user_id = ?
+            ORDER BY timestamp DESC
+            LIMIT ?
+        ''', (user_id, limit))
+
+    conversations = cursor.fetchall()
+
+    return {
+        'user_id': user_id,
+        'query': query,
+        'results': [dict(row) for row in conversations],
+        'count': len(conversations)
+    }
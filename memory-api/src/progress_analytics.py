@@ -0,0 +1,221 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from .database import get_db_connection
+from .emotion_aggregates import POSITIVE_EMOTIONS, NEGATIVE_EMOTIONS
+
+logger = logging.getLogger(__name__)
+
+STANDARD_WINDOWS = (7, 30, 90, 365)
+
+# Daily counters; each has a cum_* running total so any window is two PK lookups
+ROLLUP_FIELDS = ("conversations", "intensity_sum", "positive", "negative", "crisis")
+
+
+_schema_ready = False
+
+
+def ensure_schema(cursor):
+    global _schema_ready
+    if _schema_ready:
+        return
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_rollups (
+            user_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            conversations INTEGER DEFAULT 0,
+            intensity_sum REAL DEFAULT 0,
+            positive INTEGER DEFAULT 0,
+            negative INTEGER DEFAULT 0,
+            crisis INTEGER DEFAULT 0,
+            cum_conversations INTEGER DEFAULT 0,
+            cum_intensity_sum REAL DEFAULT 0,
+            cum_positive INTEGER DEFAULT 0,
+            cum_negative INTEGER DEFAULT 0,
+            cum_crisis INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, day)
+        )
+    ''')
+    _schema_ready = True
+
+
+def _delta(emotion: Optional[str], intensity: Optional[float], crisis: bool) -> Dict[str, float]:
+    emotion = (emotion or "").lower()
+    return {
+        "conversations": 1,
+        "intensity_sum": float(intensity) if intensity is not None else 0.5,
+        "positive": 1 if emotion in POSITIVE_EMOTIONS else 0,
+        "negative": 1 if emotion in NEGATIVE_EMOTIONS else 0,
+        "crisis": 1 if crisis else 0
+    }
+
+
+def record_conversation(cursor, user_id: str, timestamp: str, emotion: Optional[str],
+                        intensity: Optional[float] = None, crisis: bool = False):
+    """
+    Fold one conversation into the daily rollups using the caller's cursor,
+    so it commits in the same transaction as the conversations insert
+    """
+    ensure_schema(cursor)
+    day = timestamp[:10]
+    delta = _delta(emotion, intensity, crisis)
+
+    cursor.execute('SELECT 1 FROM daily_rollups WHERE user_id = ? AND day = ?', (user_id, day))
+    if cursor.fetchone():
+        cursor.execute(f'''
+            UPDATE daily_rollups SET {", ".join(f"{f} = {f} + ?" for f in ROLLUP_FIELDS)}
+            WHERE user_id = ? AND day = ?
+        ''', [delta[f] for f in ROLLUP_FIELDS] + [user_id, day])
+    else:
+        # Seed running totals from the previous day that has data
+        previous = _totals_at(cursor, user_id, day, inclusive=False)
+        cursor.execute(f'''
+            INSERT INTO daily_rollups (user_id, day, {", ".join(ROLLUP_FIELDS)}, {", ".join("cum_" + f for f in ROLLUP_FIELDS)})
+            VALUES (?, ?, {", ".join("?" for _ in range(2 * len(ROLLUP_FIELDS)))})
+        ''', [user_id, day] + [delta[f] for f in ROLLUP_FIELDS] + previous)
+
+    # Running totals: this day and (only for back-dated writes) every later day
+    cursor.execute(f'''
+        UPDATE daily_rollups SET {", ".join(f"cum_{f} = cum_{f} + ?" for f in ROLLUP_FIELDS)}
+        WHERE user_id = ? AND day >= ?
+    ''', [delta[f] for f in ROLLUP_FIELDS] + [user_id, day])
+
+
+def _totals_at(cursor, user_id: str, day: str, inclusive: bool = True) -> List[float]:
+    cursor.execute(f'''
+        SELECT {", ".join("cum_" + f for f in ROLLUP_FIELDS)}
+        FROM daily_rollups WHERE user_id = ? AND day {"<=" if inclusive else "<"} ?
+        ORDER BY day DESC LIMIT 1
+    ''', (user_id, day))
+    row = cursor.fetchone()
+    return [float(v) for v in row] if row else [0.0] * len(ROLLUP_FIELDS)
+
+
+def _window_stats(totals: List[float]) -> Dict[str, float]:
+    stats = dict(zip(ROLLUP_FIELDS, totals))
+    count = stats["conversations"]
+    return {
+        "conversations": count,
+        "average_intensity": stats["intensity_sum"] / count if count else 0.0,
+        "positive_ratio": stats["positive"] / count if count else 0.0,
+        "negative_ratio": stats["negative"] / count if count else 0.0,
+        "emotional_balance": (stats["positive"] - stats["negative"]) / count if count else 0.0,
+        "crisis_events": stats["crisis"]
+    }
+
+
+def compare_windows(user_id: str, windows=STANDARD_WINDOWS, now: Optional[datetime] = None) -> Dict[int, Dict]:
+    """
+    Current vs previous period for every window, e.g. last 30 days vs the 30 before.
+    Cost is 2 indexed lookups per window plus one for today - independent of history length.
+    """
+    now = now or datetime.now()
+    boundaries = sorted({0} | {w for w in windows} | {2 * w for w in windows})
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        ensure_schema(cursor)
+        totals = {
+            offset: _totals_at(cursor, user_id, (now - timedelta(days=offset)).strftime("%Y-%m-%d"))
+            for offset in boundaries
+        }
+    finally:
+        conn.close()
+
+    comparison = {}
+    for window in windows:
+        current = [a - b for a, b in zip(totals[0], totals[window])]
+        previous = [a - b for a, b in zip(totals[window], totals[2 * window])]
+        comparison[window] = {
+            "current": _window_stats(current),
+            "previous": _window_stats(previous)
+        }
+    return comparison
+
+
+def emotional_recommendations(emotional_patterns: Dict) -> List[Dict]:
+    """Recommendations for the emotional-patterns analytics from the dominant emotions"""
+    recommendations = []
+    dominant_emotions = emotional_patterns.get('dominant_emotions', {})
+    if dominant_emotions.get('anxiety', 0) > 0.3:
+        recommendations.append({
+            'type': 'anxiety_management',
+            'priority': 'high',
+            'suggestion': 'Consider daily breathing exercises and mindfulness practice'
+        })
+    if dominant_emotions.get('sadness', 0) > 0.3:
+        recommendations.append({
+            'type': 'mood_support',
+            'priority': 'high',
+            'suggestion': 'Engage in behavioral activation and social connection'
+        })
+    return recommendations
+
+
+def record_snapshot(user_id: str, metrics: List[Dict]):
+    """Persist at most one progress_tracking row per metric per day"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        for metric in metrics:
+            cursor.execute('''
+                INSERT INTO progress_tracking (user_id, metric_name, metric_value, measurement_date, trend, notes)
+                SELECT ?, ?, ?, ?, ?, ?
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM progress_tracking
+                    WHERE user_id = ? AND metric_name = ? AND substr(measurement_date, 1, 10) = ?
+                )
+            ''', (user_id, metric["metric_name"], metric["current_value"], datetime.now().isoformat(),
+                  metric["trend"], metric.get("notes", ""), user_id, metric["metric_name"], today))
+        conn.commit()
+    except Exception as e:
+        logger.error(f"❌ Failed to record progress snapshot: {e}")
+    finally:
+        conn.close()
+
+
+def rebuild_rollups(user_id: Optional[str] = None) -> int:
+    """Recompute daily rollups from the conversations table (all users or one)"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        ensure_schema(cursor)
+        where, params = ("WHERE user_id = ?", (user_id,)) if user_id else ("", ())
+        cursor.execute(f'DELETE FROM daily_rollups {where}', params)
+        cursor.execute(f'''
+            SELECT user_id, timestamp, emotion, emotion_intensity, crisis_indicators
+            FROM conversations {where}
+            ORDER BY user_id, timestamp
+        ''', params)
+
+        rows, running, current_user = {}, None, None
+        for row in cursor.fetchall():
+            if row['user_id'] != current_user:
+                current_user, running = row['user_id'], [0.0] * len(ROLLUP_FIELDS)
+            crisis = bool(row['crisis_indicators']) and row['crisis_indicators'] not in ("[]", "")
+            delta = _delta(row['emotion'], row['emotion_intensity'], crisis)
+            key = (row['user_id'], (row['timestamp'] or "")[:10])
+            daily = rows.setdefault(key, [0.0] * len(ROLLUP_FIELDS) * 2)
+            for i, name in enumerate(ROLLUP_FIELDS):
+                running[i] += delta[name]
+                daily[i] += delta[name]
+                daily[len(ROLLUP_FIELDS) + i] = running[i]
+
+        cursor.executemany(f'''
+            INSERT INTO daily_rollups (user_id, day, {", ".join(ROLLUP_FIELDS)}, {", ".join("cum_" + f for f in ROLLUP_FIELDS)})
+            VALUES (?, ?, {", ".join("?" for _ in range(2 * len(ROLLUP_FIELDS)))})
+        ''', [(uid, day, *values) for (uid, day), values in rows.items()])
+        conn.commit()
+        logger.info(f"✅ Rebuilt {len(rows)} daily rollups")
+        return len(rows)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    # Backfill rollups for existing data: cd memory-api && python -m src.progress_analytics [user_id]
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    rebuild_rollups(sys.argv[1] if len(sys.argv) > 1 else None)
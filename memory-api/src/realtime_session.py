@@ -0,0 +1,398 @@
+"""
+Realtime emotion + memory sessions (the /ws/session WebSocket)
+One long-lived connection per conversation replaces the per-turn HTTP calls
+(get-context, unified context, respond, save-conversation, cognee/store).
+
+Client -> server (JSON text frames; binary frames are PCM audio):
+    {"type": "start", "user_id": "...", "session_id"?, "sample_rate"?: 16000, "encoding"?: "f32le"|"s16le"}
+    {"type": "emotion", "emotion": "anxious", "intensity"?: 0.7}   or   {"type": "emotion", "scores": {...}}
+    {"type": "audio", "data": "<base64 PCM>"}                      (same as a binary frame)
+    {"type": "user_message", "text": "...", "emotion"?, "intensity"?, "respond"?: true}
+    {"type": "assistant_message", "text": "..."}  reply produced elsewhere (e.g. Hume EVI), paired in order
+                                                   with the respond=false user messages still waiting for one
+    {"type": "interrupt"} | {"type": "flush"} | {"type": "end"}
+
+Server -> client:
+    session, emotion (smoothed estimate), context (unified context), token / done / error
+    (the therapeutic response stream), crisis (medium/high assessment of a respond=false
+    message), interrupted, saved, session_end, error
+
+Every user message is crisis-screened when it arrives, before anything that can be
+interrupted. Interrupted turns are saved with the part of the reply streamed so far,
+and respond=false messages that never got a reply are saved when the session ends.
+Turns are saved in batches: every SAVE_BATCH turns, every FLUSH_SECONDS and when
+the session ends, in one SQLite transaction per batch.
+"""
+import os
+import uuid
+import base64
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+from metrics import registry, time_stage
+from tracing import start_trace, wrap_context
+from .async_db import async_db
+from .audio_emotion import audio_emotion, decode_pcm
+from .cognee_service import cognee_service
+from .context_assembler import context_assembler
+from .therapeutic_service import therapeutic_service
+from . import memory_queries
+
+logger = logging.getLogger(__name__)
+
+SAVE_BATCH = int(os.getenv("ORA_SESSION_SAVE_BATCH", "5"))
+FLUSH_SECONDS = float(os.getenv("ORA_SESSION_FLUSH_SECONDS", "10"))
+AUDIO_WINDOW_SECONDS = float(os.getenv("ORA_SESSION_AUDIO_WINDOW_SECONDS", "3"))
+AUDIO_HOP_SECONDS = float(os.getenv("ORA_SESSION_AUDIO_HOP_SECONDS", "1"))
+# Weight of the newest estimate in the smoothed emotion scores
+EMOTION_SMOOTHING = float(os.getenv("ORA_SESSION_EMOTION_SMOOTHING", "0.5"))
+
+ACTIVE_SESSIONS = registry.gauge("ora_ws_sessions_active", "Open realtime WebSocket sessions", ("app",))
+SESSION_SAVES = registry.counter("ora_ws_saved_turns_total", "Turns saved from realtime sessions", ("app",))
+
+_open_sessions = set()
+ACTIVE_SESSIONS.set_function(lambda: len(_open_sessions), app="memory_api_asgi")
+
+
+def _save_batch(cursor, batch: List[Dict]):
+    for record in batch:
+        memory_queries.save_conversation(
+            cursor, record["user_id"], record["user_message"], record["ora_response"], record["emotion"],
+            "", record["session_id"], record["emotion_intensity"], record["crisis_indicators"],
+            timestamp=record["timestamp"]
+        )
+
+
+class RealtimeSession:
+    def __init__(self, send: Callable[[Dict], Awaitable[Any]], save_batch: int = SAVE_BATCH,
+                 flush_interval: float = FLUSH_SECONDS, estimator=audio_emotion):
+        self._send = send
+        self._send_lock = asyncio.Lock()
+        self.save_batch = max(1, save_batch)
+        self.flush_interval = flush_interval
+        self.estimator = estimator
+        self.user_id: Optional[str] = None
+        self.session_id: Optional[str] = None
+        self.scores: Dict[str, float] = {}
+        self.pending_saves: List[Dict] = []
+        # respond=false user messages waiting for their assistant_message, oldest first
+        self.awaiting_replies: Deque[Dict] = deque()
+        self.stats = {"turns": 0, "saved": 0, "flushes": 0, "emotion_estimates": 0, "audio_seconds": 0.0}
+        self._closed = False
+        # The respond=true turn streaming a reply (what an interrupt cancels) and its record
+        self._turn: Optional[asyncio.Task] = None
+        self._turn_record: Optional[Dict] = None
+        # respond=false turns only fetch context; they run to completion side by side
+        self._context_turns = set()
+        self._flusher: Optional[asyncio.Task] = None
+        self._estimating: Optional[asyncio.Task] = None
+        self._sample_rate = 16000
+        self._encoding = "f32le"
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._audio_since_estimate = 0
+        self._audio_disabled = False
+
+    # 📌 Outbound
+    async def emit(self, event: Dict):
+        if self._closed:
+            return
+        async with self._send_lock:
+            await self._send(event)
+
+    async def _error(self, error: str, **extra):
+        await self.emit({"type": "error", "error": error, **extra})
+
+    # 📌 Inbound
+    async def handle(self, message: Dict) -> bool:
+        """Handle one JSON message; False once the client ended the session"""
+        kind = message.get("type")
+        if kind == "start":
+            await self._start(message)
+            return True
+        if self.user_id is None:
+            await self._error("send a start message with user_id first")
+            return True
+
+        if kind == "emotion":
+            await self._emotion_event(message)
+        elif kind == "audio":
+            try:
+                await self.handle_audio(base64.b64decode(message.get("data", "")))
+            except ValueError as e:
+                await self._error(f"invalid audio data: {e}")
+        elif kind == "user_message":
+            await self._user_message(message)
+        elif kind == "assistant_message":
+            await self._assistant_message(message)
+        elif kind == "interrupt":
+            await self._interrupt()
+        elif kind == "flush":
+            await self.flush()
+        elif kind == "end":
+            await self._interrupt()
+            await self._save_unanswered()
+            await self.flush()
+            await self.emit({"type": "session_end", "session_id": self.session_id, **self.stats})
+            return False
+        else:
+            await self._error(f"unknown message type '{kind}'")
+        return True
+
+    async def _start(self, message: Dict):
+        user_id = message.get("user_id")
+        if not user_id:
+            await self._error("user_id is required")
+            return
+        if self.user_id is not None and user_id != self.user_id:
+            await self._error("session already started for another user")
+            return
+        self.user_id = user_id
+        _open_sessions.add(self)
+        self.session_id = message.get("session_id") or self.session_id or str(uuid.uuid4())
+        self._sample_rate = int(message.get("sample_rate", self._sample_rate))
+        self._encoding = message.get("encoding", self._encoding)
+
+        profile = await async_db.run(memory_queries.get_context, user_id)
+        if self._flusher is None and self.flush_interval > 0:
+            self._flusher = asyncio.ensure_future(self._flush_periodically())
+        await self.emit({
+            "type": "session",
+            "session_id": self.session_id,
+            "user": profile,
+            "audio_emotion": self.estimator.available,
+            "save_batch": self.save_batch,
+            "flush_seconds": self.flush_interval
+        })
+
+    # 📌 Emotion
+    async def _emotion_event(self, message: Dict):
+        scores = message.get("scores")
+        if not scores and message.get("emotion"):
+            scores = {message["emotion"]: float(message.get("intensity", 1.0))}
+        if not scores:
+            await self._error("emotion events need 'emotion' or 'scores'")
+            return
+        await self._update_emotion({str(k).lower(): float(v) for k, v in scores.items()}, "client")
+
+    async def _update_emotion(self, scores: Dict[str, float], source: str):
+        for label in set(self.scores) | set(scores):
+            self.scores[label] = (EMOTION_SMOOTHING * scores.get(label, 0.0)
+                                  + (1 - EMOTION_SMOOTHING) * self.scores.get(label, 0.0))
+        self.stats["emotion_estimates"] += 1
+        emotion, intensity = self.current_emotion()
+        top = sorted(self.scores.items(), key=lambda item: item[1], reverse=True)[:5]
+        await self.emit({"type": "emotion", "source": source, "emotion": emotion,
+                         "intensity": round(intensity, 4), "scores": {k: round(v, 4) for k, v in top}})
+
+    def current_emotion(self):
+        if not self.scores:
+            return "neutral", 0.5
+        return max(self.scores.items(), key=lambda item: item[1])
+
+    async def handle_audio(self, data: bytes):
+        if self.user_id is None:
+            await self._error("send a start message with user_id first")
+            return
+        if self._audio_disabled:
+            return
+        if not self.estimator.available:
+            # Once per session; clients keep sending emotion events instead
+            self._audio_disabled = True
+            await self._error("audio emotion estimates unavailable", reason=self.estimator.unavailable_reason)
+            return
+        try:
+            samples = decode_pcm(data, self._encoding)
+        except ValueError as e:
+            await self._error(str(e))
+            return
+
+        window = int(AUDIO_WINDOW_SECONDS * self._sample_rate)
+        self._audio = np.concatenate([self._audio, samples])[-window:]
+        self._audio_since_estimate += len(samples)
+        self.stats["audio_seconds"] += len(samples) / self._sample_rate
+        # One estimate in flight per session: under load, windows are skipped rather than queued
+        if self._audio_since_estimate >= AUDIO_HOP_SECONDS * self._sample_rate and \
+                (self._estimating is None or self._estimating.done()):
+            self._audio_since_estimate = 0
+            self._estimating = asyncio.ensure_future(self._estimate(self._audio.copy()))
+
+    async def _estimate(self, samples: np.ndarray):
+        try:
+            scores = await asyncio.get_running_loop().run_in_executor(
+                None, wrap_context(self.estimator.estimate), samples, self._sample_rate)
+            await self._update_emotion(scores, "audio")
+        except Exception as e:
+            logger.warning(f"⚠️ Audio emotion estimate failed: {e}")
+
+    # 📌 Turns
+    async def _interrupt(self):
+        if self._turn is not None and not self._turn.done():
+            self._turn.cancel()
+            try:
+                await self._turn
+            except asyncio.CancelledError:
+                pass
+            await self.emit({"type": "interrupted"})
+        self._turn = None
+        await self._save_partial()
+
+    async def _user_message(self, message: Dict):
+        text = (message.get("text") or "").strip()
+        if not text:
+            await self._error("user_message needs text")
+            return
+        # A new utterance barges in on a response still streaming (context-only turns are left to finish)
+        await self._interrupt()
+        emotion, intensity = self.current_emotion()
+        if message.get("emotion"):
+            emotion, intensity = message["emotion"], float(message.get("intensity", intensity))
+        respond = bool(message.get("respond", True))
+
+        # Screened (and the utterance recorded) before the part an interrupt can cancel
+        crisis_assessment = await therapeutic_service.screen_message(text, {"user_id": self.user_id})
+        record = {"user_message": text, "emotion": emotion, "emotion_intensity": intensity,
+                  "crisis_assessment": crisis_assessment, "reply": [], "saved": False,
+                  "timestamp": datetime.now().isoformat()}
+        self.stats["turns"] += 1
+        if respond:
+            self._turn_record = record
+            self._turn = asyncio.ensure_future(self._run_turn(record, respond))
+            return
+        # The reply comes from elsewhere; saved when its assistant_message arrives
+        self.awaiting_replies.append(record)
+        if crisis_assessment["risk_level"] != "low":
+            await self.emit({"type": "crisis", **crisis_assessment})
+        task = asyncio.ensure_future(self._run_turn(record, respond))
+        self._context_turns.add(task)
+        task.add_done_callback(self._context_turns.discard)
+
+    async def _run_turn(self, record: Dict, respond: bool):
+        text, emotion = record["user_message"], record["emotion"]
+        with start_trace("WS /ws/session turn", app="memory_api_asgi", path="/ws/session",
+                         session_id=self.session_id):
+            try:
+                with time_stage("ws_turn_context"):
+                    assembled, user_context = await asyncio.gather(
+                        context_assembler.assemble(self.user_id, text),
+                        cognee_service.get_user_context(self.user_id)
+                    )
+                await self.emit({"type": "context", **assembled})
+
+                if not respond:
+                    return
+
+                user_context.setdefault("user_id", self.user_id)
+                async for event in therapeutic_service.stream_therapeutic_response(
+                        text, user_context, emotion, record["crisis_assessment"]):
+                    if event["type"] == "token":
+                        record["reply"].append(event["content"])
+                    await self.emit(event)
+                    if event["type"] in ("done", "error"):
+                        await self._save_turn(record, event.get("response", ""), event.get("therapeutic_context", {}))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Realtime turn failed: {e}")
+                await self._error(str(e))
+            finally:
+                if self._turn_record is record and record["saved"]:
+                    self._turn_record = None
+
+    async def _assistant_message(self, message: Dict):
+        text = (message.get("text") or "").strip()
+        if not self.awaiting_replies or not text:
+            await self._error("assistant_message needs text and a preceding user_message with respond=false")
+            return
+        await self._save_turn(self.awaiting_replies.popleft(), text, {})
+
+    async def _save_turn(self, record: Dict, ora_response: str, therapeutic_context: Dict):
+        # Marked before the (awaiting) queue, so an interrupt landing mid-flush can't save it twice
+        if record["saved"]:
+            return
+        record["saved"] = True
+        await self._queue_save(record["user_message"], ora_response, record["emotion"],
+                               record["emotion_intensity"], record["crisis_assessment"].get("indicators", []),
+                               therapeutic_context, record["timestamp"])
+
+    async def _save_partial(self):
+        """An interrupted turn keeps the user message and whatever of the reply was streamed"""
+        record, self._turn_record = self._turn_record, None
+        if record is not None:
+            await self._save_turn(record, "".join(record["reply"]).strip(), {"interrupted": True})
+
+    async def _save_unanswered(self):
+        while self.awaiting_replies:
+            await self._save_turn(self.awaiting_replies.popleft(), "", {"awaiting_reply": True})
+
+    # 📌 Batched saves
+    async def _queue_save(self, user_message: str, ora_response: str, emotion: str, intensity: float,
+                          crisis_indicators: List, therapeutic_context: Dict, timestamp: Optional[str] = None):
+        self.pending_saves.append({
+            "user_id": self.user_id,
+            "session_id": self.session_id,
+            "user_message": user_message,
+            "ora_response": ora_response,
+            "emotion": emotion,
+            "emotion_intensity": intensity,
+            "crisis_indicators": crisis_indicators,
+            "therapeutic_context": therapeutic_context,
+            # When the user spoke, not when the batch is flushed
+            "timestamp": timestamp or datetime.now().isoformat()
+        })
+        if len(self.pending_saves) >= self.save_batch:
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write the pending turns in one transaction, then to semantic memory"""
+        batch, self.pending_saves = self.pending_saves, []
+        if not batch:
+            return 0
+        try:
+            with time_stage("ws_session_flush"):
+                await async_db.run(_save_batch, batch)
+                await asyncio.gather(*(cognee_service.store_conversation(record["user_id"], {
+                    "timestamp": record["timestamp"],
+                    "user_message": record["user_message"],
+                    "ai_response": record["ora_response"],
+                    "emotion": record["emotion"],
+                    "emotion_intensity": record["emotion_intensity"],
+                    "therapeutic_context": record["therapeutic_context"],
+                    "crisis_indicators": record["crisis_indicators"],
+                    "session_id": record["session_id"]
+                }) for record in batch))
+        except Exception as e:
+            # Keep the turns for the next flush rather than dropping them
+            self.pending_saves[:0] = batch
+            logger.error(f"❌ Failed to save {len(batch)} session turns: {e}")
+            await self._error("failed to save conversation turns", pending=len(self.pending_saves))
+            return 0
+        self.stats["saved"] += len(batch)
+        self.stats["flushes"] += 1
+        SESSION_SAVES.inc(len(batch), app="memory_api_asgi")
+        await self.emit({"type": "saved", "count": len(batch), "session_id": self.session_id})
+        return len(batch)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    # 📌 Lifecycle
+    async def close(self):
+        """Stop background work and save what is left; the socket is already gone"""
+        self._closed = True
+        _open_sessions.discard(self)
+        for task in (self._turn, self._flusher, self._estimating, *self._context_turns):
+            if task is not None and not task.done():
+                task.cancel()
+        await self._save_partial()
+        await self._save_unanswered()
+        if self.pending_saves:
+            saved = await self.flush()
+            if saved:
+                logger.info(f"✅ Saved {saved} turns at end of session {self.session_id}")
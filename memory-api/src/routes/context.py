@@ -0,0 +1,29 @@
+from flask import Blueprint, request, jsonify
+from ..context_assembler import context_assembler
+from .enhanced_memory import _run
+
+context_bp = Blueprint('context', __name__)
+
+@context_bp.route('/unified', methods=['POST'])
+def get_unified_context():
+    """One ranked, deduplicated context from SQLite, Cognee and mem0 within a deadline"""
+    try:
+        data = request.get_json() or {}
+        user_id = data.get('user_id')
+        
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+        
+        deadline_ms = data.get('deadline_ms')
+        result = _run(context_assembler.assemble(
+            user_id,
+            data.get('message', ''),
+            limit=int(data.get('limit', 5)),
+            deadline=float(deadline_ms) / 1000 if deadline_ms else None,
+            max_tokens=int(data['max_tokens']) if data.get('max_tokens') else None
+        ))
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -2,16 +2,26 @@ import os
 import json
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-import openai
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 import logging
 from .cognee_service import cognee_service, TherapeuticInsight
+from .emotion_aggregates import emotion_aggregates
+from . import progress_analytics
+from .database import get_db_connection
+from .async_db import run_blocking
+from therapeutic_catalog import therapeutic_catalog
+from llm_client import llm_client
+from response_cache import response_cache
+from crisis_events import ALERT_LEVELS, CrisisEvent, CrisisEventDispatcher
+from tracing import span
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+LLM_PARAMS = {"model": "gpt-4", "temperature": 0.7, "max_tokens": 300}
+
 @dataclass
 class ProgressMetric:
     metric_name: str
@@ -34,55 +44,59 @@ class TherapeuticSession:
 
 class TherapeuticService:
     def __init__(self):
-        """Initialize therapeutic service with OpenAI integration"""
-        openai.api_key = os.getenv("OPENAI_API_KEY")
+        """Initialize therapeutic service (OpenAI access goes through llm_client)"""
         self.crisis_hotlines = {
             "US": "988",
             "UK": "116 123",
             "Canada": "1-833-456-4566",
             "Australia": "13 11 14"
         }
+        self.crisis_events = CrisisEventDispatcher(recorder=self._record_crisis_intervention)
 
+    @span("therapeutic.analyze_user_progress")
     async def analyze_user_progress(self, user_id: str, timeframe_days: int = 30) -> Dict:
         """Analyze user's therapeutic progress over specified timeframe"""
         try:
-            # Get user context from Cognee
-            context = await cognee_service.get_user_context(user_id, limit=50)
+            timeframe_days = int(timeframe_days)
+            
+            # Cognee context, emotional patterns (incremental aggregates, O(1) read) and
+            # the current vs previous period from the daily rollups are independent
+            context, emotional_patterns, windows = await asyncio.gather(
+                cognee_service.get_user_context(user_id, limit=50),
+                run_blocking(emotion_aggregates.get_patterns, user_id),
+                run_blocking(progress_analytics.compare_windows, user_id, (timeframe_days,))
+            )
             
             progress_analysis = {
                 "user_id": user_id,
                 "analysis_period": f"{timeframe_days} days",
-                "overall_progress": "stable",
+                "overall_progress": emotional_patterns["improvement_trend"],
                 "key_metrics": [],
                 "insights": [],
                 "recommendations": [],
                 "next_steps": []
             }
             
-            # Analyze emotional patterns
-            emotional_patterns = context.get("emotional_patterns", {})
-            dominant_emotions = emotional_patterns.get("dominant_emotions", {})
-            
-            # Calculate progress metrics
-            if dominant_emotions:
-                positive_emotions = sum(dominant_emotions.get(emotion, 0) for emotion in ["happy", "joy", "excited", "calm"])
-                negative_emotions = sum(dominant_emotions.get(emotion, 0) for emotion in ["sad", "angry", "anxious", "fear"])
-                
-                progress_analysis["key_metrics"].append(ProgressMetric(
-                    metric_name="Emotional Balance",
-                    current_value=positive_emotions,
-                    previous_value=negative_emotions,
-                    change_percentage=((positive_emotions - negative_emotions) / max(negative_emotions, 0.1)) * 100,
-                    trend="improving" if positive_emotions > negative_emotions else "needs_attention",
-                    timestamp=datetime.now()
-                ))
+            window = windows[timeframe_days]
+            if window["current"]["conversations"] or window["previous"]["conversations"]:
+                metrics = self._build_window_metrics(window)
+                progress_analysis["key_metrics"] = metrics
+                progress_analysis["overall_progress"] = metrics[0].trend
+                progress_analysis["window_comparison"] = window
+                snapshot = [
+                    {**asdict(metric), "metric_name": f"{metric.metric_name} ({timeframe_days}d)"}
+                    for metric in metrics
+                ]
+                await run_blocking(progress_analytics.record_snapshot, user_id, snapshot)
             
             # Generate insights
             insights = context.get("therapeutic_insights", [])
             progress_analysis["insights"] = [asdict(insight) for insight in insights]
             
             # Generate recommendations
-            progress_analysis["recommendations"] = await self._generate_progress_recommendations(context)
+            progress_analysis["recommendations"] = await self._generate_progress_recommendations(
+                {**context, "emotional_patterns": emotional_patterns}
+            )
             
             return progress_analysis
             
@@ -90,6 +104,37 @@ class TherapeuticService:
             logger.error(f"❌ Failed to analyze user progress: {e}")
             return {"error": str(e)}
 
+    def _build_window_metrics(self, window: Dict) -> List[ProgressMetric]:
+        """Turn a current/previous window comparison into ProgressMetrics"""
+        # (label, stats key, True if higher is better)
+        definitions = [
+            ("Emotional Balance", "emotional_balance", True),
+            ("Negative Emotion Ratio", "negative_ratio", False),
+            ("Average Emotional Intensity", "average_intensity", False),
+            ("Crisis Events", "crisis_events", False),
+            ("Engagement", "conversations", True)
+        ]
+        metrics = []
+        for label, key, higher_is_better in definitions:
+            current = window["current"][key]
+            previous = window["previous"][key]
+            change = ((current - previous) / max(abs(previous), 0.1)) * 100
+            if abs(change) < 5:
+                trend = "stable"
+            elif (change > 0) == higher_is_better:
+                trend = "improving"
+            else:
+                trend = "declining"
+            metrics.append(ProgressMetric(
+                metric_name=label,
+                current_value=round(current, 4),
+                previous_value=round(previous, 4),
+                change_percentage=round(change, 2),
+                trend=trend,
+                timestamp=datetime.now()
+            ))
+        return metrics
+
     async def _generate_progress_recommendations(self, user_context: Dict) -> List[str]:
         """Generate personalized recommendations based on user progress"""
         recommendations = []
@@ -105,14 +150,14 @@ class TherapeuticService:
                 "Maintain a regular sleep schedule to reduce anxiety"
             ])
         
-        if dominant_emotions.get("sad", 0) > 0.3 or dominant_emotions.get("depression", 0) > 0.3:
+        if dominant_emotions.get("sadness", 0) > 0.3:
             recommendations.extend([
                 "Engage in behavioral activation - plan one enjoyable activity daily",
                 "Practice gratitude journaling",
                 "Consider reaching out to your support network"
             ])
         
-        if dominant_emotions.get("angry", 0) > 0.2:
+        if dominant_emotions.get("anger", 0) > 0.2:
             recommendations.extend([
                 "Use the STOP technique when feeling angry",
                 "Practice progressive muscle relaxation",
@@ -128,51 +173,24 @@ class TherapeuticService:
         
         return recommendations
 
+    @span("therapeutic.generate_therapeutic_response")
     async def generate_therapeutic_response(self, user_message: str, user_context: Dict, emotion: str) -> Dict:
-        """Generate therapeutic response using OpenAI with context awareness"""
+        """Generate therapeutic response via the async LLM client with context awareness"""
         try:
             # Detect crisis indicators
-            crisis_assessment = await cognee_service.detect_crisis_indicators(user_message, user_context)
+            crisis_assessment = await self.screen_message(user_message, user_context)
             
             # If high crisis risk, prioritize safety
             if crisis_assessment["risk_level"] == "high":
                 return await self._generate_crisis_response(user_message, crisis_assessment)
             
-            # Build therapeutic prompt with context
-            therapeutic_prompt = self._build_therapeutic_prompt(user_message, user_context, emotion)
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": therapeutic_prompt["system_message"]
-                    },
-                    {
-                        "role": "user",
-                        "content": user_message
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=300
+            # Completion and exercise lookup don't depend on each other
+            ai_response, exercises = await asyncio.gather(
+                self._complete(user_message, user_context, emotion, crisis_assessment["risk_level"]),
+                cognee_service.get_therapeutic_exercises(user_context["user_id"], emotion)
             )
             
-            ai_response = response.choices[0].message.content.strip()
-            
-            # Get relevant therapeutic exercises
-            exercises = await cognee_service.get_therapeutic_exercises(user_context["user_id"], emotion)
-            
-            return {
-                "response": ai_response,
-                "therapeutic_context": {
-                    "emotion_detected": emotion,
-                    "crisis_risk": crisis_assessment["risk_level"],
-                    "recommended_exercises": exercises[:2],  # Top 2 exercises
-                    "session_type": "supportive_therapy"
-                },
-                "follow_up_suggestions": self._get_follow_up_suggestions(emotion),
-                "crisis_assessment": crisis_assessment
-            }
+            return self._build_response(ai_response, emotion, exercises, crisis_assessment)
             
         except Exception as e:
             logger.error(f"❌ Failed to generate therapeutic response: {e}")
@@ -181,6 +199,88 @@ class TherapeuticService:
                 "error": str(e)
             }
 
+    async def stream_therapeutic_response(self, user_message: str, user_context: Dict, emotion: str,
+                                          crisis_assessment: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """
+        Stream a therapeutic response as events: {"type": "token", "content"} for
+        each token, then {"type": "done", ...} with the same fields as
+        generate_therapeutic_response (or {"type": "error"} on failure).
+        Pass crisis_assessment when the caller already screened the message
+        """
+        tokens = []
+        try:
+            if crisis_assessment is None:
+                crisis_assessment = await self.screen_message(user_message, user_context)
+            
+            if crisis_assessment["risk_level"] == "high":
+                yield {"type": "done", **await self._generate_crisis_response(user_message, crisis_assessment)}
+                return
+            
+            messages = self._build_messages(user_message, user_context, emotion)
+            cache_args = (user_message, emotion, messages[0]["content"])
+            cache_kwargs = {"user_id": user_context.get("user_id"), "risk_level": crisis_assessment["risk_level"]}
+            cached = response_cache.get(*cache_args, **cache_kwargs)
+            if cached is not None:
+                tokens.append(cached)
+                yield {"type": "token", "content": cached}
+            else:
+                async for token in llm_client.stream_chat(messages, **LLM_PARAMS):
+                    tokens.append(token)
+                    yield {"type": "token", "content": token}
+                response_cache.put(*cache_args, "".join(tokens).strip(), **cache_kwargs)
+            
+            exercises = await cognee_service.get_therapeutic_exercises(user_context["user_id"], emotion)
+            yield {"type": "done", **self._build_response("".join(tokens).strip(), emotion, exercises, crisis_assessment)}
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to stream therapeutic response: {e}")
+            yield {
+                "type": "error",
+                "response": "".join(tokens).strip() or "I'm here to support you. Could you tell me more about how you're feeling right now?",
+                "error": str(e)
+            }
+
+    @span("therapeutic.complete")
+    async def _complete(self, user_message: str, user_context: Dict, emotion: str, risk_level: str) -> str:
+        """LLM completion behind the response cache (keyed on message, emotion and system prompt)"""
+        messages = self._build_messages(user_message, user_context, emotion)
+        cache_args = (user_message, emotion, messages[0]["content"])
+        cache_kwargs = {"user_id": user_context.get("user_id"), "risk_level": risk_level}
+        
+        cached = response_cache.get(*cache_args, **cache_kwargs)
+        if cached is not None:
+            return cached
+        
+        ai_response = await llm_client.chat(messages, **LLM_PARAMS)
+        response_cache.put(*cache_args, ai_response, **cache_kwargs)
+        return ai_response
+
+    def _build_messages(self, user_message: str, user_context: Dict, emotion: str) -> List[Dict]:
+        therapeutic_prompt = self._build_therapeutic_prompt(user_message, user_context, emotion)
+        return [
+            {
+                "role": "system",
+                "content": therapeutic_prompt["system_message"]
+            },
+            {
+                "role": "user",
+                "content": user_message
+            }
+        ]
+
+    def _build_response(self, ai_response: str, emotion: str, exercises, crisis_assessment: Dict) -> Dict:
+        return {
+            "response": ai_response,
+            "therapeutic_context": {
+                "emotion_detected": emotion,
+                "crisis_risk": crisis_assessment["risk_level"],
+                "recommended_exercises": exercises[:2],  # Top 2 exercises
+                "session_type": "supportive_therapy"
+            },
+            "follow_up_suggestions": self._get_follow_up_suggestions(emotion),
+            "crisis_assessment": crisis_assessment
+        }
+
     def _build_therapeutic_prompt(self, user_message: str, user_context: Dict, emotion: str) -> Dict:
         """Build therapeutic prompt with user context and emotional awareness"""
         
@@ -219,6 +319,41 @@ Respond therapeutically to the user's message, considering their emotional state
             "context_summary": context_summary
         }
 
+    async def screen_message(self, user_message: str, user_context: Dict) -> Dict:
+        """Crisis assessment of a user message, published for recording and alerting"""
+        crisis_assessment = await cognee_service.detect_crisis_indicators(user_message, user_context)
+        self._publish_crisis_event(user_context.get("user_id", "anonymous"), crisis_assessment)
+        return crisis_assessment
+
+    def _publish_crisis_event(self, user_id: str, crisis_assessment: Dict):
+        """Queue high/medium assessments for recording and alerting (never blocks the response)"""
+        risk_level = crisis_assessment.get("risk_level")
+        if risk_level not in ALERT_LEVELS:
+            return
+        self.crisis_events.publish(CrisisEvent(
+            user_id=user_id,
+            risk_level=risk_level,
+            indicators=crisis_assessment.get("indicators", []),
+            actions_taken=["crisis_intervention" if risk_level == "high" else "supportive_therapy"],
+            source="therapeutic_service",
+            risk_probabilities=crisis_assessment.get("risk_probabilities")
+        ))
+
+    def _record_crisis_intervention(self, event: CrisisEvent):
+        """Append a crisis event to crisis_interventions (runs on the dispatcher thread)"""
+        conn = get_db_connection()
+        try:
+            with conn:
+                conn.execute('''
+                    INSERT INTO crisis_interventions
+                    (user_id, intervention_time, risk_level, indicators, actions_taken, outcome, follow_up_required)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (event.user_id, event.timestamp.isoformat(), event.risk_level,
+                      json.dumps(event.indicators), json.dumps(event.actions_taken),
+                      "pending_follow_up", event.risk_level == "high"))
+        finally:
+            conn.close()
+
     async def _generate_crisis_response(self, user_message: str, crisis_assessment: Dict) -> Dict:
         """Generate immediate crisis intervention response"""
         
@@ -249,38 +384,11 @@ Respond therapeutically to the user's message, considering their emotional state
         
         return crisis_response
 
-    def _get_follow_up_suggestions(self, emotion: str) -> List[str]:
+    def _get_follow_up_suggestions(self, emotion: str) -> Tuple[str, ...]:
         """Get follow-up conversation suggestions based on emotion"""
-        suggestions = {
-            "anxiety": [
-                "Would you like to try a breathing exercise together?",
-                "What situations tend to trigger your anxiety?",
-                "How has your sleep been lately?"
-            ],
-            "sad": [
-                "What's been weighing on your mind?",
-                "Can you think of one small thing that brought you joy recently?",
-                "How is your support system right now?"
-            ],
-            "angry": [
-                "What triggered these feelings of anger?",
-                "How do you usually cope when you feel this way?",
-                "Would you like to explore what's underneath the anger?"
-            ],
-            "happy": [
-                "That's wonderful to hear! What contributed to these positive feelings?",
-                "How can we help you maintain this positive state?",
-                "What would you like to focus on today?"
-            ],
-            "neutral": [
-                "How are you feeling overall today?",
-                "What's been on your mind lately?",
-                "Is there anything specific you'd like to talk about?"
-            ]
-        }
-        
-        return suggestions.get(emotion.lower(), suggestions["neutral"])
+        return therapeutic_catalog.follow_up_suggestions(emotion)
 
+    @span("therapeutic.schedule_proactive_checkin")
     async def schedule_proactive_checkin(self, user_id: str, checkin_type: str = "wellness") -> Dict:
         """Schedule a proactive check-in for the user"""
         try:
@@ -310,6 +418,7 @@ Respond therapeutically to the user's message, considering their emotional state
             logger.error(f"❌ Failed to schedule proactive check-in: {e}")
             return {"success": False, "error": str(e)}
 
+    @span("therapeutic.get_user_insights")
     async def get_user_insights(self, user_id: str) -> Dict:
         """Get comprehensive user insights for therapeutic purposes"""
         try:
@@ -0,0 +1,128 @@
+"""
+Memory Router for ORA Emotion System
+Decides whether a message belongs in therapeutic memory (memory-api) or
+general memory (mem0ai). Uses the compiled crisis lexicon, computes each
+decision once and caches it by message hash so every route reuses it.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+
+from crisis_lexicon import CrisisLexicon, crisis_lexicon
+from metrics import track_cache
+
+THERAPEUTIC_ROUTE = "therapeutic"
+GENERAL_ROUTE = "mem0ai"
+METADATA_THERAPEUTIC_TYPES = ("therapeutic", "crisis")
+
+# Confidence by the most severe matched tier; each extra distinct match adds a little
+TIER_CONFIDENCE = {"high": 0.99, "medium": 0.9, "low": 0.8, "therapeutic": 0.7}
+NO_MATCH_CONFIDENCE = 0.75
+NEGATED_ONLY_CONFIDENCE = 0.6
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    is_therapeutic: bool
+    route: str
+    confidence: float
+    matched_terms: Tuple[str, ...]
+    severity: Optional[str]
+    reason: str
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["matched_terms"] = list(self.matched_terms)
+        return data
+
+
+class MemoryRouter:
+    """Lexicon-based routing with an LRU cache of decisions keyed by message hash"""
+
+    def __init__(self, lexicon: CrisisLexicon = crisis_lexicon, cache_size: int = 4096):
+        self.lexicon = lexicon
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, RoutingDecision]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(message: str) -> bytes:
+        return hashlib.blake2b(" ".join(message.lower().split()).encode("utf-8"), digest_size=16).digest()
+
+    def route(self, message: str, metadata: Dict = None) -> RoutingDecision:
+        """Routing decision for a message (metadata conversation_type can force therapeutic)"""
+        message = message or ""
+        if metadata and metadata.get("conversation_type") in METADATA_THERAPEUTIC_TYPES:
+            decision = self.route(message)
+            if decision.is_therapeutic:
+                return decision
+            return RoutingDecision(True, THERAPEUTIC_ROUTE, 1.0, decision.matched_terms, decision.severity,
+                                   f"Marked {metadata['conversation_type']} by caller")
+
+        if self.cache_size <= 0:
+            return self._classify(message)
+
+        key = self._key(message)
+        with self._lock:
+            decision = self._cache.get(key)
+            if decision is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return decision
+            self.misses += 1
+
+        decision = self._classify(message)
+        with self._lock:
+            self._cache[key] = decision
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return decision
+
+    def route_many(self, messages: List[str], metadatas: List[Optional[Dict]] = None) -> List[RoutingDecision]:
+        """One classification per distinct message in a batch (then cached), mapped back in order"""
+        metadatas = metadatas or [None] * len(messages)
+        decisions: Dict[tuple, RoutingDecision] = {}
+        results = []
+        for message, metadata in zip(messages, metadatas):
+            forced = metadata.get("conversation_type") if metadata else None
+            key = (message, forced)
+            if key not in decisions:
+                decisions[key] = self.route(message, metadata)
+            results.append(decisions[key])
+        return results
+
+    def _classify(self, message: str) -> RoutingDecision:
+        result = self.lexicon.scan(message)
+        matched = tuple(dict.fromkeys(m.term for m in result.matches if not m.negated))
+
+        if not matched:
+            if result.matches:
+                return RoutingDecision(False, GENERAL_ROUTE, NEGATED_ONLY_CONFIDENCE, (), None,
+                                       "Only negated therapeutic keywords")
+            return RoutingDecision(False, GENERAL_ROUTE, NO_MATCH_CONFIDENCE, (), None, "General conversation")
+
+        tiers = [m.tier for m in result.matches if not m.negated]
+        top_tier = min(tiers, key=("high", "medium", "low", "therapeutic").index)
+        confidence = min(0.99, TIER_CONFIDENCE[top_tier] + 0.03 * (len(matched) - 1))
+        return RoutingDecision(True, THERAPEUTIC_ROUTE, round(confidence, 3), matched, result.severity,
+                               "Therapeutic keywords detected")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cache_size": len(self._cache),
+                "cache_capacity": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Global instance
+memory_router = MemoryRouter()
+track_cache("routing", lambda: memory_router.stats()["hit_rate"], lambda: len(memory_router._cache))
@@ -0,0 +1,307 @@
+"""
+Metrics for ORA Emotion System
+In-process counters, gauges and latency histograms rendered in the Prometheus
+text format on /metrics. Request latency is recorded per route by
+instrument_flask(); time_stage() records per-stage timings (DB query, vector
+search, cognify, LLM call, feature extraction, MLP inference). Cache hit rates
+and queue depths are read from their owners at scrape time, so they cost
+nothing per request.
+"""
+import os
+import time
+import asyncio
+import bisect
+import threading
+import functools
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from tracing import span
+
+METRICS_ENABLED = os.getenv("ORA_METRICS", "1") == "1"
+
+# Seconds: sub-millisecond cache/DB hits up to multi-second LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Metric):
+    """Set directly, or computed at scrape time by a per-label-set callback"""
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[LabelKey, float] = {}
+        self.callbacks: Dict[LabelKey, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+    def set_function(self, fn: Callable[[], float], **labels):
+        with self._lock:
+            self.callbacks[self._key(labels)] = fn
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = dict(self.values)
+            callbacks = list(self.callbacks.items())
+        for key, fn in callbacks:
+            try:
+                items[key] = float(fn())
+            except Exception:
+                continue  # a broken callback must not break the scrape
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items.items()]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (last is +Inf), sum, count]
+        self.series: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, **labels) -> Optional[Dict]:
+        with self._lock:
+            series = self.series.get(self._key(labels))
+            if series is None:
+                return None
+            return {"count": series[2], "sum": series[1]}
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self.series.items()]
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            if name not in self.metrics:
+                self.metrics[name] = cls(name, *args, **kwargs)
+            return self.metrics[name]
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, labelnames, buckets)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self.metrics.values()):
+            samples = metric.samples()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+# Global instance
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "ora_http_request_duration_seconds", "HTTP request latency by route", ("app", "method", "route", "status"))
+STAGE_LATENCY = registry.histogram(
+    "ora_stage_duration_seconds", "Latency of internal stages (DB, vector search, LLM, ...)", ("stage",))
+STAGE_ERRORS = registry.counter("ora_stage_errors_total", "Stages that raised", ("stage",))
+CACHE_HIT_RATIO = registry.gauge("ora_cache_hit_ratio", "Hit rate since process start", ("cache",))
+CACHE_ENTRIES = registry.gauge("ora_cache_entries", "Entries currently cached", ("cache",))
+QUEUE_DEPTH = registry.gauge("ora_queue_depth", "Jobs waiting in a background queue", ("queue",))
+
+
+class time_stage:
+    """
+    Record how long a stage takes, as a context manager or a (sync or async) decorator:
+        with time_stage("db_query"): ...
+        @time_stage("llm_call")
+    """
+
+    __slots__ = ("stage", "started", "elapsed", "span")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        # Also a span when a trace is active, so slow requests break down by stage
+        self.span = span(self.stage)
+        self.span.__enter__()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.started
+        self.span.__exit__(exc_type, exc, tb)
+        if METRICS_ENABLED:
+            STAGE_LATENCY.observe(self.elapsed, stage=self.stage)
+            if exc_type is not None:
+                STAGE_ERRORS.inc(stage=self.stage)
+        return False
+
+    def __call__(self, fn: Callable) -> Callable:
+        stage = self.stage
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with time_stage(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with time_stage(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def track_cache(name: str, hit_rate: Callable[[], float], size: Callable[[], float] = None):
+    """Expose a cache's hit rate (and size) - read only when /metrics is scraped"""
+    CACHE_HIT_RATIO.set_function(hit_rate, cache=name)
+    if size is not None:
+        CACHE_ENTRIES.set_function(size, cache=name)
+
+
+def track_queue(name: str, depth: Callable[[], float]):
+    """Expose a background queue's depth - read only when /metrics is scraped"""
+    QUEUE_DEPTH.set_function(depth, queue=name)
+
+
+def instrument_flask(app, name: str = None):
+    """Per-route request latency histograms plus a /metrics endpoint (idempotent per app)"""
+    if "ora_metrics" in app.extensions:
+        return
+    app.extensions["ora_metrics"] = True
+    app_name = name or app.import_name
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_timer():
+        g._ora_request_started = time.perf_counter()
+
+    @app.after_request
+    def _record_latency(response):
+        started = getattr(g, "_ora_request_started", None)
+        if started is not None and METRICS_ENABLED:
+            # The URL rule, not the path, so /insights/<user_id> stays one series
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            REQUEST_LATENCY.observe(time.perf_counter() - started, app=app_name, method=request.method,
+                                    route=route, status=str(response.status_code))
+        return response
+
+    if not any(rule.rule == "/metrics" for rule in app.url_map.iter_rules()):
+        app.add_url_rule("/metrics", "ora_metrics", lambda: Response(
+            registry.render(), mimetype="text/plain; version=0.0.4"))
+
+
+def instrument_quart(app, name: str = None):
+    """instrument_flask for Quart apps; async hooks so they run on the request's task"""
+    if "ora_metrics" in app.extensions:
+        return
+    app.extensions["ora_metrics"] = True
+    app_name = name or app.import_name
+    from quart import Response, g, request
+
+    @app.before_request
+    async def _start_timer():
+        g._ora_request_started = time.perf_counter()
+
+    @app.after_request
+    async def _record_latency(response):
+        started = getattr(g, "_ora_request_started", None)
+        if started is not None and METRICS_ENABLED:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            REQUEST_LATENCY.observe(time.perf_counter() - started, app=app_name, method=request.method,
+                                    route=route, status=str(response.status_code))
+        return response
+
+    async def _metrics():
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+    if not any(rule.rule == "/metrics" for rule in app.url_map.iter_rules()):
+        app.add_url_rule("/metrics", "ora_metrics", _metrics)
@@ -8,11 +8,19 @@ ORA system while preserving your memory-api therapeutic functionality.
 """
 from flask import Blueprint, request, jsonify, current_app
 from flask_cors import cross_origin
+import os
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime
 
 # Import the ORA-specific mem0 service
-from mem0_service import ora_mem0_service
+from ora_mem0_service import mem0_service as ora_mem0_service
+from durable_queue import DurableQueue
+from memory_router import memory_router
+from metrics import instrument_flask, time_stage
+from tracing import current_trace_id, start_trace, trace_flask, wrap_context
+from profiler import profile_flask
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -20,6 +28,24 @@ logger = logging.getLogger(__name__)
 # Create Blueprint for mem0ai routes
 mem0_bp = Blueprint('ora_mem0', __name__)
 
+# Context reads run on this pool so they overlap with queuing the store
+CONTEXT_TIMEOUT = float(os.getenv("ORA_MAKE_CONTEXT_TIMEOUT", "8"))
+_context_pool = ThreadPoolExecutor(max_workers=int(os.getenv("ORA_MAKE_CONTEXT_WORKERS", "8")),
+                                   thread_name_prefix="mem0-context")
+
+# Stores from Make.com are fire-and-forget behind a durable SQLite outbox
+mem0_store_queue = DurableQueue("mem0_store")
+
+def _store_job(job):
+    # Continues the originating request's trace, so the deferred store shows up under it
+    with start_trace("outbox.mem0_store", trace_id=job.get("trace_id")) as trace:
+        # Waits out a slow add rather than failing it: a retry would store it twice
+        result = ora_mem0_service.store_memory(job["user_id"], job["message"], job["metadata"],
+                                               is_therapeutic=job["is_therapeutic"], wait_in_flight=True)
+        if not result.get("success"):
+            trace.fail(result.get("error", "store failed"))
+            raise RuntimeError(result.get("error", "store failed"))
+
 @mem0_bp.route('/api/ora/mem0/health', methods=['GET'])
 @cross_origin()
 def health_check():
@@ -35,7 +61,9 @@ def health_check():
         health_status.update({
             "ora_integration": "active",
             "therapeutic_routing": "enabled",
-            "memory_api_preserved": True
+            "memory_api_preserved": True,
+            "store_queue": mem0_store_queue.stats(),
+            "routing_cache": memory_router.stats()
         })
         
         return jsonify(health_status), status_code
@@ -80,7 +108,9 @@ def store_memory():
             }), 400
         
         # Store memory with intelligent routing
-        result = ora_mem0_service.store_memory(user_id, message, metadata)
+        decision = ora_mem0_service.route_message(message, metadata)
+        result = ora_mem0_service.store_memory(user_id, message, metadata, is_therapeutic=decision.is_therapeutic)
+        result["routing"] = decision.to_dict()
         
         # Add ORA-specific response information
         result.update({
@@ -99,6 +129,90 @@ def store_memory():
             "ora_system": "storage_failed"
         }), 500
 
+MAX_BATCH_SIZE = int(os.getenv("ORA_MEM0_MAX_BATCH", "500"))
+
+def _batch_items(data, required):
+    """Validate a batch body: {"items": [{...}, ...]} -> (items, error response)"""
+    items = (data or {}).get('items')
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({"error": "items must be a non-empty list", "ora_system": "validation_failed"}), 400)
+    if len(items) > MAX_BATCH_SIZE:
+        return None, (jsonify({"error": f"At most {MAX_BATCH_SIZE} items per batch",
+                               "ora_system": "validation_failed"}), 400)
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or any(not item.get(field) for field in required):
+            return None, (jsonify({"error": f"items[{index}] requires {', '.join(required)}",
+                                   "ora_system": "validation_failed"}), 400)
+    return items, None
+
+@mem0_bp.route('/api/ora/mem0/store/batch', methods=['POST'])
+@cross_origin()
+def store_memories_batch():
+    """
+    Store many messages in one call (e.g. backfilling conversation history)
+    Classified in one pass; general messages grouped into one provider call per user
+    """
+    try:
+        items, error = _batch_items(request.get_json(), ('user_id', 'message'))
+        if error:
+            return error
+        
+        timestamp = datetime.utcnow().isoformat()
+        for item in items:
+            item['metadata'] = dict(item.get('metadata') or {}, source_app="ora_emotion",
+                                    request_timestamp=timestamp)
+        
+        result = ora_mem0_service.store_memories(items)
+        result.update({
+            "ora_system": "hybrid_memory_batch",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        
+        status_code = 200 if result.get('success') else (207 if result.get('stored') else 400)
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        logger.error(f"ORA batch storage error: {str(e)}")
+        return jsonify({
+            "error": str(e),
+            "ora_system": "storage_failed"
+        }), 500
+
+@mem0_bp.route('/api/ora/mem0/context/batch', methods=['POST'])
+@cross_origin()
+def get_memory_contexts_batch():
+    """Memory context for many (user_id, message) pairs, looked up concurrently"""
+    try:
+        data = request.get_json()
+        items, error = _batch_items(data, ('user_id', 'message'))
+        if error:
+            return error
+        
+        contexts = ora_mem0_service.get_contexts(items, limit=int(data.get('limit', 5)))
+        decisions = memory_router.route_many([item['message'] for item in items])
+        
+        return jsonify({
+            "success": True,
+            "results": [
+                {
+                    "user_id": item['user_id'],
+                    "memory_context": context,
+                    "has_context": bool(context),
+                    "is_therapeutic_content": decision.is_therapeutic
+                }
+                for item, context, decision in zip(items, contexts, decisions)
+            ],
+            "ora_system": "context_batch_retrieved",
+            "timestamp": datetime.utcnow().isoformat()
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"ORA batch context error: {str(e)}")
+        return jsonify({
+            "error": str(e),
+            "ora_system": "context_failed"
+        }), 500
+
 @mem0_bp.route('/api/ora/mem0/context', methods=['POST'])
 @cross_origin()
 def get_memory_context():
@@ -126,13 +240,15 @@ def get_memory_context():
         context = ora_mem0_service.get_memory_context(user_id, message, limit)
         
         # Check if this is therapeutic content
-        is_therapeutic = ora_mem0_service.is_therapeutic_content(message, data.get('metadata', {}))
+        decision = ora_mem0_service.route_message(message, data.get('metadata', {}))
+        is_therapeutic = decision.is_therapeutic
         
         response = {
             "success": True,
             "memory_context": context,
             "has_context": bool(context),
             "is_therapeutic_content": is_therapeutic,
+            "routing": decision.to_dict(),
             "ora_system": "context_retrieved",
             "source": "mem0ai" if context else "no_memories",
             "note": "Therapeutic memories handled by memory-api" if is_therapeutic else "General memories from mem0ai",
@@ -230,14 +346,18 @@ def analyze_content_routing():
             }), 400
         
         # Analyze routing decision
-        is_therapeutic = ora_mem0_service.is_therapeutic_content(message, metadata)
+        decision = ora_mem0_service.route_message(message, metadata)
+        is_therapeutic = decision.is_therapeutic
         
         response = {
             "success": True,
             "message": message,
             "is_therapeutic": is_therapeutic,
             "would_route_to": "memory-api/therapeutic_service" if is_therapeutic else "mem0ai",
-            "routing_reason": "Therapeutic keywords detected" if is_therapeutic else "General conversation",
+            "routing_reason": decision.reason,
+            "confidence": decision.confidence,
+            "matched_terms": list(decision.matched_terms),
+            "severity": decision.severity,
             "ora_system": "routing_analyzed",
             "analysis_timestamp": datetime.utcnow().isoformat()
         }
@@ -260,6 +380,7 @@ def make_memory_enhanced():
     Drop-in replacement for your existing Make.com memory endpoint
     Provides hybrid memory functionality with enhanced context
     """
+    started = time.perf_counter()
     try:
         data = request.get_json()
         
@@ -288,16 +409,40 @@ def make_memory_enhanced():
             "ora_enhanced": True
         }
         
-        # Get memory context BEFORE storing new memory
-        memory_context = ora_mem0_service.get_memory_context(user_id, user_message, 5)
-        
-        # Store the new conversation
-        storage_result = ora_mem0_service.store_memory(user_id, user_message, metadata)
-        
-        # Determine if this was therapeutic content
-        is_therapeutic = ora_mem0_service.is_therapeutic_content(user_message, metadata)
+        # Classify once and reuse the decision for the store and the response
+        with time_stage("routing") as routing_timer:
+            decision = ora_mem0_service.route_message(user_message, metadata)
+        is_therapeutic = decision.is_therapeutic
+        
+        # Read context before the store is queued: once it is in the outbox the worker may
+        # store this message first and it would come back as its own "memory"
+        context_future = _context_pool.submit(wrap_context(ora_mem0_service.get_memory_context),
+                                             user_id, user_message, 5)
+        try:
+            with time_stage("context_wait") as context_timer:
+                memory_context = context_future.result(timeout=CONTEXT_TIMEOUT)
+        except FutureTimeout:
+            logger.error(f"ORA Make.com context read timed out after {CONTEXT_TIMEOUT}s")
+            memory_context = ""
+        
+        mem0_store_queue.start(_store_job)
+        with time_stage("outbox_enqueue") as enqueue_timer:
+            job_id = mem0_store_queue.put({
+                "user_id": user_id,
+                "message": user_message,
+                "metadata": metadata,
+                "is_therapeutic": is_therapeutic,
+                "trace_id": current_trace_id()
+            })
+        storage_result = {
+            "success": True,
+            "queued": True,
+            "job_id": job_id,
+            "routed_to": "therapeutic" if is_therapeutic else "mem0ai",
+            "is_therapeutic": is_therapeutic
+        }
         
-        # Get routing statistics
+        # In-process counters - no remote call
         routing_stats = ora_mem0_service.get_routing_stats(user_id)
         
         # Prepare enhanced response for Make.com
@@ -308,11 +453,17 @@ def make_memory_enhanced():
             "storage_result": storage_result,
             "routed_to": storage_result.get("routed_to", "unknown"),
             "is_therapeutic": is_therapeutic,
+            "routing": decision.to_dict(),
             "ora_system": "make_enhanced_complete",
             "routing_stats": routing_stats,
             "performance_metrics": {
+                "routing_ms": round(routing_timer.elapsed * 1000, 3),
+                "enqueue_ms": round(enqueue_timer.elapsed * 1000, 3),
+                "context_wait_ms": round(context_timer.elapsed * 1000, 3),
+                "total_ms": round((time.perf_counter() - started) * 1000, 3),
                 "context_length": len(memory_context) if memory_context else 0,
                 "routing_decision": "therapeutic" if is_therapeutic else "general",
+                "routing_confidence": decision.confidence,
                 "timestamp": datetime.utcnow().isoformat()
             },
             "integration_info": {
@@ -392,6 +543,9 @@ def register_ora_mem0_routes(app):
     try:
         # Register the blueprint
         app.register_blueprint(mem0_bp)
+        instrument_flask(app)
+        trace_flask(app)
+        profile_flask(app)
         
         # Log successful registration
         app.logger.info("✅ ORA Mem0ai routes registered successfully")
@@ -399,8 +553,11 @@ def register_ora_mem0_routes(app):
         app.logger.info("   - /api/ora/mem0/health (Health check)")
         app.logger.info("   - /api/ora/mem0/store (Store memory)")
         app.logger.info("   - /api/ora/mem0/context (Get context)")
+        app.logger.info("   - /api/ora/mem0/store/batch, /api/ora/mem0/context/batch (Batch operations)")
         app.logger.info("   - /api/make/ora/memory-enhanced (Make.com enhanced)")
         app.logger.info("   - /api/make/ora/user-summary/<user_id> (User summary)")
+        app.logger.info("   - /metrics (Prometheus metrics)")
+        app.logger.info("   - /admin/profiler/* (Sampling profiler, slow-request capture)")
         app.logger.info("🔄 Hybrid routing: Therapeutic → memory-api, General → mem0ai")
         
         return True
@@ -3,78 +3,208 @@ Simple Mem0ai Service for ORA Emotion System
 Add this file to your ORA repository as: services/mem0_service.py
 """
 import os
+import json
+import time
+import random
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Any, List, Optional
 from datetime import datetime
 
-try:
-    from mem0 import Memory
-except ImportError:
-    print("Installing mem0ai...")
-    import subprocess
-    subprocess.check_call(["pip", "install", "mem0ai==0.1.110"])
-    from mem0 import Memory
+from memory_router import RoutingDecision, memory_router
+from local_memory_backend import use_local_backend, get_local_store, LocalMem0Memory
+from conversation_manager import estimate_tokens, fit_lines
+from resilience import CallTimeout, FallbackChain, TierUnavailable, get_breaker
+from metrics import time_stage
+from tracing import span, wrap_context
 
 logger = logging.getLogger(__name__)
 
+# Readiness states
+INITIALIZING = "initializing"
+READY = "ready"
+DEGRADED = "degraded"
+
+INIT_MAX_ATTEMPTS = int(os.getenv("ORA_MEM0_INIT_ATTEMPTS", "5"))
+INIT_BASE_DELAY = float(os.getenv("ORA_MEM0_INIT_BACKOFF", "1.0"))
+INIT_MAX_DELAY = 30.0
+# Upper bound on concurrent provider searches across all batch context requests
+CONTEXT_CONCURRENCY = int(os.getenv("ORA_MEM0_CONTEXT_CONCURRENCY", "8"))
+# Deadlines for provider calls; add runs mem0's LLM extraction so it gets far longer
+SEARCH_TIMEOUT = float(os.getenv("ORA_MEM0_SEARCH_TIMEOUT", "2.0"))
+ADD_TIMEOUT = float(os.getenv("ORA_MEM0_ADD_TIMEOUT", "15.0"))
+
+def default_memory_factory():
+    """Build the memory backend: local store, or mem0 configured with your existing OpenAI key"""
+    if use_local_backend():
+        # Offline path: local embeddings + IVF index behind mem0's add/search API
+        return LocalMem0Memory(get_local_store("mem0"))
+    
+    from mem0 import Memory  # Deferred: provider setup is slow and must not block import
+    
+    # Basic configuration using your existing OpenAI key
+    config = {
+        "vector_store": {
+            "provider": "qdrant",
+        },
+        "llm": {
+            "provider": "openai",
+            "config": {
+                "model": "gpt-4o-mini",
+                "temperature": 0.1,
+            }
+        },
+        "embedder": {
+            "provider": "openai",
+            "config": {
+                "model": "text-embedding-3-small",
+            }
+        }
+    }
+    return Memory.from_config(config)
+
 class ORAMem0Service:
-    """Simple mem0ai integration for ORA system"""
+    """
+    Simple mem0ai integration for ORA system
+    The memory backend is built lazily on a background thread; until it is
+    ready, calls return fast fallbacks (no context, store not accepted)
+    """
     
-    def __init__(self):
+    def __init__(self, memory_factory: Callable[[], Any] = default_memory_factory,
+                 max_attempts: int = INIT_MAX_ATTEMPTS, base_delay: float = INIT_BASE_DELAY,
+                 history_source: Optional[Callable[[str, int], List[str]]] = None):
         self.memory = None
-        self.is_ready = False
-        self._setup()
+        self.memory_factory = memory_factory
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.state = INITIALIZING
+        self.init_attempts = 0
+        self.last_error: Optional[str] = None
+        self.init_seconds: Optional[float] = None
+        self._ready_event = threading.Event()
+        self._init_thread: Optional[threading.Thread] = None
+        self._init_lock = threading.Lock()
+        # Per-user routing decision counts (therapeutic vs general) for this process
+        self.routing_counts: Dict[str, Dict[str, int]] = {}
+        self._routing_lock = threading.Lock()
+        self._context_slots = threading.BoundedSemaphore(CONTEXT_CONCURRENCY)
+        # Provider calls go through breakers. Adds are not idempotent, so they are never hedged
+        self.search_breaker = get_breaker("mem0_search", timeout=SEARCH_TIMEOUT)
+        self.add_breaker = get_breaker("mem0_add", timeout=ADD_TIMEOUT, hedge_after=0)
+        # Context falls back mem0 → history_source (if given) → none. The therapeutic
+        # SQLite store is deliberately not a tier: therapeutic and crisis messages
+        # must never surface in the general mem0 context
+        self.history_source = history_source
+        tiers = [("semantic", self._semantic_lines, None)]
+        if history_source is not None:
+            tiers.append(("history", self._history_lines, None))
+        self.context_chain = FallbackChain("mem0_context", tiers, empty=list)
+    
+    @property
+    def is_ready(self) -> bool:
+        """Never blocks: kicks off initialization on first use and reports current readiness"""
+        self.start()
+        return self.state == READY
+    
+    def start(self):
+        """Start background initialization (idempotent; call at app startup to warm up)"""
+        if self._init_thread is None:
+            with self._init_lock:
+                if self._init_thread is None:
+                    self._init_thread = threading.Thread(target=self._setup, name="mem0-init", daemon=True)
+                    self._init_thread.start()
+    
+    def wait_until_ready(self, timeout: float = None) -> bool:
+        self.start()
+        self._ready_event.wait(timeout)
+        return self.state == READY
     
     def _setup(self):
-        """Initialize mem0ai with basic configuration"""
-        try:
-            # Basic configuration using your existing OpenAI key
-            config = {
-                "vector_store": {
-                    "provider": "qdrant",
-                },
-                "llm": {
-                    "provider": "openai",
-                    "config": {
-                        "model": "gpt-4o-mini",
-                        "temperature": 0.1,
-                    }
-                },
-                "embedder": {
-                    "provider": "openai",
-                    "config": {
-                        "model": "text-embedding-3-small",
-                    }
-                }
-            }
-            
-            self.memory = Memory.from_config(config)
-            self.is_ready = True
-            logger.info("✅ Mem0ai service ready")
-            
-        except Exception as e:
-            logger.error(f"❌ Mem0ai setup failed: {e}")
-            self.is_ready = False
+        """Initialize mem0ai with bounded retries and jittered exponential backoff"""
+        started = time.perf_counter()
+        while self.init_attempts < self.max_attempts:
+            self.init_attempts += 1
+            try:
+                self.memory = self.memory_factory()
+                self.init_seconds = round(time.perf_counter() - started, 3)
+                self.state = READY
+                logger.info(f"✅ Mem0ai service ready in {self.init_seconds}s (attempt {self.init_attempts})")
+                break
+            except ImportError as e:
+                # Not installed - retrying won't help (install mem0ai from requirements)
+                self.last_error = f"mem0ai not installed: {e}"
+                break
+            except Exception as e:
+                self.last_error = str(e)
+                if self.init_attempts >= self.max_attempts:
+                    break
+                delay = min(INIT_MAX_DELAY, self.base_delay * 2 ** (self.init_attempts - 1)) * random.uniform(0.5, 1.5)
+                logger.warning(f"⚠️ Mem0ai setup attempt {self.init_attempts} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+        
+        if self.state != READY:
+            self.state = DEGRADED
+            logger.error(f"❌ Mem0ai setup failed after {self.init_attempts} attempts: {self.last_error}")
+        self._ready_event.set()
     
-    def is_therapeutic_content(self, message: str) -> bool:
+    def route_message(self, message: str, metadata: Dict = None) -> RoutingDecision:
+        """Cached routing decision (route, confidence, matched terms) - compute once, reuse everywhere"""
+        return memory_router.route(message, metadata)
+    
+    def is_therapeutic_content(self, message: str, metadata: Dict = None) -> bool:
         """Check if content should go to therapeutic memory"""
-        therapeutic_keywords = [
-            'anxious', 'anxiety', 'depressed', 'sad', 'angry', 'stressed',
-            'worried', 'overwhelmed', 'therapy', 'therapist', 'mental health',
-            'trauma', 'grief', 'loss', 'relationship', 'breakup', 'divorce'
-        ]
-        
-        message_lower = message.lower()
-        return any(keyword in message_lower for keyword in therapeutic_keywords)
+        return self.route_message(message, metadata).is_therapeutic
+    
+    def _count_routing(self, user_id: str, is_therapeutic: bool):
+        with self._routing_lock:
+            counts = self.routing_counts.setdefault(user_id, {"therapeutic": 0, "general": 0})
+            counts["therapeutic" if is_therapeutic else "general"] += 1
+    
+    def get_routing_stats(self, user_id: str) -> Dict[str, Any]:
+        """Routing decisions made for this user's stored messages (in-process counters)"""
+        with self._routing_lock:
+            counts = dict(self.routing_counts.get(user_id, {"therapeutic": 0, "general": 0}))
+        total = counts["therapeutic"] + counts["general"]
+        return {
+            "user_id": user_id,
+            "therapeutic_messages": counts["therapeutic"],
+            "general_messages": counts["general"],
+            "total_messages": total,
+            "therapeutic_ratio": round(counts["therapeutic"] / total, 3) if total else 0.0
+        }
     
-    def store_memory(self, user_id: str, message: str, metadata: Dict = None) -> Dict[str, Any]:
-        """Store memory with routing logic"""
+    def _add(self, wait_in_flight: bool, **kwargs) -> Any:
+        """
+        memory.add through the add breaker. A timed-out add may still land, so it is
+        reported as in flight (CallTimeout with pending attempts), never as a plain
+        failure; with wait_in_flight the caller blocks until that attempt settles
+        """
+        try:
+            return self.add_breaker.call(self.memory.add, **kwargs)
+        except CallTimeout as e:
+            if not (wait_in_flight and e.pending):
+                raise
+            logger.warning(f"⚠️ mem0 add past its deadline, waiting for the in-flight attempt: {e}")
+            done, _ = wait(e.pending, return_when=FIRST_COMPLETED)
+            return next(iter(done)).result()
+
+    @span("mem0.store_memory")
+    def store_memory(self, user_id: str, message: str, metadata: Dict = None,
+                     is_therapeutic: bool = None, wait_in_flight: bool = False) -> Dict[str, Any]:
+        """
+        Store memory with routing logic (pass is_therapeutic to reuse a routing decision)
+        Background callers that retry on failure (the outbox) pass wait_in_flight=True
+        so a slow add is awaited instead of being retried and stored twice
+        """
         if not self.is_ready:
-            return {"success": False, "error": "Service not ready"}
+            return {"success": False, "error": "Service not ready", "state": self.state}
         
         try:
             # Check if this should go to therapeutic memory
-            is_therapeutic = self.is_therapeutic_content(message)
+            if is_therapeutic is None:
+                is_therapeutic = self.is_therapeutic_content(message, metadata)
+            self._count_routing(user_id, is_therapeutic)
             
             if is_therapeutic:
                 # Route to your existing therapeutic memory system
@@ -86,7 +216,8 @@ class ORAMem0Service:
                 }
             else:
                 # Store in mem0ai for general conversations
-                result = self.memory.add(
+                result = self._add(
+                    wait_in_flight,
                     messages=[{"role": "user", "content": message}],
                     user_id=user_id,
                     metadata=metadata or {}
@@ -99,46 +230,170 @@ class ORAMem0Service:
                     "is_therapeutic": False
                 }
                 
+        except CallTimeout as e:
+            logger.error(f"Storage timeout: {e}")
+            return {"success": False, "error": str(e), "in_flight": bool(e.pending)}
         except Exception as e:
             logger.error(f"Storage error: {e}")
             return {"success": False, "error": str(e)}
     
-    def get_context(self, user_id: str, current_message: str, limit: int = 5) -> str:
-        """Get memory context for AI prompt"""
+    @span("mem0.store_memories")
+    def store_memories(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Store many {"user_id", "message", "metadata"} items: classify them in one
+        pass, then one memory.add per (user, metadata) group of general messages.
+        Results come back in input order.
+        """
         if not self.is_ready:
-            return ""
+            return {"success": False, "error": "Service not ready", "state": self.state}
+        
+        decisions = memory_router.route_many(
+            [item.get("message", "") for item in items], [item.get("metadata") for item in items]
+        )
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        groups: Dict[tuple, List[int]] = {}
+        
+        for index, (item, decision) in enumerate(zip(items, decisions)):
+            self._count_routing(item["user_id"], decision.is_therapeutic)
+            if decision.is_therapeutic:
+                results[index] = {"index": index, "success": True, "routed_to": "therapeutic",
+                                  "is_therapeutic": True, "confidence": decision.confidence}
+            else:
+                group_key = (item["user_id"], json.dumps(item.get("metadata") or {}, sort_keys=True, default=str))
+                groups.setdefault(group_key, []).append(index)
+        
+        for (user_id, _), indices in groups.items():
+            try:
+                result = self._add(
+                    False,
+                    messages=[{"role": "user", "content": items[i]["message"]} for i in indices],
+                    user_id=user_id,
+                    metadata=items[indices[0]].get("metadata") or {}
+                )
+                outcome = {"success": True, "memory_id": result.get("id") if result else None}
+            except CallTimeout as e:
+                logger.error(f"Batch storage timeout for {user_id}: {e}")
+                outcome = {"success": False, "error": str(e), "in_flight": bool(e.pending)}
+            except Exception as e:
+                logger.error(f"Batch storage error for {user_id}: {e}")
+                outcome = {"success": False, "error": str(e)}
+            for i in indices:
+                results[i] = {"index": i, "routed_to": "mem0ai", "is_therapeutic": False,
+                              "confidence": decisions[i].confidence, **outcome}
+        
+        stored = sum(1 for r in results if r["success"])
+        return {
+            "success": stored == len(items),
+            "stored": stored,
+            "failed": len(items) - stored,
+            "provider_calls": len(groups),
+            "results": results
+        }
+    
+    @span("mem0.get_contexts")
+    def get_contexts(self, requests: List[Dict[str, Any]], limit: int = 5,
+                     max_concurrency: int = CONTEXT_CONCURRENCY) -> List[str]:
+        """Context for many {"user_id", "message"} pairs concurrently (duplicates looked up once)"""
+        if not self.is_ready:
+            return [""] * len(requests)
+        
+        unique = list(dict.fromkeys((r["user_id"], r["message"]) for r in requests))
         
+        def lookup(pair):
+            with self._context_slots:
+                return self.get_context(pair[0], pair[1], limit)
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(unique)))) as pool:
+            contexts = dict(zip(unique, pool.map(wrap_context(lookup), unique)))
+        return [contexts[(r["user_id"], r["message"])] for r in requests]
+    
+    def _semantic_lines(self, user_id: str, message: str, limit: int) -> List[str]:
+        if not self.is_ready:
+            raise TierUnavailable(f"mem0ai {self.state}")
+        with time_stage("vector_search"):
+            memories = self.search_breaker.call(self.memory.search, query=message, user_id=user_id, limit=limit)
+        if isinstance(memories, dict):
+            memories = memories.get("results", [])
+        return [f"Previous: {memory['memory']}" for memory in memories or [] if memory.get("memory")]
+    
+    def _history_lines(self, user_id: str, message: str, limit: int) -> List[str]:
+        return [f"Recent: {text}" for text in self.history_source(user_id, limit) if text]
+    
+    @span("mem0.get_context")
+    def get_context(self, user_id: str, current_message: str, limit: int = 5, max_tokens: int = None) -> str:
+        """Get memory context for AI prompt (most relevant first, trimmed to max_tokens if given)"""
         try:
-            # Get relevant memories from mem0ai
-            memories = self.memory.search(
-                query=current_message,
-                user_id=user_id,
-                limit=limit
-            )
-            
-            if not memories:
-                return ""
+            # Semantic memories from mem0ai, or recent SQLite history while it is slow/down
+            context_parts, _ = self.context_chain.run(user_id, current_message, limit)
             
-            # Format for AI prompt
-            context_parts = []
-            for memory in memories:
-                content = memory.get("memory", "")
-                if content:
-                    context_parts.append(f"Previous: {content}")
+            header = "Memory context:"
+            if max_tokens is not None:
+                context_parts = fit_lines(context_parts, max_tokens - estimate_tokens(header) - 1)
             
             if context_parts:
-                return "Memory context:\n" + "\n".join(context_parts)
+                return header + "\n" + "\n".join(context_parts)
             return ""
             
         except Exception as e:
             logger.error(f"Context retrieval error: {e}")
             return ""
     
+    def get_memory_context(self, user_id: str, current_message: str, limit: int = 5) -> str:
+        """Route-facing name for get_context"""
+        return self.get_context(user_id, current_message, limit)
+    
+    @span("mem0.get_memories")
+    def get_memories(self, user_id: str, query: str = None, limit: int = 10) -> Dict[str, Any]:
+        """List a user's general memories, or search them when a query is given"""
+        if not self.is_ready:
+            return {"success": False, "error": "Service not ready", "state": self.state}
+        
+        try:
+            if query:
+                with time_stage("vector_search"):
+                    memories = self.search_breaker.call(self.memory.search, query=query, user_id=user_id, limit=limit)
+            else:
+                memories = self.search_breaker.call(self.memory.get_all, user_id=user_id, limit=limit)
+            if isinstance(memories, dict):
+                memories = memories.get("results", [])
+            
+            return {"success": True, "user_id": user_id, "memories": memories, "count": len(memories)}
+            
+        except Exception as e:
+            logger.error(f"Memory retrieval error: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def delete_user_memories(self, user_id: str) -> Dict[str, Any]:
+        """Delete all of a user's general memories"""
+        if not self.is_ready:
+            return {"success": False, "error": "Service not ready", "state": self.state}
+        if not hasattr(self.memory, "delete_all"):
+            return {"success": False, "error": "Deletion is not supported by the local memory backend"}
+        
+        try:
+            self.memory.delete_all(user_id=user_id)
+            with self._routing_lock:
+                self.routing_counts.pop(user_id, None)
+            return {"success": True, "user_id": user_id}
+            
+        except Exception as e:
+            logger.error(f"Memory deletion error: {e}")
+            return {"success": False, "error": str(e)}
+    
     def health_check(self) -> Dict[str, Any]:
-        """Check service health"""
+        """Check service health (readiness never blocks on initialization)"""
+        ready = self.is_ready
         return {
             "service": "mem0ai",
-            "status": "healthy" if self.is_ready else "unhealthy",
+            "status": "healthy" if ready else ("initializing" if self.state == INITIALIZING else "unhealthy"),
+            "state": self.state,
+            "ready": ready,
+            "init_attempts": self.init_attempts,
+            "init_seconds": self.init_seconds,
+            "last_error": self.last_error,
+            "backend": "local" if use_local_backend() else "mem0ai",
+            "circuit_breakers": [self.search_breaker.status(), self.add_breaker.status()],
+            "context_sources": self.context_chain.stats(),
             "timestamp": datetime.utcnow().isoformat()
         }
 
@@ -0,0 +1,493 @@
+"""
+Profiler for ORA Emotion System
+Opt-in, per-worker sampling profiler. A background thread reads every
+thread's stack with sys._current_frames() at a fixed interval, so profiled
+code runs unmodified. That covers extract_feature, the SQLite routes and the
+enhanced routes' coroutines alike.
+- Sessions sample the whole process until stopped (or their time limit)
+- Slow-request capture samples each request's thread and keeps the samples
+  only when the request took longer than the threshold. On the ASGI app every
+  request runs on the loop thread, so a sample counts for a request only while
+  its own task is the one running; the rest of its time is "(suspended)"
+Both write collapsed-stack files (one "frame;frame;frame count" line per
+stack) for flamegraph.pl, speedscope or inferno.
+"""
+import os
+import re
+import sys
+import hmac
+import time
+import asyncio
+import tempfile
+import threading
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("ORA_PROFILING", "0") == "1"
+SAMPLE_INTERVAL = float(os.getenv("ORA_PROFILE_INTERVAL", "0.01"))
+SLOW_REQUEST_MS = float(os.getenv("ORA_PROFILE_SLOW_MS", "1000"))
+PROFILE_DIR = os.getenv("ORA_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "ora_profiles"))
+MAX_PROFILE_FILES = int(os.getenv("ORA_PROFILE_MAX_FILES", "50"))
+MAX_SESSION_SECONDS = float(os.getenv("ORA_PROFILE_MAX_SECONDS", "300"))
+MAX_STACK_DEPTH = 128
+
+# Leaf frames of threads parked waiting (locks, selectors, queues): left out of sessions
+# (a request task's time off the loop is counted as SUSPENDED instead)
+IDLE_LEAVES = {("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("selectors.py", "select"),
+               ("queue.py", "get"), ("socketserver.py", "serve_forever"), ("connection.py", "wait")}
+
+SUSPENDED = "(suspended)"
+
+PROFILE_FILE_RE = re.compile(r"^(session|slow)_[\w.-]+\.folded$")
+_UNSAFE_RE = re.compile(r"[^\w.-]+")
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame, labels: Dict) -> str:
+    """Root-first "a;b;c" for a frame; labels caches the per-code-object strings"""
+    parts = []
+    while frame is not None and len(parts) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        label = labels.get(code)
+        if label is None:
+            label = labels[code] = _frame_label(code).replace(";", ",")
+        parts.append(label)
+        frame = frame.f_back
+    parts.reverse()
+    return ";".join(parts)
+
+
+def render_collapsed(samples: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+def top_frames(text: str, limit: int = 20) -> List[Dict]:
+    """Leaf ("self") sample counts from a collapsed-stack file, hottest first"""
+    leaves: Counter = Counter()
+    total = 0
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack or not count.isdigit():
+            continue
+        leaves[stack.rsplit(";", 1)[-1]] += int(count)
+        total += int(count)
+    return [{"frame": frame, "samples": count, "share": round(count / total, 4)}
+            for frame, count in leaves.most_common(limit)]
+
+
+def _current_task_frame():
+    """Outermost frame of the running asyncio task, or None outside a task"""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        return None
+    return getattr(task.get_coro(), "cr_frame", None) if task is not None else None
+
+
+def _on_stack(frame, target) -> bool:
+    while frame is not None:
+        if frame is target:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class RequestSamples:
+    __slots__ = ("ident", "task_frame", "started", "samples")
+
+    def __init__(self):
+        self.ident = threading.get_ident()
+        # Set for requests handled by an asyncio task: the thread is shared, the task isn't
+        self.task_frame = _current_task_frame()
+        self.started = time.perf_counter()
+        self.samples: Counter = Counter()
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = SAMPLE_INTERVAL, output_dir: str = PROFILE_DIR,
+                 slow_threshold_ms: float = SLOW_REQUEST_MS, slow_capture: bool = PROFILING_ENABLED,
+                 max_files: int = MAX_PROFILE_FILES):
+        self.interval = interval
+        self.output_dir = output_dir
+        self.slow_threshold_ms = slow_threshold_ms
+        self.slow_capture = slow_capture
+        self.max_files = max_files
+        self._requests: Dict[int, RequestSamples] = {}
+        self._session: Optional[Counter] = None
+        self._session_started = 0.0
+        self._session_deadline = 0.0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict = {}
+        self.counters = {"ticks": 0, "sessions": 0, "slow_captured": 0, "requests_sampled": 0}
+
+    # 📌 Sampler thread (runs only while a session or slow-request capture is on)
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ora-profiler", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                # Exit and hand-off under the lock, so a concurrent start always gets a running thread
+                if self._session is None and not self.slow_capture:
+                    self._thread = None
+                    return
+            time.sleep(self.interval)
+            self._tick(me)
+            if self._session is not None and time.monotonic() >= self._session_deadline:
+                self.stop_session()
+
+    def _tick(self, me: int):
+        frames = sys._current_frames()
+        with self._lock:
+            session = self._session
+            requests = list(self._requests.values())
+        if session is None and not requests:
+            return
+        self.counters["ticks"] += 1
+        stacks: Dict[int, str] = {}
+        if session is not None:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == me or (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_LEAVES:
+                    continue
+                stacks[ident] = collapse_stack(frame, self._labels)
+                session[f"{names.get(ident, ident)};{stacks[ident]}"] += 1
+        for record in requests:
+            frame = frames.get(record.ident)
+            if frame is not None:
+                if record.task_frame is not None and not _on_stack(frame, record.task_frame):
+                    # The loop thread is running another request's task (or waiting on I/O)
+                    record.samples[SUSPENDED] += 1
+                    continue
+                if record.ident not in stacks:
+                    stacks[record.ident] = collapse_stack(frame, self._labels)
+                record.samples[stacks[record.ident]] += 1
+
+    # 📌 Sessions
+    def start_session(self, seconds: float = 60.0, interval: float = None) -> Dict:
+        with self._lock:
+            if self._session is not None:
+                return {"started": False, "reason": "session already running", **self.status_locked()}
+            if interval:
+                self.interval = max(0.001, float(interval))
+            self._session = Counter()
+            self._session_started = time.monotonic()
+            self._session_deadline = self._session_started + min(float(seconds), MAX_SESSION_SECONDS)
+            self.counters["sessions"] += 1
+        self._ensure_thread()
+        logger.info(f"🔥 Profiling session started in worker {os.getpid()} for {seconds:.0f}s")
+        return {"started": True, **self.status()}
+
+    def stop_session(self) -> Optional[Dict]:
+        with self._lock:
+            samples, self._session = self._session, None
+            elapsed = time.monotonic() - self._session_started
+        if samples is None:
+            return None
+        if not samples:
+            return {"file": None, "samples": 0, "seconds": round(elapsed, 1)}
+        name = f"session_{datetime.now():%Y%m%d-%H%M%S-%f}_{os.getpid()}_{elapsed:.0f}s.folded"
+        return self._write(name, samples, seconds=round(elapsed, 1))
+
+    # 📌 Slow-request capture
+    def configure_slow_capture(self, enabled: bool, threshold_ms: float = None):
+        threshold_ms = float(threshold_ms) if threshold_ms is not None else self.slow_threshold_ms
+        with self._lock:
+            self.slow_capture = bool(enabled)
+            self.slow_threshold_ms = threshold_ms
+        if self.slow_capture:
+            self._ensure_thread()
+
+    def begin_request(self) -> Optional[RequestSamples]:
+        if not self.slow_capture:
+            return None
+        record = RequestSamples()
+        with self._lock:
+            # Keyed by record: on an event loop many requests are in flight on one thread
+            self._requests[id(record)] = record
+        self._ensure_thread()
+        return record
+
+    def end_request(self, record: Optional[RequestSamples], label: str) -> Optional[Dict]:
+        """Drop the request's samples, or keep them when it was slower than the threshold"""
+        if record is None:
+            return None
+        with self._lock:
+            self._requests.pop(id(record), None)
+        elapsed_ms = (time.perf_counter() - record.started) * 1000
+        self.counters["requests_sampled"] += 1
+        if elapsed_ms < self.slow_threshold_ms or not record.samples:
+            return None
+        self.counters["slow_captured"] += 1
+        route = _UNSAFE_RE.sub("-", label).strip("-")[:60] or "request"
+        name = f"slow_{datetime.now():%Y%m%d-%H%M%S-%f}_{os.getpid()}_{route}_{elapsed_ms:.0f}ms.folded"
+        return self._write(name, record.samples, elapsed_ms=round(elapsed_ms, 1))
+
+    # 📌 Files
+    def _write(self, name: str, samples: Counter, **info) -> Dict:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, name)
+        with open(path, "w") as f:
+            f.write(render_collapsed(samples))
+        self._prune()
+        logger.info(f"🔥 Profile written: {path}")
+        return {"file": name, "samples": sum(samples.values()), **info}
+
+    def _prune(self):
+        files = self.list_files()
+        for entry in files[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.output_dir, entry["name"]))
+            except OSError:
+                pass
+
+    def list_files(self) -> List[Dict]:
+        if not os.path.isdir(self.output_dir):
+            return []
+        files = []
+        for name in os.listdir(self.output_dir):
+            if PROFILE_FILE_RE.match(name):
+                stat = os.stat(os.path.join(self.output_dir, name))
+                files.append({"name": name, "kind": name.split("_", 1)[0], "bytes": stat.st_size,
+                              "created": datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds")})
+        return sorted(files, key=lambda entry: entry["created"], reverse=True)
+
+    def file_path(self, name: str) -> Optional[str]:
+        """Path of a profile file, or None for anything that isn't one (no traversal)"""
+        if not PROFILE_FILE_RE.match(name or ""):
+            return None
+        path = os.path.join(self.output_dir, name)
+        return path if os.path.isfile(path) else None
+
+    def status_locked(self) -> Dict:
+        return {
+            "pid": os.getpid(),
+            "session_running": self._session is not None,
+            "session_seconds_left": round(max(0.0, self._session_deadline - time.monotonic()), 1)
+            if self._session is not None else None,
+            "slow_capture": self.slow_capture,
+            "slow_threshold_ms": self.slow_threshold_ms,
+            "interval_ms": round(self.interval * 1000, 2),
+            "in_flight_requests": len(self._requests),
+            "output_dir": self.output_dir,
+            **self.counters
+        }
+
+    def status(self) -> Dict:
+        with self._lock:
+            return self.status_locked()
+
+
+# Global instance
+profiler = SamplingProfiler()
+
+
+def _admin_denied(headers, jsonify):
+    """
+    None when X-Admin-Token matches ORA_ADMIN_TOKEN, else the error response. Fails
+    closed: with no token configured the endpoints don't exist (404)
+    """
+    token = os.getenv("ORA_ADMIN_TOKEN")
+    if not token:
+        return jsonify({"error": "not found"}), 404
+    if not hmac.compare_digest(headers.get("X-Admin-Token", "").encode(), token.encode()):
+        return jsonify({"error": "admin token required"}), 401
+    return None
+
+
+# 📌 Admin endpoints (same actions for the Flask and Quart blueprints)
+def _start_action(data: Optional[Dict]):
+    data = data or {}
+    try:
+        result = profiler.start_session(float(data.get("seconds", 60)), data.get("interval_ms") and
+                                        float(data["interval_ms"]) / 1000)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}, 400
+    return result, 200 if result["started"] else 409
+
+
+def _stop_action():
+    result = profiler.stop_session()
+    if result is None:
+        return {"error": "no session running"}, 409
+    return result, 200
+
+
+def _slow_capture_action(data: Optional[Dict]):
+    data = data or {}
+    try:
+        profiler.configure_slow_capture(data.get("enabled", True), data.get("threshold_ms"))
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}, 400
+    return profiler.status(), 200
+
+
+def _files_action():
+    return {"pid": os.getpid(), "files": profiler.list_files()}, 200
+
+
+def _summary_action(name: str, path: str):
+    with open(path) as f:
+        return {"file": name, "top_frames": top_frames(f.read())}, 200
+
+
+def _admin_blueprint():
+    from flask import Blueprint, abort, jsonify, request, send_file
+
+    bp = Blueprint("ora_profiler", __name__)
+
+    def respond(result):
+        payload, status = result
+        return jsonify(payload), status
+
+    @bp.before_request
+    def _check_token():
+        return _admin_denied(request.headers, jsonify)
+
+    @bp.route("/status", methods=["GET"])
+    def status():
+        return jsonify(profiler.status())
+
+    @bp.route("/start", methods=["POST"])
+    def start():
+        return respond(_start_action(request.get_json(silent=True)))
+
+    @bp.route("/stop", methods=["POST"])
+    def stop():
+        return respond(_stop_action())
+
+    @bp.route("/slow-capture", methods=["POST"])
+    def slow_capture():
+        return respond(_slow_capture_action(request.get_json(silent=True)))
+
+    @bp.route("/files", methods=["GET"])
+    def files():
+        return respond(_files_action())
+
+    @bp.route("/files/<name>", methods=["GET"])
+    def download(name):
+        path = profiler.file_path(name)
+        if path is None:
+            abort(404)
+        if request.args.get("summary"):
+            return respond(_summary_action(name, path))
+        return send_file(path, mimetype="text/plain", as_attachment=True, download_name=name)
+
+    return bp
+
+
+def _quart_admin_blueprint():
+    from quart import Blueprint, abort, jsonify, request, send_file
+
+    bp = Blueprint("ora_profiler", __name__)
+
+    def respond(result):
+        payload, status = result
+        return jsonify(payload), status
+
+    @bp.before_request
+    async def _check_token():
+        return _admin_denied(request.headers, jsonify)
+
+    @bp.route("/status", methods=["GET"])
+    async def status():
+        return jsonify(profiler.status())
+
+    @bp.route("/start", methods=["POST"])
+    async def start():
+        return respond(_start_action(await request.get_json(silent=True)))
+
+    @bp.route("/stop", methods=["POST"])
+    async def stop():
+        # Writes the profile file - keep it off the event loop
+        return respond(await asyncio.get_running_loop().run_in_executor(None, _stop_action))
+
+    @bp.route("/slow-capture", methods=["POST"])
+    async def slow_capture():
+        return respond(_slow_capture_action(await request.get_json(silent=True)))
+
+    @bp.route("/files", methods=["GET"])
+    async def files():
+        return respond(_files_action())
+
+    @bp.route("/files/<name>", methods=["GET"])
+    async def download(name):
+        path = profiler.file_path(name)
+        if path is None:
+            abort(404)
+        if request.args.get("summary"):
+            return respond(await asyncio.get_running_loop().run_in_executor(None, _summary_action, name, path))
+        return await send_file(path, mimetype="text/plain", as_attachment=True, attachment_filename=name)
+
+    return bp
+
+
+def profile_flask(app, url_prefix: Optional[str] = "/admin/profiler"):
+    """
+    Slow-request capture hooks plus the profiler admin endpoints (idempotent per app)
+    url_prefix=None installs only the hooks (public apps expose no admin endpoints)
+    """
+    if "ora_profiler" in app.extensions:
+        return
+    app.extensions["ora_profiler"] = True
+    from flask import g, request
+
+    @app.before_request
+    def _begin_profile():
+        g._ora_profile = profiler.begin_request()
+
+    @app.teardown_request
+    def _end_profile(exc=None):
+        record = g.pop("_ora_profile", None)
+        if record is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            profiler.end_request(record, f"{request.method}_{route}")
+
+    if url_prefix:
+        app.register_blueprint(_admin_blueprint(), url_prefix=url_prefix)
+
+
+def profile_quart(app, url_prefix: Optional[str] = "/admin/profiler"):
+    """Quart counterpart of profile_flask: slow-request capture plus the admin endpoints"""
+    if "ora_profiler" in app.extensions:
+        return
+    app.extensions["ora_profiler"] = True
+    from quart import g, request
+
+    @app.before_request
+    async def _begin_profile():
+        g._ora_profile = profiler.begin_request()
+
+    @app.teardown_request
+    async def _end_profile(exc=None):
+        record = g.pop("_ora_profile", None)
+        if record is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            # end_request may write the profile file - keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, profiler.end_request, record, f"{request.method}_{route}")
+
+    if url_prefix:
+        app.register_blueprint(_quart_admin_blueprint(), url_prefix=url_prefix)
+
+
+if __name__ == "__main__":
+    # Top self-time frames of a profile: python profiler.py top <file.folded> [limit]
+    if len(sys.argv) >= 3 and sys.argv[1] == "top":
+        with open(sys.argv[2]) as f:
+            for entry in top_frames(f.read(), int(sys.argv[3]) if len(sys.argv) > 3 else 20):
+                print(f"{entry['share']:>7.1%} {entry['samples']:>7}  {entry['frame']}")
+    else:
+        print("Usage: python profiler.py top <file.folded> [limit]")
@@ -0,0 +1,296 @@
+"""
+Resilience for ORA Emotion System
+Per-backend circuit breakers with call deadlines, latency outlier detection
+and optional hedged requests, plus ordered fallback chains (semantic store →
+SQLite recent history → empty). A slow or failing dependency costs a short,
+bounded wait - and nothing at all once its breaker is open - instead of the
+provider's full timeout on every request.
+"""
+import os
+import time
+import asyncio
+import statistics
+import threading
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from tracing import span, wrap_context
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+FAILURE_THRESHOLD = int(os.getenv("ORA_BREAKER_FAILURES", "5"))
+RESET_TIMEOUT = float(os.getenv("ORA_BREAKER_RESET_SECONDS", "30"))
+CALL_TIMEOUT = float(os.getenv("ORA_BACKEND_TIMEOUT", "2.0"))
+# Launch a second attempt if the first hasn't answered after this many seconds (0 = off)
+HEDGE_AFTER = float(os.getenv("ORA_HEDGE_AFTER", "0"))
+
+# Sync backend calls run here so the caller can stop waiting at the deadline
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("ORA_RESILIENCE_WORKERS", "32")),
+                               thread_name_prefix="resilience")
+
+
+class TierUnavailable(Exception):
+    """Raised by a fallback tier that knows up front it can't answer (skipped quietly)"""
+
+
+class CircuitOpenError(TierUnavailable):
+    """Raised instead of calling a backend whose breaker is open"""
+
+
+class CallTimeout(Exception):
+    """
+    Raised when a backend call misses its deadline. Threads can't be cancelled, so
+    `pending` holds the sync attempts still running - a write may yet succeed
+    """
+
+    def __init__(self, message: str, pending=()):
+        super().__init__(message)
+        self.pending = set(pending)
+
+
+class CircuitBreaker:
+    """
+    closed → open after `failure_threshold` consecutive failures (errors,
+    timeouts or latency outliers); open → half_open after `reset_timeout`,
+    where a single probe call decides between closed and open again
+    """
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT, timeout: float = CALL_TIMEOUT,
+                 hedge_after: float = HEDGE_AFTER, window: int = 100, min_samples: int = 20,
+                 outlier_factor: float = 4.0, outlier_floor: float = 0.25):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.min_samples = min_samples
+        self.outlier_factor = outlier_factor
+        self.outlier_floor = outlier_floor
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_failure: Optional[str] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "successes": 0, "failures": 0, "timeouts": 0,
+                         "outliers": 0, "rejected": 0, "hedged": 0, "opened": 0}
+
+    # 📌 State machine
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.counters["rejected"] += 1
+            return False
+
+    def _outlier_threshold(self) -> Optional[float]:
+        if len(self.latencies) < self.min_samples:
+            return None
+        return max(self.outlier_floor, self.outlier_factor * statistics.median(self.latencies))
+
+    def record_success(self, latency: float):
+        with self._lock:
+            threshold = self._outlier_threshold()
+            self.latencies.append(latency)
+            if threshold is not None and latency > threshold:
+                # Answered, but far slower than usual: an early sign of a brownout
+                self.counters["outliers"] += 1
+                self._failure_locked(f"latency outlier {latency * 1000:.0f}ms > {threshold * 1000:.0f}ms")
+                return
+            self.counters["successes"] += 1
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                logger.info(f"✅ Circuit '{self.name}' closed after successful probe")
+            self.state = CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self, reason: str):
+        with self._lock:
+            self.counters["failures"] += 1
+            self._failure_locked(reason)
+
+    def _failure_locked(self, reason: str):
+        self.consecutive_failures += 1
+        self.last_failure = reason
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.counters["opened"] += 1
+                logger.warning(f"⚠️ Circuit '{self.name}' open for {self.reset_timeout:.0f}s: {reason}")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    # 📌 Calls
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call a blocking backend function with the breaker's deadline (and hedge, if enabled)"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit open")
+        self.counters["calls"] += 1
+        started = time.monotonic()
+        deadline = started + self.timeout
+        futures = {_executor.submit(wrap_context(fn), *args, **kwargs)}
+        hedged = False
+        error: Optional[BaseException] = None
+
+        while futures:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = remaining
+            if not hedged and self.hedge_after > 0:
+                wait_for = min(remaining, max(0.0, started + self.hedge_after - time.monotonic()))
+            done, futures = wait(futures, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self.record_success(time.monotonic() - started)
+                    return future.result()
+                error = future.exception()
+            if not done and not hedged and self.hedge_after > 0:
+                hedged = True
+                self.counters["hedged"] += 1
+                futures.add(_executor.submit(wrap_context(fn), *args, **kwargs))
+
+        return self._raise_failure(error, futures)
+
+    async def acall(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Async counterpart of call() for coroutine functions"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit open")
+        self.counters["calls"] += 1
+        started = time.monotonic()
+        deadline = started + self.timeout
+        tasks = {asyncio.ensure_future(fn(*args, **kwargs))}
+        hedged = False
+        error: Optional[BaseException] = None
+
+        try:
+            while tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                wait_for = remaining
+                if not hedged and self.hedge_after > 0:
+                    wait_for = min(remaining, max(0.0, started + self.hedge_after - time.monotonic()))
+                done, tasks = await asyncio.wait(tasks, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.record_success(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+                if not done and not hedged and self.hedge_after > 0:
+                    hedged = True
+                    self.counters["hedged"] += 1
+                    tasks.add(asyncio.ensure_future(fn(*args, **kwargs)))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return self._raise_failure(error)
+
+    def _raise_failure(self, error: Optional[BaseException], pending=()):
+        if error is None or pending:
+            # An attempt still running outranks an earlier failed (hedged) one
+            self.counters["timeouts"] += 1
+            self.record_failure(f"timeout after {self.timeout}s")
+            raise CallTimeout(f"{self.name} did not answer within {self.timeout}s", pending)
+        self.record_failure(str(error) or type(error).__name__)
+        raise error
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            threshold = self._outlier_threshold()
+            return {
+                "name": self.name,
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "last_failure": self.last_failure,
+                "timeout_seconds": self.timeout,
+                "hedge_after_seconds": self.hedge_after or None,
+                "p50_ms": round(statistics.median(self.latencies) * 1000, 1) if self.latencies else None,
+                "outlier_threshold_ms": round(threshold * 1000, 1) if threshold else None,
+                **self.counters
+            }
+
+
+Tier = Tuple[str, Callable[..., Any], Optional[CircuitBreaker]]
+
+
+class FallbackChain:
+    """Ordered tiers tried until one answers; a tier fails fast while its breaker is open"""
+
+    def __init__(self, name: str, tiers: List[Tier], empty: Callable[[], Any]):
+        self.name = name
+        self.tiers = tiers
+        self.empty = empty
+        self.served: Dict[str, int] = {tier_name: 0 for tier_name, _, _ in tiers}
+        self.served["empty"] = 0
+
+    def run(self, *args, **kwargs) -> Tuple[Any, str]:
+        """(result, tier name) from the first tier that answers"""
+        for tier_name, fn, breaker in self.tiers:
+            try:
+                with span(f"{self.name}.{tier_name}"):
+                    result = breaker.call(fn, *args, **kwargs) if breaker else fn(*args, **kwargs)
+            except Exception as e:
+                self._log_skip(tier_name, e)
+                continue
+            self.served[tier_name] += 1
+            return result, tier_name
+        self.served["empty"] += 1
+        return self.empty(), "empty"
+
+    async def arun(self, *args, **kwargs) -> Tuple[Any, str]:
+        """run() for tiers that are coroutine functions (plain functions are called directly)"""
+        for tier_name, fn, breaker in self.tiers:
+            try:
+                with span(f"{self.name}.{tier_name}"):
+                    if breaker:
+                        result = await breaker.acall(fn, *args, **kwargs)
+                    else:
+                        result = fn(*args, **kwargs)
+                        if asyncio.iscoroutine(result):
+                            result = await result
+            except Exception as e:
+                self._log_skip(tier_name, e)
+                continue
+            self.served[tier_name] += 1
+            return result, tier_name
+        self.served["empty"] += 1
+        return self.empty(), "empty"
+
+    def _log_skip(self, tier_name: str, error: Exception):
+        if not isinstance(error, TierUnavailable):
+            logger.warning(f"⚠️ {self.name}: {tier_name} tier failed, falling back ({error})")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "served": dict(self.served)}
+
+
+# 📌 Registry (one breaker per backend, shared by every caller in the process)
+breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    with _registry_lock:
+        if name not in breakers:
+            breakers[name] = CircuitBreaker(name, **kwargs)
+        return breakers[name]
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    return {name: breaker.status() for name, breaker in breakers.items()}
@@ -0,0 +1,270 @@
+"""
+Response Cache for ORA Emotion System
+Caches LLM completions keyed on normalized prompt + emotion + context
+fingerprint, with optional embedding-similarity matching, TTL/LRU eviction,
+per-user opt-out and hit-rate stats. Crisis-tier messages always bypass it.
+Opt-outs are stored in SQLite (cache_opt_outs, in the memory API database next
+to users), so every worker honors them and they survive restarts.
+"""
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+from crisis_lexicon import crisis_lexicon
+from metrics import track_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.getenv("ORA_RESPONSE_CACHE", "1") == "1"
+CACHE_TTL = float(os.getenv("ORA_RESPONSE_CACHE_TTL", "3600"))
+CACHE_MAX_ENTRIES = int(os.getenv("ORA_RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+# Cosine similarity needed for a near-duplicate hit; 0 disables similarity matching
+CACHE_SIMILARITY = float(os.getenv("ORA_RESPONSE_CACHE_SIMILARITY", "0"))
+
+# Same database as the memory API's users table (memory-api/src/database.py)
+OPT_OUT_DB_PATH = os.getenv(
+    "ORA_MEMORY_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "memory-api", "src", "ora_memory.db")
+)
+
+CRISIS_TIERS = {"high", "medium"}
+
+_PUNCT_RE = re.compile(r"[^\w\s']+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    text = (text or "").lower().replace("’", "'")
+    return _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", text)).strip()
+
+
+def context_fingerprint(context: Any) -> str:
+    """Stable digest of whatever context shaped the prompt (system prompt, history, ...)"""
+    if not isinstance(context, str):
+        context = repr(context)
+    return hashlib.sha1(context.encode("utf-8")).hexdigest()[:16]
+
+
+class OptOutStore:
+    """Users opted out of response caching, shared by every worker through SQLite"""
+
+    def __init__(self, path: str = OPT_OUT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            self._local.conn = conn
+        return conn
+
+    def set(self, user_id: str, opted_out: bool):
+        conn = self._connection()
+        with conn:
+            if not self._ready:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS cache_opt_outs (
+                        user_id TEXT PRIMARY KEY,
+                        opted_out_at TEXT NOT NULL
+                    )
+                ''')
+                self._ready = True
+            if opted_out:
+                conn.execute("INSERT OR IGNORE INTO cache_opt_outs (user_id, opted_out_at) "
+                             "VALUES (?, datetime('now'))", (user_id,))
+            else:
+                conn.execute("DELETE FROM cache_opt_outs WHERE user_id = ?", (user_id,))
+
+    def contains(self, user_id: Optional[str]) -> bool:
+        if not user_id:
+            return False
+        try:
+            row = self._connection().execute(
+                "SELECT 1 FROM cache_opt_outs WHERE user_id = ?", (user_id,)).fetchone()
+        except sqlite3.OperationalError:
+            return False  # Nobody has opted out yet (no table)
+        return row is not None
+
+    def count(self) -> int:
+        try:
+            return self._connection().execute("SELECT COUNT(*) FROM cache_opt_outs").fetchone()[0]
+        except sqlite3.OperationalError:
+            return 0
+
+
+@dataclass
+class CacheEntry:
+    response: str
+    bucket: str
+    expires_at: float
+    embedding: Any = None
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache of completions"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL,
+                 similarity_threshold: float = CACHE_SIMILARITY, enabled: bool = CACHE_ENABLED,
+                 opt_outs: OptOutStore = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.enabled = enabled
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        # bucket (emotion + context fingerprint) -> keys, for similarity lookups
+        self.buckets: Dict[str, Set[str]] = {}
+        self.opt_outs = opt_outs or OptOutStore()
+        self._embedder = None
+        self._lock = threading.Lock()
+        self.counters = {
+            "exact_hits": 0, "similar_hits": 0, "misses": 0, "stores": 0,
+            "bypass_crisis": 0, "bypass_opt_out": 0, "bypass_disabled": 0,
+            "evicted_ttl": 0, "evicted_lru": 0
+        }
+
+    # 📌 Keys
+    @staticmethod
+    def _bucket(emotion: str, context: Any) -> str:
+        return f"{(emotion or '').lower()}|{context_fingerprint(context)}"
+
+    def _key(self, prompt: str, bucket: str) -> str:
+        return hashlib.sha1(f"{bucket}|{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+    def _embed(self, prompt: str):
+        if self._embedder is None:
+            from local_memory_backend import HashingEmbedder
+            self._embedder = HashingEmbedder()
+        return self._embedder.embed([normalize_prompt(prompt)])[0]
+
+    # 📌 Policy
+    def set_opt_out(self, user_id: str, opted_out: bool = True):
+        self.opt_outs.set(user_id, opted_out)
+
+    def _bypass(self, prompt: str, risk_level: Optional[str], opted_out: bool) -> bool:
+        if not self.enabled:
+            self.counters["bypass_disabled"] += 1
+            return True
+        if opted_out:
+            self.counters["bypass_opt_out"] += 1
+            return True
+        # Never trust the caller alone: re-scan so crisis-tier text is never cached or served
+        if risk_level in CRISIS_TIERS or crisis_lexicon.scan(prompt).severity in CRISIS_TIERS:
+            self.counters["bypass_crisis"] += 1
+            return True
+        return False
+
+    # 📌 Lookups
+    def get(self, prompt: str, emotion: str, context: Any, user_id: str = None,
+            risk_level: str = None) -> Optional[str]:
+        # Read outside the lock - set from any worker
+        opted_out = self.enabled and self.opt_outs.contains(user_id)
+        with self._lock:
+            if self._bypass(prompt, risk_level, opted_out):
+                return None
+            now = time.time()
+            bucket = self._bucket(emotion, context)
+            key = self._key(prompt, bucket)
+
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self.entries.move_to_end(key)
+                self.counters["exact_hits"] += 1
+                return entry.response
+            if entry is not None:
+                self._remove(key)
+                self.counters["evicted_ttl"] += 1
+
+            if self.similarity_threshold > 0 and self.buckets.get(bucket):
+                match = self._most_similar(prompt, bucket, now)
+                if match is not None:
+                    self.entries.move_to_end(match)
+                    self.counters["similar_hits"] += 1
+                    return self.entries[match].response
+
+            self.counters["misses"] += 1
+            return None
+
+    def _most_similar(self, prompt: str, bucket: str, now: float) -> Optional[str]:
+        query = self._embed(prompt)
+        best_key, best_score = None, self.similarity_threshold
+        for key in self.buckets[bucket]:
+            entry = self.entries[key]
+            if entry.expires_at <= now or entry.embedding is None:
+                continue
+            score = float(query @ entry.embedding)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def put(self, prompt: str, emotion: str, context: Any, response: str, user_id: str = None,
+            risk_level: str = None):
+        if not response:
+            return
+        opted_out = self.enabled and self.opt_outs.contains(user_id)
+        with self._lock:
+            if self._bypass(prompt, risk_level, opted_out):
+                return
+            bucket = self._bucket(emotion, context)
+            key = self._key(prompt, bucket)
+            embedding = self._embed(prompt) if self.similarity_threshold > 0 else None
+            self._remove(key)
+            self.entries[key] = CacheEntry(response, bucket, time.time() + self.ttl, embedding)
+            self.buckets.setdefault(bucket, set()).add(key)
+            self.counters["stores"] += 1
+            self._evict()
+
+    # 📌 Eviction
+    def _remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            keys = self.buckets.get(entry.bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.buckets[entry.bucket]
+
+    def _evict(self):
+        now = time.time()
+        # Walk from the LRU end; expired entries hidden behind a live one are dropped on lookup
+        while self.entries:
+            key = next(iter(self.entries))
+            entry = self.entries[key]
+            if len(self.entries) <= self.max_entries and entry.expires_at > now:
+                break
+            self._remove(key)
+            self.counters["evicted_ttl" if entry.expires_at <= now else "evicted_lru"] += 1
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.buckets.clear()
+
+    def stats(self) -> Dict:
+        opted_out_users = self.opt_outs.count()
+        with self._lock:
+            hits = self.counters["exact_hits"] + self.counters["similar_hits"]
+            lookups = hits + self.counters["misses"]
+            return {
+                "enabled": self.enabled,
+                "size": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "similarity_threshold": self.similarity_threshold,
+                "opted_out_users": opted_out_users,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                **self.counters
+            }
+
+
+# Global instance
+response_cache = ResponseCache()
+track_cache("response", lambda: response_cache.stats()["hit_rate"], lambda: len(response_cache.entries))
@@ -7,9 +7,14 @@ import os
 import json
 import sqlite3
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import logging
 from dataclasses import dataclass, asdict
+from crisis_lexicon import crisis_lexicon
+from crisis_classifier import crisis_model
+from therapeutic_storage import TherapeuticStorage
+from therapeutic_catalog import therapeutic_catalog
+from crisis_events import ALERT_LEVELS, CrisisEvent, CrisisEventDispatcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +34,7 @@ class CrisisAssessment:
     indicators: List[str]
     immediate_actions: List[str]
     timestamp: datetime
+    risk_probabilities: Optional[Dict[str, float]] = None  # Calibrated model scores, if loaded
 
 class SimplifiedTherapeuticService:
     """
@@ -36,8 +42,10 @@ class SimplifiedTherapeuticService:
     Uses basic SQLite storage and keyword-based analysis
     """
     
-    def __init__(self):
-        self.db_path = "ora_therapeutic.db"
+    def __init__(self, storage: TherapeuticStorage = None, crisis_events: CrisisEventDispatcher = None):
+        self.storage = storage or TherapeuticStorage()
+        self.db_path = self.storage.db_path
+        self.crisis_events = crisis_events or CrisisEventDispatcher(recorder=self._record_crisis_intervention)
         self.crisis_hotlines = {
             "US": "988",
             "UK": "116 123", 
@@ -49,128 +57,124 @@ class SimplifiedTherapeuticService:
     def _init_database(self):
         """Initialize SQLite database for therapeutic data"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Therapeutic conversations table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS therapeutic_conversations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    message TEXT NOT NULL,
-                    emotion TEXT,
-                    crisis_level TEXT DEFAULT 'low',
-                    therapeutic_response TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    keywords TEXT,
-                    intervention_applied BOOLEAN DEFAULT 0
-                )
-            ''')
-            
-            # User therapeutic profiles
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_therapeutic_profiles (
-                    user_id TEXT PRIMARY KEY,
-                    dominant_emotions TEXT,
-                    crisis_history TEXT,
-                    therapeutic_progress TEXT,
-                    last_assessment DATETIME,
-                    risk_level TEXT DEFAULT 'low'
-                )
-            ''')
-            
-            # Crisis interventions
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS crisis_interventions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    risk_level TEXT NOT NULL,
-                    indicators TEXT,
-                    actions_taken TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    outcome TEXT
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
-            logger.info("✅ Simplified therapeutic database initialized")
+            with self.storage.transaction() as cursor:
+                self._create_schema(cursor)
+            logger.info(f"✅ Simplified therapeutic database initialized at: {self.db_path}")
             
         except Exception as e:
             logger.error(f"❌ Database initialization error: {e}")
     
+    def _create_schema(self, cursor):
+        """Create therapeutic tables and indexes"""
+        # Therapeutic conversations table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS therapeutic_conversations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                message TEXT NOT NULL,
+                emotion TEXT,
+                crisis_level TEXT DEFAULT 'low',
+                therapeutic_response TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                keywords TEXT,
+                intervention_applied BOOLEAN DEFAULT 0
+            )
+        ''')
+        
+        # User therapeutic profiles
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_therapeutic_profiles (
+                user_id TEXT PRIMARY KEY,
+                dominant_emotions TEXT,
+                crisis_history TEXT,
+                therapeutic_progress TEXT,
+                last_assessment DATETIME,
+                risk_level TEXT DEFAULT 'low'
+            )
+        ''')
+        
+        # Crisis interventions
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crisis_interventions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                risk_level TEXT NOT NULL,
+                indicators TEXT,
+                actions_taken TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                outcome TEXT
+            )
+        ''')
+        
+        # Per-user history lookups are ordered by timestamp
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_therapeutic_conversations_user_ts
+            ON therapeutic_conversations (user_id, timestamp)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_crisis_interventions_user_ts
+            ON crisis_interventions (user_id, timestamp)
+        ''')
+    
     def detect_crisis_indicators(self, message: str, user_context: Dict = None) -> CrisisAssessment:
         """
-        Simplified crisis detection using keyword matching
+        Simplified crisis detection using the shared crisis lexicon
         No Cognee dependencies
         """
-        message_lower = message.lower()
-        
-        # High-risk crisis indicators
-        high_risk_keywords = [
-            'want to die', 'kill myself', 'suicide', 'end it all',
-            'better off dead', 'no point living', 'hurt myself',
-            'self-harm', 'overdose', 'jump off', 'hang myself'
-        ]
-        
-        # Medium-risk indicators
-        medium_risk_keywords = [
-            'hopeless', 'worthless', 'burden', 'give up',
-            'can\'t go on', 'end the pain', 'no way out',
-            'everyone would be better', 'tired of living'
-        ]
-        
-        # Low-risk indicators
-        low_risk_keywords = [
-            'sad', 'depressed', 'anxious', 'stressed',
-            'overwhelmed', 'lonely', 'frustrated'
-        ]
+        lexicon_result = crisis_lexicon.scan(message)
+        high_risk = lexicon_result.terms("high")
+        medium_risk = lexicon_result.terms("medium")
+        low_risk = lexicon_result.terms("low")
+        model_score = crisis_model.score(message)
         
         risk_level = "low"
         indicators = []
         immediate_actions = []
         
         # Check for high-risk indicators
-        for keyword in high_risk_keywords:
-            if keyword in message_lower:
-                risk_level = "high"
-                indicators.append(f"High-risk keyword: {keyword}")
-                immediate_actions.extend([
-                    "Contact crisis hotline immediately",
-                    "Ensure user safety",
-                    "Provide immediate resources"
-                ])
-                break
+        if high_risk:
+            risk_level = "high"
+            indicators.append(f"High-risk keyword: {high_risk[0]}")
+            immediate_actions.extend([
+                "Contact crisis hotline immediately",
+                "Ensure user safety",
+                "Provide immediate resources"
+            ])
         
         # Check for medium-risk if not high-risk
-        if risk_level != "high":
-            for keyword in medium_risk_keywords:
-                if keyword in message_lower:
-                    risk_level = "medium"
-                    indicators.append(f"Medium-risk keyword: {keyword}")
-                    immediate_actions.extend([
-                        "Provide supportive response",
-                        "Offer coping strategies",
-                        "Monitor closely"
-                    ])
-                    break
+        elif medium_risk:
+            risk_level = "medium"
+            indicators.append(f"Medium-risk keyword: {medium_risk[0]}")
+            immediate_actions.extend([
+                "Provide supportive response",
+                "Offer coping strategies",
+                "Monitor closely"
+            ])
+        
+        # Keyword-silent but the classifier is confident: escalate, never downgrade
+        elif crisis_model.should_escalate(model_score):
+            risk_level = "medium"
+            indicators.append(f"Model risk score: {model_score.at_risk_probability:.2f}")
+            immediate_actions.extend([
+                "Provide supportive response",
+                "Gentle safety check",
+                "Monitor closely"
+            ])
         
         # Check for low-risk indicators
-        if risk_level == "low":
-            for keyword in low_risk_keywords:
-                if keyword in message_lower:
-                    indicators.append(f"Emotional distress: {keyword}")
-                    immediate_actions.extend([
-                        "Provide empathetic response",
-                        "Offer therapeutic techniques"
-                    ])
-                    break
+        elif low_risk:
+            indicators.append(f"Emotional distress: {low_risk[0]}")
+            immediate_actions.extend([
+                "Provide empathetic response",
+                "Offer therapeutic techniques"
+            ])
         
         return CrisisAssessment(
             risk_level=risk_level,
             indicators=indicators,
             immediate_actions=immediate_actions,
-            timestamp=datetime.now()
+            timestamp=datetime.now(),
+            risk_probabilities=model_score.probabilities if model_score else None
         )
     
     def generate_therapeutic_response(self, user_message: str, user_id: str, emotion: str = "neutral") -> Dict:
@@ -197,9 +201,21 @@ class SimplifiedTherapeuticService:
             response["crisis_assessment"] = {
                 "risk_level": crisis_assessment.risk_level,
                 "indicators": crisis_assessment.indicators,
-                "immediate_actions": crisis_assessment.immediate_actions
+                "immediate_actions": crisis_assessment.immediate_actions,
+                "risk_probabilities": crisis_assessment.risk_probabilities
             }
             
+            # Record + alert in the background; the response never waits on delivery
+            if crisis_assessment.risk_level in ALERT_LEVELS:
+                self.crisis_events.publish(CrisisEvent(
+                    user_id=user_id,
+                    risk_level=crisis_assessment.risk_level,
+                    indicators=crisis_assessment.indicators,
+                    actions_taken=[response.get("therapeutic_context", {}).get("session_type", "supportive_response")],
+                    source="simplified_therapeutic_service",
+                    risk_probabilities=crisis_assessment.risk_probabilities
+                ))
+            
             return response
             
         except Exception as e:
@@ -211,23 +227,128 @@ class SimplifiedTherapeuticService:
             }
     
     def _store_therapeutic_conversation(self, user_id: str, message: str, emotion: str, crisis_level: str):
-        """Store therapeutic conversation in SQLite database"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+        """Store therapeutic conversation and fold it into the user's profile (one transaction)"""
+        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        
+        def write(cursor):
             cursor.execute('''
                 INSERT INTO therapeutic_conversations 
-                (user_id, message, emotion, crisis_level, keywords)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (user_id, message, emotion, crisis_level, emotion))
+                (user_id, message, emotion, crisis_level, keywords, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (user_id, message, emotion, crisis_level, emotion, timestamp))
             
-            conn.commit()
-            conn.close()
+            profile = self._load_profile(cursor, user_id)
+            self._apply_to_profile(profile, emotion, crisis_level, timestamp)
+            self._save_profile(cursor, user_id, profile)
+        
+        try:
+            self.storage.write(write)
             
         except Exception as e:
             logger.error(f"❌ Database storage error: {e}")
     
+    def _record_crisis_intervention(self, event: CrisisEvent):
+        """Append a crisis event to crisis_interventions (runs on the dispatcher thread)"""
+        with self.storage.transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO crisis_interventions
+                (user_id, risk_level, indicators, actions_taken, timestamp, outcome)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (event.user_id, event.risk_level, json.dumps(event.indicators),
+                  json.dumps(event.actions_taken), event.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+                  "pending_follow_up"))
+    
+    @staticmethod
+    def _new_profile() -> Dict:
+        return {
+            "dominant_emotions": {"lifetime": {}, "recent": []},
+            "crisis_history": {"high": 0, "medium": 0, "low": 0, "recent": []},
+            "therapeutic_progress": {"conversation_count": 0, "last_conversation": None},
+            "last_assessment": None,
+            "risk_level": "low"
+        }
+    
+    def _load_profile(self, cursor, user_id: str) -> Dict:
+        cursor.execute('''
+            SELECT dominant_emotions, crisis_history, therapeutic_progress, last_assessment, risk_level
+            FROM user_therapeutic_profiles WHERE user_id = ?
+        ''', (user_id,))
+        row = cursor.fetchone()
+        if not row or not row[0]:
+            return self._new_profile()
+        return {
+            "dominant_emotions": json.loads(row[0]),
+            "crisis_history": json.loads(row[1]),
+            "therapeutic_progress": json.loads(row[2]),
+            "last_assessment": row[3],
+            "risk_level": row[4]
+        }
+    
+    def _save_profile(self, cursor, user_id: str, profile: Dict):
+        cursor.execute('''
+            INSERT INTO user_therapeutic_profiles
+            (user_id, dominant_emotions, crisis_history, therapeutic_progress, last_assessment, risk_level)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                dominant_emotions = excluded.dominant_emotions,
+                crisis_history = excluded.crisis_history,
+                therapeutic_progress = excluded.therapeutic_progress,
+                last_assessment = excluded.last_assessment,
+                risk_level = excluded.risk_level
+        ''', (user_id, json.dumps(profile["dominant_emotions"]), json.dumps(profile["crisis_history"]),
+              json.dumps(profile["therapeutic_progress"]), profile["last_assessment"], profile["risk_level"]))
+    
+    @staticmethod
+    def _apply_to_profile(profile: Dict, emotion: str, crisis_level: str, timestamp: str,
+                          recent_window: int = 10):
+        """Incrementally update a profile with one conversation (O(1))"""
+        emotions = profile["dominant_emotions"]
+        if emotion:
+            emotions["lifetime"][emotion] = emotions["lifetime"].get(emotion, 0) + 1
+            emotions["recent"] = (emotions["recent"] + [emotion])[-recent_window:]
+        
+        crisis = profile["crisis_history"]
+        if crisis_level:
+            crisis[crisis_level] = crisis.get(crisis_level, 0) + 1
+            crisis["recent"] = (crisis["recent"] + [crisis_level])[-recent_window:]
+        
+        progress = profile["therapeutic_progress"]
+        progress["conversation_count"] += 1
+        progress["last_conversation"] = timestamp
+        
+        # Same rule the summary used to compute from the last 10 conversations
+        recent_levels = crisis["recent"]
+        if recent_levels.count("high") > 0:
+            profile["risk_level"] = "high"
+        elif recent_levels.count("medium") > 2:
+            profile["risk_level"] = "medium"
+        else:
+            profile["risk_level"] = "low"
+        profile["last_assessment"] = timestamp
+    
+    def rebuild_user_profiles(self, user_id: str = None) -> int:
+        """Recompute materialized profiles from therapeutic_conversations (all users or one)"""
+        where, params = ("WHERE user_id = ?", (user_id,)) if user_id else ("", ())
+        self.storage.flush()
+        with self.storage.transaction() as cursor:
+            cursor.execute(f"DELETE FROM user_therapeutic_profiles {where}", params)
+            cursor.execute(f'''
+                SELECT user_id, emotion, crisis_level, timestamp
+                FROM therapeutic_conversations {where}
+                ORDER BY user_id, timestamp, id
+            ''', params)
+            
+            profiles = {}
+            for row_user, emotion, crisis_level, timestamp in cursor.fetchall():
+                profile = profiles.setdefault(row_user, self._new_profile())
+                self._apply_to_profile(profile, emotion, crisis_level, timestamp)
+            
+            for row_user, profile in profiles.items():
+                self._save_profile(cursor, row_user, profile)
+        
+        logger.info(f"✅ Rebuilt {len(profiles)} therapeutic profiles")
+        return len(profiles)
+    
     def _generate_crisis_response(self, crisis_assessment: CrisisAssessment) -> Dict:
         """Generate immediate crisis intervention response"""
         return {
@@ -249,14 +370,7 @@ class SimplifiedTherapeuticService:
     
     def _generate_supportive_response(self, message: str, emotion: str) -> Dict:
         """Generate supportive therapeutic response for medium-risk situations"""
-        responses = {
-            "sad": "I can hear that you're going through a really difficult time. These feelings of sadness are valid, and you don't have to face them alone.",
-            "anxious": "Anxiety can feel overwhelming, but there are ways to manage these feelings. Let's focus on what you can control right now.",
-            "angry": "It sounds like you're feeling really frustrated. Anger often tells us something important about our needs or boundaries.",
-            "default": "I can sense you're struggling right now. Your feelings are important and valid. What would feel most helpful for you in this moment?"
-        }
-        
-        response_text = responses.get(emotion.lower(), responses["default"])
+        response_text = therapeutic_catalog.supportive_response(emotion)
         
         return {
             "response": response_text,
@@ -283,82 +397,40 @@ class SimplifiedTherapeuticService:
             ]
         }
     
-    def _get_coping_strategies(self, emotion: str) -> List[str]:
+    def _get_coping_strategies(self, emotion: str) -> Tuple[str, ...]:
         """Get basic coping strategies for different emotions"""
-        strategies = {
-            "anxious": [
-                "Try deep breathing: 4 counts in, 6 counts out",
-                "Ground yourself: name 5 things you can see, 4 you can touch",
-                "Practice progressive muscle relaxation"
-            ],
-            "sad": [
-                "Allow yourself to feel the emotion without judgment",
-                "Reach out to a trusted friend or family member",
-                "Engage in one small self-care activity"
-            ],
-            "angry": [
-                "Take a pause before responding",
-                "Try physical exercise to release tension",
-                "Identify what need isn't being met"
-            ],
-            "default": [
-                "Practice mindful breathing",
-                "Connect with your support system",
-                "Be gentle with yourself"
-            ]
-        }
-        
-        return strategies.get(emotion.lower(), strategies["default"])
+        return therapeutic_catalog.coping_strategies(emotion)
     
     def get_user_therapeutic_summary(self, user_id: str) -> Dict:
-        """Get simplified therapeutic summary for a user"""
+        """Get simplified therapeutic summary for a user (single primary-key lookup)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get recent conversations
-            cursor.execute('''
-                SELECT emotion, crisis_level, timestamp 
-                FROM therapeutic_conversations 
-                WHERE user_id = ? 
-                ORDER BY timestamp DESC 
-                LIMIT 10
-            ''', (user_id,))
-            
-            conversations = cursor.fetchall()
-            
-            # Analyze patterns
-            emotions = [conv[0] for conv in conversations if conv[0]]
-            crisis_levels = [conv[1] for conv in conversations if conv[1]]
+            with self.storage.transaction() as cursor:
+                profile = self._load_profile(cursor, user_id)
             
-            # Calculate basic statistics
+            # Distribution over the recent window, newest first (matches dominance tie-breaking)
+            recent_emotions = list(reversed(profile["dominant_emotions"]["recent"]))
             emotion_counts = {}
-            for emotion in emotions:
+            for emotion in recent_emotions:
                 emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
             
             dominant_emotion = max(emotion_counts.items(), key=lambda x: x[1])[0] if emotion_counts else "neutral"
             
-            # Check for recent high-risk episodes
-            high_risk_count = crisis_levels.count("high")
-            medium_risk_count = crisis_levels.count("medium")
-            
-            current_risk = "low"
-            if high_risk_count > 0:
-                current_risk = "high"
-            elif medium_risk_count > 2:
-                current_risk = "medium"
-            
-            conn.close()
+            recent_levels = profile["crisis_history"]["recent"]
+            progress = profile["therapeutic_progress"]
             
             return {
                 "user_id": user_id,
-                "conversation_count": len(conversations),
+                "conversation_count": len(recent_levels),
+                "total_conversations": progress["conversation_count"],
                 "dominant_emotion": dominant_emotion,
                 "emotion_distribution": emotion_counts,
-                "current_risk_level": current_risk,
-                "high_risk_episodes": high_risk_count,
-                "medium_risk_episodes": medium_risk_count,
-                "last_conversation": conversations[0][2] if conversations else None,
+                "lifetime_emotion_distribution": profile["dominant_emotions"]["lifetime"],
+                "current_risk_level": profile["risk_level"],
+                "high_risk_episodes": recent_levels.count("high"),
+                "medium_risk_episodes": recent_levels.count("medium"),
+                "crisis_history": {level: profile["crisis_history"].get(level, 0) for level in ("high", "medium", "low")},
+                "last_conversation": progress["last_conversation"],
+                "last_assessment": profile["last_assessment"],
                 "system": "simplified_therapeutic_service"
             }
             
@@ -370,16 +442,17 @@ class SimplifiedTherapeuticService:
         """Health check for simplified therapeutic service"""
         try:
             # Test database connection
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM therapeutic_conversations")
-            conversation_count = cursor.fetchone()[0]
-            conn.close()
+            conversation_count = self.storage.query("SELECT COUNT(*) FROM therapeutic_conversations")[0][0]
+            journal_mode = self.storage.query("PRAGMA journal_mode")[0][0]
             
             return {
                 "service": "simplified_therapeutic_service",
                 "status": "healthy",
                 "database": "connected",
+                "database_path": self.db_path,
+                "journal_mode": journal_mode,
+                "pending_writes": self.storage.pending_writes,
+                "crisis_events": self.crisis_events.status(),
                 "conversation_count": conversation_count,
                 "cognee_removed": True,
                 "deployment_ready": True,
@@ -398,3 +471,11 @@ class SimplifiedTherapeuticService:
 # Global service instance
 simplified_therapeutic_service = SimplifiedTherapeuticService()
 
+if __name__ == "__main__":
+    # Backfill materialized profiles: python simplified_therapeutic_service.py rebuild-profiles [user_id]
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild-profiles":
+        simplified_therapeutic_service.rebuild_user_profiles(sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        print("Usage: python simplified_therapeutic_service.py rebuild-profiles [user_id]")
+
@@ -0,0 +1,141 @@
+// ORA realtime session client for the memory API's /ws/session WebSocket
+// One connection per conversation: emotion events, transcripts and audio go in;
+// emotion estimates, memory context and response tokens come back.
+//
+//   const session = new OraSession(url, userId);
+//   session.on('context', ctx => ...);
+//   session.userMessage('I had a rough day', { respond: false });
+
+class OraSession {
+    constructor(url, userId, options = {}) {
+        this.url = url;
+        this.userId = userId;
+        this.sessionId = options.sessionId || null;
+        this.sampleRate = options.sampleRate || 16000;
+        this.maxRetries = options.maxRetries ?? 5;
+        this.handlers = {};
+        this.outbox = [];
+        this.retries = 0;
+        this.closed = false;
+        this.socket = null;
+        this.connect();
+    }
+
+    connect() {
+        this.socket = new WebSocket(this.url);
+        this.socket.binaryType = 'arraybuffer';
+
+        this.socket.onopen = () => {
+            this.retries = 0;
+            // (Re)start first, then whatever was queued while disconnected
+            this.socket.send(JSON.stringify({
+                type: 'start',
+                user_id: this.userId,
+                session_id: this.sessionId,
+                sample_rate: this.sampleRate,
+                encoding: 'f32le'
+            }));
+            const queued = this.outbox;
+            this.outbox = [];
+            queued.forEach(message => this.socket.send(message));
+        };
+
+        this.socket.onmessage = (event) => {
+            const data = JSON.parse(event.data);
+            if (data.type === 'session') {
+                this.sessionId = data.session_id;
+            }
+            this.emit(data.type, data);
+            this.emit('*', data);
+        };
+
+        this.socket.onclose = () => {
+            if (this.closed || this.retries >= this.maxRetries) {
+                this.emit('closed', {});
+                return;
+            }
+            const delay = Math.min(500 * 2 ** this.retries, 8000);
+            this.retries += 1;
+            console.log(`🔌 ORA session disconnected, reconnecting in ${delay}ms`);
+            setTimeout(() => this.connect(), delay);
+        };
+
+        this.socket.onerror = (error) => {
+            console.error('❌ ORA session error:', error);
+        };
+    }
+
+    on(type, handler) {
+        (this.handlers[type] = this.handlers[type] || []).push(handler);
+        return this;
+    }
+
+    emit(type, data) {
+        (this.handlers[type] || []).forEach(handler => {
+            try {
+                handler(data);
+            } catch (error) {
+                console.error(`❌ ORA session ${type} handler error:`, error);
+            }
+        });
+    }
+
+    send(message) {
+        const payload = message instanceof ArrayBuffer ? message : JSON.stringify(message);
+        if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+            this.socket.send(payload);
+        } else if (!this.closed) {
+            this.outbox.push(payload);
+        }
+    }
+
+    // { emotion: 'anxious', intensity: 0.7 } or { scores: { Anxiety: 0.6, Calmness: 0.2 } }
+    sendEmotion(emotion) {
+        this.send({ type: 'emotion', ...emotion });
+    }
+
+    // Mono Float32Array at this.sampleRate
+    sendAudio(samples) {
+        this.send(samples.buffer.slice(samples.byteOffset, samples.byteOffset + samples.byteLength));
+    }
+
+    // respond: false when the reply comes from elsewhere (then call assistantMessage)
+    userMessage(text, options = {}) {
+        this.send({ type: 'user_message', text, ...options });
+    }
+
+    assistantMessage(text) {
+        this.send({ type: 'assistant_message', text });
+    }
+
+    interrupt() {
+        this.send({ type: 'interrupt' });
+    }
+
+    end() {
+        this.send({ type: 'end' });
+        this.closed = true;
+        // The server saves pending turns and closes; give it a moment before closing ourselves
+        setTimeout(() => this.socket && this.socket.close(), 2000);
+    }
+
+    // Stream a microphone to the session as PCM (for server-side audio emotion estimates)
+    streamMicrophone(stream, audioContext) {
+        const source = audioContext.createMediaStreamSource(stream);
+        const processor = audioContext.createScriptProcessor(4096, 1, 1);
+        this.sampleRate = audioContext.sampleRate;
+        this.send({ type: 'start', user_id: this.userId, session_id: this.sessionId,
+                    sample_rate: this.sampleRate, encoding: 'f32le' });
+        processor.onaudioprocess = (event) => {
+            this.sendAudio(new Float32Array(event.inputBuffer.getChannelData(0)));
+        };
+        source.connect(processor);
+        processor.connect(audioContext.destination);
+        return () => {
+            processor.disconnect();
+            source.disconnect();
+        };
+    }
+}
+
+window.OraSession = OraSession;
@@ -0,0 +1,73 @@
+"""
+Tests for the shared crisis lexicon: word boundaries, inflections and negation scope
+Run: python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crisis_lexicon import crisis_lexicon  # noqa: E402
+
+
+@pytest.mark.parametrize("message", [
+    "I am cutting back on coffee",
+    "we had to jump off the diving board",
+    "the pharmacy course covered overdose thresholds",
+    "she won the sadness award",  # "sad" only as part of a word
+    "my therapistsays hi",  # no word boundary after "therapist"
+])
+def test_no_high_risk_false_positives(message):
+    assert crisis_lexicon.scan(message).terms("high") == []
+
+
+@pytest.mark.parametrize("message, term", [
+    ("I overdosed last night", "overdosed"),
+    ("I've been overdosing on my pills", "overdose on"),
+    ("I took an overdose", "take an overdose"),
+    ("I keep cutting myself", "cut myself"),
+    ("I cut myself again", "cut myself"),
+    ("thinking about killing myself", "kill myself"),
+    ("I want to jump off a bridge", "jump off a bridge"),
+    ("I wanted to die", "want to die"),
+])
+def test_high_risk_inflections(message, term):
+    result = crisis_lexicon.scan(message)
+    assert term in result.terms("high")
+    assert result.severity == "high"
+
+
+def test_high_risk_is_never_negated():
+    result = crisis_lexicon.scan("I'm not going to kill myself")
+    assert result.terms("high") == ["kill myself"]
+
+
+@pytest.mark.parametrize("message", [
+    "I don't feel hopeless",
+    "I can't say I'm lonely",
+    "I won't give up",
+    "I didn't feel sad",
+    "it doesn't make me anxious",
+    "nobody here is lonely",
+])
+def test_negated_lower_tiers(message):
+    assert crisis_lexicon.scan(message).severity is None
+
+
+@pytest.mark.parametrize("message, term, tier", [
+    ("I'm not sad, just hopeless", "hopeless", "medium"),
+    ("I'm not sad but I feel worthless", "worthless", "medium"),
+    ("not today. I feel lonely", "lonely", "low"),
+    ("I'm not angry; I'm overwhelmed", "overwhelmed", "low"),
+    ("I can't stop feeling hopeless", "hopeless", "medium"),
+])
+def test_negation_stops_at_clause_boundary(message, term, tier):
+    assert term in crisis_lexicon.scan(message).terms(tier)
+
+
+def test_negated_matches_are_still_reported():
+    result = crisis_lexicon.scan("I'm not sad, just hopeless")
+    assert result.terms("low") == []
+    assert result.terms("low", include_negated=True) == ["sad"]
@@ -0,0 +1,94 @@
+"""
+Therapeutic Catalog for ORA Emotion System
+Supportive responses, coping strategies, exercises and follow-up suggestions
+loaded once from the versioned therapeutic_catalog.json into frozen, interned
+lookup tables shared by every service
+"""
+import os
+import sys
+import json
+import logging
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_VERSION = 1
+DEFAULT_CATALOG_PATH = os.getenv(
+    "ORA_THERAPEUTIC_CATALOG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "therapeutic_catalog.json")
+)
+SECTIONS = ("supportive_responses", "coping_strategies", "exercises", "follow_up_suggestions")
+
+
+class FrozenDict(dict):
+    """Read-only dict - catalog entries are shared across requests and must not be mutated"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Therapeutic catalog entries are read-only")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self):
+        return id(self)
+
+
+def _freeze(value):
+    """dict -> FrozenDict, list -> tuple, str -> interned str (recursively)"""
+    if isinstance(value, dict):
+        return FrozenDict((sys.intern(k), _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+class TherapeuticCatalog:
+    """O(1) emotion-keyed lookups over the frozen catalog"""
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SUPPORTED_VERSION:
+            raise ValueError(f"Unsupported therapeutic catalog version {data.get('version')} in {path}")
+
+        self.version = data["version"]
+        self.default_emotion = sys.intern(data["default_emotion"])
+        self.aliases: Dict[str, str] = {}
+        for canonical, names in data["aliases"].items():
+            canonical = sys.intern(canonical)
+            for name in [canonical] + names:
+                self.aliases[sys.intern(name)] = canonical
+
+        self.sections: Dict[str, FrozenDict] = {}
+        for section in SECTIONS:
+            table = _freeze(data[section])
+            if self.default_emotion not in table:
+                raise ValueError(f"Catalog section '{section}' has no '{self.default_emotion}' entry")
+            self.sections[section] = table
+
+        logger.info(f"✅ Therapeutic catalog v{self.version} loaded ({len(self.aliases)} emotion aliases)")
+
+    def canonical(self, emotion: str) -> str:
+        """Normalize an emotion label ('anxious', 'Anxiety', 'worried' -> 'anxiety')"""
+        return self.aliases.get((emotion or "").strip().lower(), self.default_emotion)
+
+    def _lookup(self, section: str, emotion: str):
+        table = self.sections[section]
+        return table.get(self.canonical(emotion)) or table[self.default_emotion]
+
+    def supportive_response(self, emotion: str) -> str:
+        return self._lookup("supportive_responses", emotion)
+
+    def coping_strategies(self, emotion: str) -> Tuple[str, ...]:
+        return self._lookup("coping_strategies", emotion)
+
+    def exercises(self, emotion: str) -> Tuple[Dict, ...]:
+        return self._lookup("exercises", emotion)
+
+    def follow_up_suggestions(self, emotion: str) -> Tuple[str, ...]:
+        return self._lookup("follow_up_suggestions", emotion)
+
+
+# Global instance
+therapeutic_catalog = TherapeuticCatalog()
@@ -0,0 +1,142 @@
+"""
+Therapeutic Storage for ORA Emotion System
+Thread-local persistent SQLite connections (WAL) + optional batched writer
+Used by SimplifiedTherapeuticService
+"""
+import os
+import queue
+import atexit
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from metrics import time_stage, track_queue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.abspath(os.getenv(
+    "ORA_THERAPEUTIC_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "ora_therapeutic.db")
+))
+BATCH_WRITES = os.getenv("ORA_THERAPEUTIC_BATCH_WRITES", "0") == "1"
+
+# A unit of work runs against a cursor inside a transaction
+WriteFn = Callable[[sqlite3.Cursor], None]
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    # Long-lived connections keep sqlite3's prepared-statement cache warm
+    conn = sqlite3.connect(db_path, timeout=5.0, cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # WAL + NORMAL: no fsync per commit
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class BatchedWriter:
+    """Background thread that commits queued writes in grouped transactions"""
+
+    def __init__(self, db_path: str, batch_size: int = 64, flush_interval: float = 0.05):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: "queue.Queue[WriteFn]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="therapeutic-writer", daemon=True)
+        self._thread.start()
+        track_queue("therapeutic_writes", lambda: self.pending)
+
+    def submit(self, fn: WriteFn):
+        self.queue.put(fn)
+
+    @property
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    def flush(self):
+        """Block until every queued write is committed"""
+        self.queue.join()
+
+    def _run(self):
+        conn = _connect(self.db_path)
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                pass
+
+            try:
+                self._commit(conn, batch)
+            except Exception as e:
+                # Isolate the failing unit so one bad write doesn't drop the batch
+                logger.error(f"❌ Batched write failed, retrying individually: {e}")
+                for fn in batch:
+                    try:
+                        self._commit(conn, [fn])
+                    except Exception as unit_error:
+                        logger.error(f"❌ Dropped therapeutic write: {unit_error}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    @staticmethod
+    def _commit(conn: sqlite3.Connection, batch: List[WriteFn]):
+        with conn:
+            cursor = conn.cursor()
+            for fn in batch:
+                fn(cursor)
+
+
+class TherapeuticStorage:
+    """SQLite access for therapeutic data with one persistent connection per thread"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, batch_writes: bool = BATCH_WRITES):
+        self.db_path = os.path.abspath(db_path)
+        self._local = threading.local()
+        self.writer: Optional[BatchedWriter] = BatchedWriter(self.db_path) if batch_writes else None
+        if self.writer:
+            atexit.register(self.writer.flush)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _connect(self.db_path)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Cursor inside a transaction on this thread's connection (commit/rollback on exit)"""
+        conn = self.connection()
+        with conn:
+            yield conn.cursor()
+
+    def write(self, fn: WriteFn):
+        """Run a unit of work in one transaction - queued when batched writes are enabled"""
+        if self.writer:
+            self.writer.submit(fn)
+        else:
+            with time_stage("db_write"), self.transaction() as cursor:
+                fn(cursor)
+
+    def query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with time_stage("db_query"):
+            return self.connection().execute(sql, params).fetchall()
+
+    def flush(self):
+        if self.writer:
+            self.writer.flush()
+
+    @property
+    def pending_writes(self) -> int:
+        return self.writer.pending if self.writer else 0
+
+    def close(self):
+        self.flush()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
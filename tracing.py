@@ -0,0 +1,463 @@
+"""
+Tracing for ORA Emotion System
+Lightweight spans with the active trace carried in a contextvar, so it follows
+awaits and asyncio tasks automatically and thread hops via wrap_context().
+Spans are buffered per trace and exported when the root span ends - for a
+sampled fraction of traces (ORA_TRACE_SAMPLE_RATE) plus every trace slower
+than ORA_TRACE_SLOW_MS - to a size-capped JSONL file or a collector endpoint
+(ORA_TRACE_EXPORT=file|collector; nothing is exported by default).
+
+    python tracing.py show /tmp/ora_traces.jsonl --slowest 5   # where did the time go?
+    python tracing.py collector --port 4318              # local collector stand-in
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import random
+import asyncio
+import tempfile
+import argparse
+import functools
+import threading
+import contextvars
+import logging
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("ORA_TRACING", "1") == "1"
+SAMPLE_RATE = float(os.getenv("ORA_TRACE_SAMPLE_RATE", "0.01"))
+# Traces at least this slow are always exported, whatever the sample rate (0 = off)
+SLOW_TRACE_MS = float(os.getenv("ORA_TRACE_SLOW_MS", "1000"))
+MAX_SPANS_PER_TRACE = 1000
+TRACE_EXPORT = os.getenv("ORA_TRACE_EXPORT", "none")  # file | collector | none
+TRACE_FILE = os.getenv("ORA_TRACE_FILE", os.path.join(tempfile.gettempdir(), "ora_traces.jsonl"))
+# The file is rotated to TRACE_FILE.1 (one backup) once it reaches this size
+TRACE_FILE_MAX_BYTES = int(float(os.getenv("ORA_TRACE_FILE_MAX_MB", "50")) * 1024 * 1024)
+COLLECTOR_URL = os.getenv("ORA_TRACE_COLLECTOR_URL", "http://127.0.0.1:4318/v1/spans")
+
+TRACE_HEADER = "X-Trace-Id"
+SAMPLED_HEADER = "X-Trace-Sampled"
+# Only these client addresses may force sampling with X-Trace-Sampled: 1
+TRUSTED_SAMPLERS = {addr.strip() for addr in os.getenv("ORA_TRACE_TRUSTED", "127.0.0.1,::1").split(",")
+                    if addr.strip()}
+
+_current: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("ora_span", default=None)
+
+
+def _new_id(length: int) -> str:
+    return uuid.uuid4().hex[:length]
+
+
+class Trace:
+    """Spans of one request, held until the root ends and the export decision is made"""
+
+    __slots__ = ("trace_id", "sampled", "spans", "dropped", "lock")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def add(self, record: Dict[str, Any], force: bool = False):
+        with self.lock:
+            if force or len(self.spans) < MAX_SPANS_PER_TRACE:
+                self.spans.append(record)
+            else:
+                self.dropped += 1
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "started_at", "started", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = _new_id(16)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.error: Optional[str] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def finish(self, force: bool = False) -> float:
+        duration_ms = (time.perf_counter() - self.started) * 1000
+        self.trace.add({
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.started_at, 6),
+            "duration_ms": round(duration_ms, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error
+        }, force)
+        return duration_ms
+
+
+class span:
+    """
+    A child span of whatever span is active, as a context manager or a (sync or
+    async) decorator. Outside a trace it does nothing, so it is cheap to leave
+    on hot paths:
+        with span("cognee.search", user_id=user_id): ...
+        @span("therapeutic.get_user_insights")
+    """
+
+    __slots__ = ("name", "attributes", "current", "_token")
+
+    def __init__(self, name: str, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.current: Optional[Span] = None
+        self._token = None
+
+    def __enter__(self):
+        parent = _current.get()
+        if parent is not None:
+            self.current = Span(parent.trace, self.name, parent.span_id, dict(self.attributes))
+            self._token = _current.set(self.current)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.current is not None:
+            if exc_type is not None:
+                self.current.error = f"{exc_type.__name__}: {exc}"
+            self.current.finish()
+            _current.reset(self._token)
+            self.current = None
+        return False
+
+    def set(self, **attributes):
+        if self.current is not None:
+            self.current.attributes.update(attributes)
+
+    def __call__(self, fn: Callable) -> Callable:
+        name, attributes = self.name, self.attributes
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, **attributes):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+class start_trace:
+    """Root span of a new trace (or a continuation of an incoming trace id)"""
+
+    __slots__ = ("name", "attributes", "trace_id", "parent_id", "sampled", "root", "_token")
+
+    def __init__(self, name: str, trace_id: str = None, parent_id: str = None, sampled: bool = None,
+                 **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = trace_id or _new_id(32)
+        self.parent_id = parent_id
+        self.sampled = (random.random() < SAMPLE_RATE) if sampled is None else sampled
+        self.root: Optional[Span] = None
+        self._token = None
+
+    def __enter__(self):
+        if TRACING_ENABLED:
+            self.root = Span(Trace(self.trace_id, self.sampled), self.name, self.parent_id, dict(self.attributes))
+            self._token = _current.set(self.root)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.fail(f"{exc_type.__name__}: {exc}")
+        self.end()
+        return False
+
+    def fail(self, error: str):
+        if self.root is not None:
+            self.root.error = error
+
+    def end(self):
+        if self.root is None:
+            return
+        root, self.root = self.root, None
+        trace = root.trace
+        if trace.dropped:
+            root.attributes["dropped_spans"] = trace.dropped
+        duration_ms = root.finish(force=True)
+        _current.reset(self._token)
+        if trace.sampled or (SLOW_TRACE_MS > 0 and duration_ms >= SLOW_TRACE_MS):
+            exporter.export(trace.spans)
+
+
+def current_trace_id() -> Optional[str]:
+    active = _current.get()
+    return active.trace_id if active is not None else None
+
+
+def wrap_context(fn: Callable) -> Callable:
+    """Carry the active trace into a thread pool / executor hop (wrap at submit time)"""
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # A copy per run: the same wrapped callable may run on several threads at once
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+
+# 📌 Exporters
+class JsonlExporter:
+    """Append spans to a local JSONL file, rotated to `<path>.1` once it reaches max_bytes"""
+
+    def __init__(self, path: str = TRACE_FILE, max_bytes: int = TRACE_FILE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Dict[str, Any]]):
+        lines = "".join(json.dumps(record, default=str) + "\n" for record in spans)
+        try:
+            with self._lock:
+                if self.max_bytes > 0 and os.path.exists(self.path) and \
+                        os.path.getsize(self.path) + len(lines) > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+        except OSError as e:
+            logger.warning(f"⚠️ Trace export failed: {e}")
+
+
+class CollectorExporter:
+    """POST span batches to a collector from a background thread (drops when backed up)"""
+
+    def __init__(self, url: str = COLLECTOR_URL, max_queue: int = 1000, timeout: float = 2.0):
+        self.url = url
+        self.timeout = timeout
+        self.queue: "queue.Queue[List[Dict]]" = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, spans: List[Dict[str, Any]]):
+        try:
+            self.queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = list(self.queue.get())
+            while len(batch) < 500:
+                try:
+                    batch.extend(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            body = json.dumps(batch, default=str).encode("utf-8")
+            request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except Exception as e:
+                logger.warning(f"⚠️ Trace collector unreachable ({e}), dropped {len(batch)} spans")
+
+
+class InMemoryExporter:
+    """Keeps exported spans in a list (debugging and benchmarks)"""
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+
+    def export(self, spans: List[Dict[str, Any]]):
+        self.spans.extend(spans)
+
+
+class _NoopExporter:
+    def export(self, spans):
+        pass
+
+
+def _default_exporter():
+    if TRACE_EXPORT == "collector":
+        return CollectorExporter()
+    if TRACE_EXPORT == "file":
+        return JsonlExporter()
+    return _NoopExporter()
+
+
+# Global instance (replace to redirect exports, e.g. tracing.exporter = InMemoryExporter())
+exporter = _default_exporter()
+
+
+def _forced_sample(headers, remote_addr: Optional[str]) -> Optional[bool]:
+    """True when a trusted caller asks for this trace to be exported, else None (sample normally)"""
+    if headers.get(SAMPLED_HEADER) == "1" and remote_addr in TRUSTED_SAMPLERS:
+        return True
+    return None
+
+
+# 📌 Flask
+def trace_flask(app, name: str = None):
+    """A root span per request (continuing an incoming X-Trace-Id) and the id echoed back"""
+    if "ora_tracing" in app.extensions:
+        return
+    app.extensions["ora_tracing"] = True
+    app_name = name or app.import_name
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_trace():
+        incoming = request.headers.get(TRACE_HEADER)
+        route = request.url_rule.rule if request.url_rule else request.path
+        g._ora_trace = start_trace(f"{request.method} {route}", trace_id=incoming,
+                                   sampled=_forced_sample(request.headers, request.remote_addr),
+                                   app=app_name, path=request.path)
+        g._ora_trace.__enter__()
+
+    @app.after_request
+    def _echo_trace_id(response):
+        trace = getattr(g, "_ora_trace", None)
+        if trace is not None:
+            response.headers[TRACE_HEADER] = trace.trace_id
+            if trace.root is not None:
+                trace.root.attributes["status"] = response.status_code
+        return response
+
+    @app.teardown_request
+    def _end_request_trace(exc):
+        trace = g.pop("_ora_trace", None)
+        if trace is not None:
+            if exc is not None:
+                trace.fail(f"{type(exc).__name__}: {exc}")
+            trace.end()
+
+
+
+def trace_quart(app, name: str = None):
+    """trace_flask for Quart apps; the hooks are async so the trace's contextvar reaches the handler"""
+    if "ora_tracing" in app.extensions:
+        return
+    app.extensions["ora_tracing"] = True
+    app_name = name or app.import_name
+    from quart import g, request
+
+    @app.before_request
+    async def _start_request_trace():
+        incoming = request.headers.get(TRACE_HEADER)
+        route = request.url_rule.rule if request.url_rule else request.path
+        g._ora_trace = start_trace(f"{request.method} {route}", trace_id=incoming,
+                                   sampled=_forced_sample(request.headers, request.remote_addr),
+                                   app=app_name, path=request.path)
+        g._ora_trace.__enter__()
+
+    @app.after_request
+    async def _echo_trace_id(response):
+        trace = getattr(g, "_ora_trace", None)
+        if trace is not None:
+            response.headers[TRACE_HEADER] = trace.trace_id
+            if trace.root is not None:
+                trace.root.attributes["status"] = response.status_code
+        return response
+
+    @app.teardown_request
+    async def _end_request_trace(exc):
+        trace = g.pop("_ora_trace", None)
+        if trace is not None:
+            if exc is not None:
+                trace.fail(f"{type(exc).__name__}: {exc}")
+            trace.end()
+
+# 📌 CLI: inspect exported traces / run a collector stand-in
+def _load(path: str) -> Dict[str, List[Dict]]:
+    traces: Dict[str, List[Dict]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                traces.setdefault(record["trace_id"], []).append(record)
+    return traces
+
+
+def render_trace(spans: List[Dict]) -> str:
+    """Indented span tree with durations and each span's share of the root"""
+    children: Dict[Optional[str], List[Dict]] = {}
+    ids = {record["span_id"] for record in spans}
+    for record in spans:
+        parent = record["parent_id"] if record["parent_id"] in ids else None
+        children.setdefault(parent, []).append(record)
+    roots = children.get(None, [])
+    total = max((r["duration_ms"] for r in roots), default=0) or 1
+    lines = []
+
+    def walk(record, depth):
+        share = record["duration_ms"] / total * 100
+        flag = " ❌ " + record["error"] if record.get("error") else ""
+        lines.append(f"{'  ' * depth}{record['duration_ms']:9.1f} ms {share:5.1f}%  {record['name']}{flag}")
+        for child in sorted(children.get(record["span_id"], []), key=lambda r: r["start"]):
+            walk(child, depth + 1)
+
+    for root in roots:
+        lines.append(f"trace {root['trace_id']}")
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+def _serve_collector(port: int, out: str):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    sink = JsonlExporter(out)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            spans = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"[]")
+            sink.export(spans)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"📡 Trace collector on :{port} → {out}")
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Inspect ORA traces")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="print span trees")
+    show.add_argument("path", nargs="?", default=TRACE_FILE)
+    show.add_argument("--trace", help="trace id")
+    show.add_argument("--slowest", type=int, default=5, help="show the N slowest traces")
+    collector = sub.add_parser("collector", help="run a local collector stand-in")
+    collector.add_argument("--port", type=int, default=4318)
+    collector.add_argument("--out", default=TRACE_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "collector":
+        _serve_collector(args.port, args.out)
+        return
+
+    traces = _load(args.path)
+    if args.trace:
+        selected = [traces.get(args.trace, [])]
+    else:
+        def root_ms(spans):
+            return max(r["duration_ms"] for r in spans if r["parent_id"] not in {s["span_id"] for s in spans})
+        selected = sorted(traces.values(), key=root_ms, reverse=True)[:args.slowest]
+    for spans in selected:
+        print(render_trace(spans) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,115 @@
+import os
+import csv
+import json
+import sqlite3
+import argparse
+import numpy as np
+
+from crisis_classifier import CLASSES, CrisisClassifier, batch_features, softmax, DEFAULT_MODEL_PATH
+from crisis_lexicon import crisis_lexicon
+
+
+# 📌 Load Training Data
+def load_examples(path):
+    """Loads (text, label) pairs from a .jsonl ({"text", "label"}) or .csv (text,label) file."""
+    examples = []
+    if path.endswith(".jsonl"):
+        with open(path) as f:
+            for line in f:
+                row = json.loads(line)
+                examples.append((row["text"], row["label"]))
+    else:
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                examples.append((row["text"], row["label"]))
+
+    examples = [(text, label) for text, label in examples if label in CLASSES]
+    print(f"✅ Loaded {len(examples)} labeled messages from {path}.")
+    return examples
+
+
+def load_weak_labels(db_path):
+    """Weakly labels stored therapeutic conversations with the keyword lexicon."""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT message FROM therapeutic_conversations").fetchall()
+    conn.close()
+    examples = [(message, crisis_lexicon.scan(message).severity or "low") for (message,) in rows if message]
+    print(f"✅ Weakly labeled {len(examples)} conversations from {db_path}.")
+    return examples
+
+
+# 📌 Train the Model
+def train(examples, n_features=2 ** 16, epochs=8, batch_size=256, learning_rate=0.5, l2=1e-6, seed=0):
+    """Mini-batch SGD for multinomial logistic regression on hashed n-grams."""
+    rng = np.random.default_rng(seed)
+    texts = [text for text, _ in examples]
+    labels = np.array([CLASSES.index(label) for _, label in examples])
+
+    # Class-balanced sample weights - crisis messages are rare
+    counts = np.bincount(labels, minlength=len(CLASSES)).astype(np.float32)
+    class_weights = counts.sum() / (len(CLASSES) * np.maximum(counts, 1))
+
+    model = CrisisClassifier(np.zeros((n_features, len(CLASSES)), dtype=np.float32),
+                             np.zeros(len(CLASSES), dtype=np.float32))
+
+    for epoch in range(epochs):
+        order = rng.permutation(len(texts))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            batch_texts = [texts[i] for i in batch]
+            rows, indices, signs = batch_features(batch_texts, n_features)
+
+            probabilities = softmax(model.logits_batch(batch_texts))
+            gradient = probabilities
+            gradient[np.arange(len(batch)), labels[batch]] -= 1.0
+            gradient *= class_weights[labels[batch]][:, None] / len(batch)
+
+            np.add.at(model.weights, indices, -learning_rate * gradient[rows] * signs[:, None])
+            model.weights[indices] *= (1 - learning_rate * l2)
+            model.bias -= learning_rate * gradient.sum(axis=0)
+        print(f"🔁 Epoch {epoch + 1}/{epochs} complete")
+    return model
+
+
+def calibrate(model, examples):
+    """Temperature scaling: pick T minimizing held-out negative log-likelihood."""
+    logits = model.logits_batch([text for text, _ in examples])
+    labels = np.array([CLASSES.index(label) for _, label in examples])
+    best_t, best_nll = 1.0, float("inf")
+    for t in np.linspace(0.25, 5.0, 96):
+        probabilities = softmax(logits / t)
+        nll = -np.mean(np.log(probabilities[np.arange(len(labels)), labels] + 1e-12))
+        if nll < best_nll:
+            best_t, best_nll = float(t), nll
+    model.temperature = best_t
+    accuracy = float(np.mean(np.argmax(logits, axis=1) == labels))
+    print(f"✅ Calibrated temperature={best_t:.2f} (held-out NLL {best_nll:.4f}, accuracy {accuracy:.3f})")
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the on-box crisis risk classifier")
+    parser.add_argument("--data", help="labeled .jsonl/.csv with text,label (low/medium/high)")
+    parser.add_argument("--from-db", help="weakly label therapeutic_conversations from this SQLite DB")
+    parser.add_argument("--output", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--features", type=int, default=2 ** 16)
+    parser.add_argument("--epochs", type=int, default=8)
+    args = parser.parse_args()
+
+    examples = []
+    if args.data:
+        examples += load_examples(args.data)
+    if args.from_db:
+        examples += load_weak_labels(args.from_db)
+    if len(examples) < 10:
+        parser.error("Need at least 10 labeled examples (use --data and/or --from-db)")
+
+    order = np.random.default_rng(1).permutation(len(examples))
+    split = int(len(examples) * 0.8)
+    train_set = [examples[i] for i in order[:split]]
+    holdout = [examples[i] for i in order[split:]]
+
+    print("🚀 Training crisis classifier...")
+    model = calibrate(train(train_set, n_features=args.features, epochs=args.epochs), holdout)
+    model.save(args.output)
+    print(f"✅ Saved {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
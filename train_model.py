@@ -8,6 +8,9 @@ from dotenv import load_dotenv
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.neural_network import MLPClassifier
 from sklearn.model_selection import GridSearchCV
+from response_cache import response_cache
+from conversation_manager import ConversationManager
+from metrics import time_stage
 
 
 # 📌 Load Training Data (RAVDESS Dataset)
@@ -63,6 +66,9 @@ def train_model():
         pickle.dump(model, f)
     with open("label_encoder.pkl", "wb") as f:
         pickle.dump(encoder, f)
+    # Serving (memory-api realtime sessions) must scale features the same way
+    with open("feature_scaler.pkl", "wb") as f:
+        pickle.dump(scaler, f)
 
     print("✅ Model trained and saved successfully!")
 
@@ -93,6 +99,7 @@ def load_trained_model():
 model, encoder = load_trained_model()
 
 # 📌 Extract Features for Prediction
+@time_stage("feature_extraction")
 def extract_feature(audio_data, sample_rate):
     """Extracts audio features for emotion recognition."""
     result = np.array([])
@@ -130,7 +137,8 @@ def analyze_emotion(audio_path):
     features = extract_feature(audio_data, sample_rate).reshape(1, -1)
 
     # Get probabilities for each emotion
-    predicted_proba = model.predict_proba(features)[0]  # Returns an array of probabilities
+    with time_stage("mlp_inference"):
+        predicted_proba = model.predict_proba(features)[0]  # Returns an array of probabilities
 
     # Map probabilities to emotion labels & ensure they are Python floats
     emotion_labels = encoder.classes_  # Get emotion labels from the encoder
@@ -168,12 +176,21 @@ def generate_chatgpt_response(messages):
     #     # {"role": "user", "content": f"I'm feeling {emotion}. Let's talk about it."}
     # ]
 
+    # Cache key: latest user message + everything before it as context
+    prompt = messages[-1]["content"] if messages else ""
+    cached = response_cache.get(prompt, "", messages[:-1], user_id="local")
+    if cached is not None:
+        return cached
+
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=messages
-        )
-        return response.choices[0].message["content"].strip()
+        with time_stage("llm_call"):
+            response = openai.ChatCompletion.create(
+                model="gpt-3.5-turbo",
+                messages=messages
+            )
+        reply = response.choices[0].message["content"].strip()
+        response_cache.put(prompt, "", messages[:-1], reply, user_id="local")
+        return reply
     except Exception as e:
         print(f"❌ Error calling OpenAI API: {e}")
         return "Sorry, I encountered an error generating a response."
@@ -197,19 +214,19 @@ if __name__ == "__main__":
             print(f"🧠 Are you feeling {emotion}?")
 
             # Step 2: Start a New Conversation Based on Emotion
-            messages = [
-                {"role": "system", "content": "You are trying to help users process their emotions. Guess what emotions the user is feeling based on what the user is saying."},
-                {"role": "user", "content": f"Are you feeling {emotion}? I want to understand you better."}
-            ]
+            conversation = ConversationManager(
+                "You are trying to help users process their emotions. Guess what emotions the user is feeling based on what the user is saying."
+            )
+            conversation.add("user", f"Are you feeling {emotion}? I want to understand you better.")
 
             # Get GPT's first response
-            chat_response = generate_chatgpt_response(messages)
+            chat_response = generate_chatgpt_response(conversation.build_messages())
             print("\n--- ChatGPT's Response ---\n")
             print(chat_response)
             print("--------------------------\n")
 
             # Save GPT's response to conversation history
-            messages.append({"role": "assistant", "content": chat_response})
+            conversation.add("assistant", chat_response)
 
             # Step 3: Let the User Continue the Conversation
             while True:
@@ -218,14 +235,15 @@ if __name__ == "__main__":
                     print("Exiting... Goodbye!")
                     break
 
-                messages.append({"role": "user", "content": user_input})
+                conversation.add("user", user_input)
 
-                chat_response = generate_chatgpt_response(messages)
+                # Older turns are summarized so each prompt stays within the token budget
+                chat_response = generate_chatgpt_response(conversation.build_messages())
                 print("\n--- ChatGPT's Response ---\n")
                 print(chat_response)
                 print("--------------------------\n")
 
-                messages.append({"role": "assistant", "content": chat_response})
+                conversation.add("assistant", chat_response)
 
         else:
             print("❌ Could not detect emotion. Please try again.")